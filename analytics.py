@@ -0,0 +1,198 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import numpy as np
+from json import dumps
+from datetime import date, datetime, timedelta
+from history_columns import HistoryColumns
+from history_log import SCREEN_TIME_SCHEMA, EVENT_COUNT_SCHEMA
+from reminder_types import registry
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+BREAK_COLUMNS = tuple(reminder_type.columns[0] for reminder_type in registry.all)  # count column of each reminder
+DEFAULT_GOALS = {reminder_type.columns[0]: reminder_type.goal  # daily count to reach for each event
+                 for reminder_type in registry if reminder_type.goal}
+
+
+# <<< COMPUTATIONS >>>
+
+def group_totals(keys: np.ndarray, columns: HistoryColumns, names) -> dict:
+    """
+    Sums columns per group key.
+
+    :param keys: One group key per day, e.g. the ordinal of the first day of the week.
+    :param columns: The history columns.
+    :param names: Names of the columns to sum.
+    :return: A dict with the sorted unique "keys", the number of recorded "days" per key and one array of sums per
+             column name.
+    """
+
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    totals = {"keys": unique_keys, "days": np.bincount(inverse, minlength=len(unique_keys))}
+    for name in names:
+        totals[name] = np.bincount(inverse, weights=columns[name], minlength=len(unique_keys)).astype(np.int64)
+
+    return totals
+
+
+def breaks_per_screen_hour(breaks: np.ndarray, minutes: np.ndarray) -> np.ndarray:
+    """
+    Returns the compliance ratio, i.e. the number of breaks taken per hour of screen time (0 without screen time).
+    """
+
+    hours = minutes / 60
+    return np.divide(breaks, hours, out=np.zeros(len(hours)), where=hours > 0)
+
+
+def streaks(met: np.ndarray, ordinals: np.ndarray, today: int) -> tuple:
+    """
+    Finds runs of consecutive days on which the goals were met, a day without any record breaks a run.
+
+    :param met: Whether the goals were met, per recorded day.
+    :param ordinals: Sorted ordinals of the recorded days.
+    :param today: Ordinal of the current day, a streak ending yesterday is still current.
+    :return: A tuple of (current streak, longest streak) in days.
+    """
+
+    met_ordinals = ordinals[met]
+    if len(met_ordinals) == 0:
+        return 0, 0
+
+    # A new run starts wherever the previous met day is not the day before
+    run_starts = np.flatnonzero(np.diff(met_ordinals, prepend=met_ordinals[0] - 2) != 1)
+    run_lengths = np.diff(np.append(run_starts, len(met_ordinals)))
+
+    current = int(run_lengths[-1]) if met_ordinals[-1] >= today - 1 else 0
+    return current, int(run_lengths.max())
+
+
+def summarize(columns: HistoryColumns, today: int, goals: dict = None) -> dict:
+    """
+    Computes wellbeing statistics over the recorded days before `today`.
+
+    :param columns: The history columns.
+    :param today: Ordinal of the current day, which is excluded as it is still being recorded.
+    :param goals: Daily count to reach for each break column. Defaults to `DEFAULT_GOALS`.
+    :return: A JSON-serializable dict with "weekly", "monthly", "weekdays", "streaks" and "goals" statistics.
+    """
+
+    goals = DEFAULT_GOALS if goals is None else goals
+    columns = columns.between(end=str(date.fromordinal(today - 1)))
+    names = ("minutes",) + BREAK_COLUMNS
+
+    ordinals = columns.ordinals.astype(np.int64)
+    weekdays = (ordinals - 1) % 7  # ordinal 1 (0001-01-01) is a Monday
+    months = (ordinals - EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]")
+    breaks = sum(columns[name].astype(np.int64) for name in BREAK_COLUMNS)
+
+    summary = {"days": len(columns)}
+
+    for period, keys in (("weekly", ordinals - weekdays), ("monthly", months)):
+        totals = group_totals(keys, columns, names)
+        period_breaks = sum(totals[name] for name in BREAK_COLUMNS)
+        labels = ([str(date.fromordinal(int(key))) for key in totals["keys"]] if period == "weekly"
+                  else [str(key) for key in totals["keys"]])
+
+        summary[period] = [
+            {
+                "period": label,
+                "days": int(days),
+                **{name: int(totals[name][index]) for name in names},
+                **{f"{name}_mean": round(float(totals[name][index] / days), 2) for name in names},
+                "breaks_per_screen_hour": round(float(ratio), 2)
+            }
+            for index, (label, days, ratio) in enumerate(zip(
+                labels, totals["days"], breaks_per_screen_hour(period_breaks, totals["minutes"])))
+        ]
+
+    weekday_totals = group_totals(weekdays, columns, names)
+    summary["weekdays"] = {
+        WEEKDAYS[key]: {f"{name}_mean": round(float(weekday_totals[name][index] / weekday_totals["days"][index]), 2)
+                        for name in names}
+        for index, key in enumerate(weekday_totals["keys"])
+    }
+
+    met_per_goal = {name: columns[name] >= goal for name, goal in goals.items()}
+    all_met = np.logical_and.reduce(list(met_per_goal.values())) if met_per_goal else np.zeros(len(columns), bool)
+    current, longest = streaks(all_met & columns.has_event_counts, columns.ordinals, today)
+
+    summary["streaks"] = {"current": current, "longest": longest}
+    summary["goals"] = {
+        name: {"goal": goal, "attainment": round(float(met.mean()), 2) if len(met) else 0.0}
+        for (name, goal), met in zip(goals.items(), met_per_goal.values())
+    }
+    summary["breaks_per_screen_hour"] = round(float(breaks_per_screen_hour(
+        np.array([breaks.sum()]), np.array([columns["minutes"].sum()]))[0]), 2)
+
+    return summary
+
+
+# <<< CACHED ANALYTICS >>>
+
+class WellbeingAnalytics:
+    """
+    Computes the statistics of `summarize` and caches them until a new day starts.
+
+    Note: Only completed days are analysed, so their data cannot change until the next day's data arrives.
+    """
+
+    def __init__(self, load_columns, goals: dict = None, now=datetime.now) -> None:
+        """
+        :param load_columns: Callable returning the `HistoryColumns` of the whole history.
+        :param goals: Daily count to reach for each break column. Defaults to `DEFAULT_GOALS`.
+        :param now: Callable returning the current datetime, e.g. the application's clock. Defaults to `datetime.now`.
+        """
+
+        self.load_columns = load_columns
+        self.goals = goals
+        self.now = now
+
+        self._summary = None
+        self._summary_day = None
+
+    def summary(self, today: date = None) -> dict:
+        """
+        Returns the statistics of the days before `today`, computing them at most once a day.
+
+        :param today: The current day. Defaults to the day of `now`.
+        """
+
+        today = (self.now().date() if today is None else today).toordinal()
+
+        if self._summary_day != today:
+            self._summary = summarize(self.load_columns(), today, self.goals)
+            self._summary_day = today
+
+        return self._summary
+
+    def current_week(self, today: date = None) -> dict:
+        """
+        Returns the weekly statistics of the ISO week containing `today`, from its days before `today`.
+
+        :param today: The current day. Defaults to the day of `now`.
+        :return: The entry of the week in the "weekly" statistics, None if none of its days before today was recorded.
+        """
+
+        today = self.now().date() if today is None else today
+        monday = str(today - timedelta(days=today.weekday()))
+
+        return next((week for week in self.summary(today)["weekly"] if week["period"] == monday), None)
+
+    def invalidate(self) -> None:
+        self._summary_day = None
+
+
+# <<< COMMAND LINE >>>
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+    from config import DATA_DIR
+
+    parser = ArgumentParser(description="Prints Wellbeing statistics of the history logs as JSON.")
+    parser.add_argument("--data", default=DATA_DIR, help="directory containing the history logs")
+    arguments = parser.parse_args()
+
+    analytics = WellbeingAnalytics(lambda: HistoryColumns.load(
+        f"{arguments.data}/screen_time_history", SCREEN_TIME_SCHEMA,
+        f"{arguments.data}/event_count_history", EVENT_COUNT_SCHEMA))
+    print(dumps(analytics.summary(), indent=4))
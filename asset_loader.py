@@ -0,0 +1,77 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+# Runtime loader of the artifacts built by build_assets.py, every asset falls back to its source file when its
+# artifact is missing or out of date
+
+from json import load
+from os.path import exists, getmtime, splitext, basename
+from config import REMINDER_TYPES_PATH
+
+BUILD_DIR = "assets/build"
+MANIFEST_PATH = f"{BUILD_DIR}/manifest.json"
+ATLAS_NAME = "images"  # atlas of every image in "assets/images/"
+
+_manifest = None
+
+
+# <<< ASSET LOADER >>>
+
+def load_manifest() -> dict:
+    """
+    Returns the manifest of the built artifacts, empty if nothing was built or the artifacts are out of date.
+
+    Note: Subset fonts only contain the glyphs of the strings found when they were built, so every artifact is
+    ignored once one of the files the strings were collected from has changed, or when they were collected from
+    another reminder types file than the one loaded by the registry.
+    """
+
+    global _manifest
+
+    if _manifest is None:
+        _manifest = {}
+        if exists(MANIFEST_PATH):
+            with open(MANIFEST_PATH) as file:
+                manifest = load(file)
+
+            sources = manifest["sources"]
+            if REMINDER_TYPES_PATH in sources and all(source_unchanged(path, mtime) for path, mtime in sources.items()):
+                _manifest = manifest
+
+    return _manifest
+
+
+def source_unchanged(path: str, mtime) -> bool:
+    """
+    Returns whether a source file is as it was when the artifacts were built.
+
+    :param path: The path of the source file.
+    :param mtime: Its modification time when the artifacts were built, None if it did not exist.
+    """
+
+    if mtime is None:
+        return not exists(path)
+
+    return exists(path) and getmtime(path) <= mtime
+
+
+def asset_path(path: str) -> str:
+    """
+    Returns the path from which an asset is loaded, its built artifact if there is one.
+
+    | Note:
+    - Images are loaded from the texture atlas, e.g. "atlas://assets/build/images/eyes".
+    - Fixed-string fonts are loaded subset to the glyphs they render.
+    - Sounds are loaded decoded to WAV.
+
+    :param path: The path of the source asset, e.g. "assets/images/eyes.png".
+    """
+
+    manifest = load_manifest()
+    if not manifest:
+        return path
+
+    if path.startswith("assets/images/"):
+        name = splitext(basename(path))[0]
+        return f"atlas://{BUILD_DIR}/{ATLAS_NAME}/{name}" if name in manifest["images"] else path
+
+    return manifest["artifacts"].get(path, path)
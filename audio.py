@@ -0,0 +1,403 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import sys
+import wave
+import numpy as np
+from io import BytesIO
+from os.path import exists
+from queue import Queue
+from statistics import median
+from collections import deque
+from threading import Thread, Lock
+from time import perf_counter
+from datetime import datetime, time
+from asset_loader import asset_path
+from reminder_types import registry
+from config import DATA_DIR
+
+# Sound of each event, a WAV file named after the event in `USER_SOUND_DIR` replaces it
+DEFAULT_SOUNDS = {reminder_type.name: reminder_type.sound for reminder_type in registry.all}
+USER_SOUND_DIR = f"{DATA_DIR}/sounds"
+
+
+# <<< PCM SOUNDS >>>
+
+class PCMSound:
+    """
+    Sound decoded to 16-bit PCM samples.
+    """
+
+    def __init__(self, samples: np.ndarray, rate: int, channels: int) -> None:
+        self.samples = samples
+        self.rate = rate
+        self.channels = channels
+
+    @classmethod
+    def from_wav(cls, path: str) -> "PCMSound":
+        """
+        Decodes a 16-bit PCM WAV file.
+
+        :raises ValueError: If the file is not a 16-bit PCM WAV file.
+        """
+
+        try:
+            with wave.open(path, "rb") as file:
+                if file.getsampwidth() != 2:
+                    raise ValueError(f"{path} is not a 16-bit PCM WAV file")
+                return cls(np.frombuffer(file.readframes(file.getnframes()), "<i2"), file.getframerate(),
+                           file.getnchannels())
+        except (wave.Error, EOFError) as error:
+            raise ValueError(f"{path} is not a PCM WAV file: {error}")
+
+    @classmethod
+    def silence(cls, seconds: float = 0.02, rate: int = 44100, channels: int = 1) -> "PCMSound":
+        return cls(np.zeros(int(seconds * rate) * channels, "<i2"), rate, channels)
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.channels / self.rate
+
+    def scaled(self, volume: float) -> "PCMSound":
+        """
+        Returns the sound with its samples scaled by a volume from 0 to 1.
+        """
+
+        if volume >= 1:
+            return self
+
+        return PCMSound((self.samples * volume).astype("<i2"), self.rate, self.channels)
+
+    def to_wav(self) -> bytes:
+        buffer = BytesIO()
+        with wave.open(buffer, "wb") as file:
+            file.setnchannels(self.channels)
+            file.setsampwidth(2)
+            file.setframerate(self.rate)
+            file.writeframes(self.samples.tobytes())
+
+        return buffer.getvalue()
+
+
+# <<< BACKENDS >>>
+
+class AudioBackend:
+    """
+    Plays sounds through the audio output of the operating system.
+
+    Note: Blocking backends are played from the audio engine's worker thread, the others from the calling thread.
+    """
+
+    blocking = False
+
+    def load(self, path: str):
+        """
+        Loads and decodes a sound file once.
+
+        :return: The decoded sound passed to `play`.
+        """
+
+        raise NotImplementedError
+
+    def play(self, sound, volume: float) -> float:
+        """
+        Starts playing a loaded sound.
+
+        :param sound: A sound returned by `load`.
+        :param volume: The volume from 0 to 1.
+        :return: The `perf_counter` time at which the playback started.
+        """
+
+        raise NotImplementedError
+
+    def warm(self) -> None:
+        """
+        Wakes the audio output up ahead of a reminder, so that its sound starts without device warm-up.
+        """
+
+
+class WinsoundBackend(AudioBackend):
+    """
+    Windows audio output through `winsound`, playing PCM WAV data from memory.
+
+    | Note:
+    - The WAV data of each (sound, volume) pair is encoded once.
+    - `winsound` cannot play from memory asynchronously, so `play` returns once the sound has finished and the
+      playback is taken to have started one sound duration earlier.
+    """
+
+    blocking = True
+
+    def __init__(self) -> None:
+        import winsound  # imported here as it is only available on Windows
+
+        self.winsound = winsound
+        self.silence = PCMSound.silence().to_wav()
+        self._wav_data = {}
+
+    def load(self, path: str) -> PCMSound:
+        return PCMSound.from_wav(path)
+
+    def play(self, sound: PCMSound, volume: float) -> float:
+        key = (id(sound), volume)
+        if key not in self._wav_data:
+            self._wav_data[key] = sound.scaled(volume).to_wav()
+
+        self.winsound.PlaySound(self._wav_data[key], self.winsound.SND_MEMORY | self.winsound.SND_NODEFAULT)
+        return perf_counter() - sound.duration
+
+    def warm(self) -> None:
+        self.winsound.PlaySound(self.silence, self.winsound.SND_MEMORY | self.winsound.SND_NODEFAULT)
+
+
+class KivyAudioBackend(AudioBackend):
+    """
+    Audio output through Kivy's audio provider.
+
+    Note: The provider decodes the sound files itself, the WAV files decoded by build_assets.py when they exist
+    (see `asset_path`) and the MP3 sources otherwise. Playing decoded PCM from memory is only possible with
+    `winsound`, Python has no portable audio output of its own.
+    """
+
+    def load(self, path: str):
+        from kivy.core.audio import SoundLoader  # imported on first use as it initializes the audio provider
+
+        sound = SoundLoader.load(path)
+        if sound is None:
+            raise ValueError(f"{path} cannot be loaded by the audio provider")
+
+        return sound
+
+    def play(self, sound, volume: float) -> float:
+        sound.stop()
+        sound.volume = volume
+        sound.play()  # returns once the provider has started the playback
+        return perf_counter()
+
+
+class NullAudioBackend(AudioBackend):
+    """
+    Keeps played sounds in memory instead of playing them, for tests and headless runs.
+    """
+
+    def __init__(self) -> None:
+        self.played = []
+        self.warmed = 0
+
+    def load(self, path: str) -> str:
+        return path
+
+    def play(self, sound: str, volume: float) -> float:
+        self.played.append((sound, volume))
+        return perf_counter()
+
+    def warm(self) -> None:
+        self.warmed += 1
+
+
+def create_audio_backend(name: str = "auto") -> AudioBackend:
+    """
+    Creates an audio backend.
+
+    Note: Sounds are only played as PCM decoded in memory by `winsound`, on Windows. Elsewhere, and when the WAV
+    files have not been built, "auto" falls back to Kivy, whose provider decodes the files (MP3 without a build).
+
+    :param name: "winsound", "kivy", "null" or "auto" to use `winsound` on Windows when the default sounds have been
+                 decoded to WAV by build_assets.py, Kivy otherwise.
+    :return: The audio backend.
+    """
+
+    if name == "auto":
+        decoded = all(asset_path(path).endswith(".wav") for path in DEFAULT_SOUNDS.values())
+        name = "winsound" if sys.platform == "win32" and decoded else "kivy"
+
+    return {"winsound": WinsoundBackend, "kivy": KivyAudioBackend, "null": NullAudioBackend}[name]()
+
+
+# <<< AUDIO ENGINE >>>
+
+def parse_quiet_hours(value: str) -> tuple:
+    """
+    Parses a quiet hours setting such as "22:00 - 07:00".
+
+    :return: A tuple of (start, end) times, None for "Off" or an empty value.
+    """
+
+    if not value or value == "Off":
+        return None
+
+    start, end = (part.strip() for part in value.split("-"))
+    return time.fromisoformat(start), time.fromisoformat(end)
+
+
+def in_quiet_hours(moment: time, quiet_hours: tuple) -> bool:
+    """
+    Returns whether a time of day falls in the quiet hours, which may span midnight.
+    """
+
+    if quiet_hours is None:
+        return False
+
+    start, end = quiet_hours
+    return start <= moment < end if start <= end else moment >= start or moment < end
+
+
+class AudioEngine:
+    """
+    Plays the sound of each reminder event, decoded once and kept in memory.
+
+    | Note:
+    - Sounds are decoded on the first `warm` or `play`, `warm` also wakes the audio output up shortly before a
+      reminder is due.
+    - No sound is played in the quiet hours or at volume 0.
+    - `latencies` keeps the last measured delays between a play request and the start of the playback, as reported
+      by the backend once it has started playing.
+    """
+
+    def __init__(self, backend: AudioBackend, sounds: dict = None, volume: float = 1.0, quiet_hours: tuple = None,
+                 user_sound_dir: str = USER_SOUND_DIR) -> None:
+        """
+        :param backend: The audio backend.
+        :param sounds: Sound file of each event type. Defaults to `DEFAULT_SOUNDS`.
+        :param volume: The volume from 0 to 1.
+        :param quiet_hours: (start, end) times during which no sound is played. Defaults to None.
+        :param user_sound_dir: Directory of the user-supplied "<event type>.wav" sounds.
+        """
+
+        self.backend = backend
+        self.sounds = dict(DEFAULT_SOUNDS if sounds is None else sounds)
+        self.volume = volume
+        self.quiet_hours = quiet_hours
+        self.user_sound_dir = user_sound_dir
+
+        self.latencies = deque(maxlen=100)  # milliseconds
+
+        self._loaded = {}  # path -> decoded sound, None if it failed to load
+        self._queue = Queue()
+        self._worker = None
+        self._lock = Lock()
+
+    def sound_path(self, event_type: str) -> str:
+        """
+        Returns the sound file of an event, the user-supplied one if it exists.
+        """
+
+        user_sound = f"{self.user_sound_dir}/{event_type}.wav"
+        return user_sound if exists(user_sound) else asset_path(self.sounds[event_type])
+
+    def load(self, event_type: str):
+        """
+        Returns the decoded sound of an event, decoding it on first use.
+        """
+
+        path = self.sound_path(event_type)
+        with self._lock:
+            if path not in self._loaded:
+                try:
+                    self._loaded[path] = self.backend.load(path)
+                except (OSError, ValueError):
+                    self._loaded[path] = None
+
+            return self._loaded[path]
+
+    def preload(self) -> None:
+        for event_type in self.sounds:
+            self.load(event_type)
+
+    def warm(self) -> None:
+        """
+        Decodes the sounds if needed and wakes the audio output up, called shortly before a reminder is due.
+        """
+
+        if self.backend.blocking:
+            self._submit(lambda: (self.preload(), self.backend.warm()))
+        else:
+            self.preload()
+            self.backend.warm()
+
+    def play(self, event_type: str, now: datetime = None) -> bool:
+        """
+        Plays the sound of an event.
+
+        :param event_type: The type of the event.
+        :param now: The current datetime, compared with the quiet hours. Defaults to the current time.
+        :return: False if no sound is played, because of the quiet hours, the volume or an unloadable sound.
+        """
+
+        now = datetime.now() if now is None else now
+        if self.volume <= 0 or in_quiet_hours(now.time(), self.quiet_hours):
+            return False
+
+        requested = perf_counter()
+
+        def start() -> None:
+            sound = self.load(event_type)
+            if sound is None:
+                return
+
+            started = self.backend.play(sound, self.volume)
+            self.latencies.append((started - requested) * 1000)
+
+        if self.backend.blocking:
+            self._submit(start)
+        else:
+            start()
+
+        return True
+
+    def latency_stats(self) -> dict:
+        """
+        Returns the last, median and maximum playback-start latency in milliseconds.
+        """
+
+        if not self.latencies:
+            return {"count": 0}
+
+        return {"count": len(self.latencies), "last_ms": round(self.latencies[-1], 2),
+                "median_ms": round(median(self.latencies), 2), "max_ms": round(max(self.latencies), 2)}
+
+    def wait(self) -> None:
+        """
+        Waits until the sounds queued for the worker thread have started playing.
+        """
+
+        self._queue.join()
+
+    def _submit(self, task) -> None:
+        with self._lock:
+            if self._worker is None:
+                self._worker = Thread(target=self._run, daemon=True)
+                self._worker.start()
+
+        self._queue.put(task)
+
+    def _run(self) -> None:
+        while True:
+            task = self._queue.get()
+            try:
+                task()
+            except Exception:  # NOQA, a failing audio device must not stop the worker
+                pass
+            finally:
+                self._queue.task_done()
+
+
+# <<< COMMAND LINE >>>
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Plays the reminder sounds and reports their playback-start latency.")
+    parser.add_argument("--backend", default="auto", choices=("auto", "winsound", "kivy", "null"))
+    parser.add_argument("--runs", type=int, default=5, help="plays per event")
+    parser.add_argument("--cold", action="store_true", help="do not warm the audio output before playing")
+    arguments = parser.parse_args()
+
+    engine = AudioEngine(create_audio_backend(arguments.backend))
+    for event in engine.sounds:
+        for _ in range(arguments.runs):
+            if not arguments.cold:
+                engine.warm()
+            engine.play(event)
+            engine.wait()
+
+    print(engine.latency_stats())
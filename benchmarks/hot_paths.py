@@ -0,0 +1,300 @@
+# HOT PATH BENCHMARKS
+# Measures the storage, scheduling and export hot paths headless and saves the results per commit in
+# benchmarks/results/<commit>.json, so that commits can be compared with --compare.
+# Run from the repository root: python benchmarks/hot_paths.py
+
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import sys
+from os import makedirs
+from os.path import dirname, abspath, join, exists
+from json import dump, load
+from platform import platform, python_version
+from statistics import median
+from subprocess import run, PIPE
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from datetime import date, datetime
+from random import Random
+from argparse import ArgumentParser
+
+ROOT = dirname(dirname(abspath(__file__)))
+RESULTS_DIR = join(ROOT, "benchmarks", "results")
+sys.path.insert(0, ROOT)
+
+from rollups import RollupIndex, RollupLog  # NOQA
+from reminder_types import registry  # NOQA
+from quote_store import QuoteStore  # NOQA
+from log_export import LogExporter  # NOQA
+from history_columns import HistoryColumns  # NOQA
+from history_sqlite import SQLiteStorage  # NOQA
+from buffered_store import BufferedStore, PickleFileStore  # NOQA
+from history_log import HistoryLog, SCREEN_TIME_SCHEMA, EVENT_COUNT_SCHEMA  # NOQA
+from reminders import SlotAllocator, add_screen_time, add_event_count  # NOQA
+
+HISTORY_SIZES = {"1d": 1, "1y": 365, "5y": 5 * 365}
+TODAY = date(2024, 1, 1)
+
+
+# <<< HELPERS >>>
+
+def measure(function, repeat: int) -> dict:
+    """
+    Calls a function `repeat` times and returns its latency statistics in microseconds.
+    """
+
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        function()
+        timings.append((perf_counter() - started) * 1_000_000)
+
+    timings.sort()
+    return {"median_us": round(median(timings), 2), "p99_us": round(timings[int(len(timings) * 0.99) - 1], 2),
+            "min_us": round(timings[0], 2), "runs": repeat}
+
+
+def synthetic_history(days: int, end: date = TODAY, seed: int = 0):
+    """
+    Yields (date, screen time, event counts) for `days` consecutive days ending the day before `end`.
+    """
+
+    random = Random(seed)
+    for ordinal in range(end.toordinal() - days, end.toordinal()):
+        water_count = random.randint(0, 12)
+        yield (str(date.fromordinal(ordinal)), {"minutes": random.randint(0, 900)},
+               {"eyes": random.randint(0, 20), "water": [water_count, water_count * 200],
+                "exercise": random.randint(0, 8)})
+
+
+def open_stores(directory: str, backend: str, days: int) -> tuple:
+    """
+    Opens buffered history and rollup stores of a storage backend filled with `days` days of synthetic history.
+
+    :return: A tuple of (screen time history, event count history, rollup index).
+    """
+
+    history = list(synthetic_history(days))
+
+    if backend == "sqlite":
+        database = SQLiteStorage(join(directory, "wellbeing.db"))
+        screen_time_history = database.screen_time_history
+        event_count_history = database.event_count_history
+        rollup_store = database.rollup_store
+    else:
+        screen_time_history = HistoryLog(join(directory, "screen_time_history"), SCREEN_TIME_SCHEMA)
+        event_count_history = HistoryLog(join(directory, "event_count_history"), EVENT_COUNT_SCHEMA)
+        rollup_store = RollupLog(join(directory, "rollups.log"))
+
+    screen_time_history.put_many((day, screen_time) for day, screen_time, _ in history)
+    event_count_history.put_many((day, event_counts) for day, _, event_counts in history)
+
+    rollups = RollupIndex(BufferedStore(rollup_store))
+    rollups.rebuild(HistoryColumns.from_stores(screen_time_history, SCREEN_TIME_SCHEMA,
+                                               event_count_history, EVENT_COUNT_SCHEMA))
+    rollups.store.flush()
+
+    return BufferedStore(screen_time_history), BufferedStore(event_count_history), rollups
+
+
+# <<< BENCHMARKS >>>
+
+def bench_screen_time(backend: str, repeat: int) -> dict:
+    """
+    Per-minute screen time update (`HomeScreen.update_screen_time`), buffered and followed by a flush, at several
+    history lengths.
+    """
+
+    results = {}
+    for label, days in HISTORY_SIZES.items():
+        with TemporaryDirectory() as directory:
+            screen_time_history, _, rollups = open_stores(directory, backend, days)
+
+            def write_minute(flush: bool) -> None:
+                add_screen_time(screen_time_history, rollups, TODAY)
+                if flush:
+                    screen_time_history.flush()
+                    rollups.store.flush()
+
+            results[f"{label}_buffered"] = measure(lambda: write_minute(False), repeat)
+            results[f"{label}_flushed"] = measure(lambda: write_minute(True), repeat)
+
+    return results
+
+
+def bench_event_count(backend: str, repeat: int) -> dict:
+    """
+    Reminder answered with "done" (`HomeScreen.update_event_count_db`) on a year of history, including the flush.
+    """
+
+    with TemporaryDirectory() as directory:
+        _, event_count_history, rollups = open_stores(directory, backend, 365)
+        event_types = iter(registry.names() * repeat)
+
+        def count_event() -> None:
+            add_event_count(event_count_history, rollups, TODAY, next(event_types), "200")
+            event_count_history.flush()
+            rollups.store.flush()
+
+        return {"1y_flushed": measure(count_event, repeat)}
+
+
+def bench_reminder_timing(repeat: int) -> dict:
+    """
+    Reminder timing calculation (`ReminderScreen.set_reminder_timing`) when many reminders share the same
+    frequency, so every new timing collides with the ones placed before it.
+    """
+
+    now = datetime(2024, 1, 1, 9, 0)
+    results = {}
+    for reminders in (3, 50, 300, 3000):
+        def plan_all() -> None:
+            allocator = SlotAllocator()
+            for index in range(reminders):
+                allocator.place(index, now, 20)
+
+        results[f"{reminders}_reminders"] = measure(plan_all, max(repeat // reminders, 5))
+
+    return results
+
+
+def bench_quote_db(repeat: int) -> dict:
+    """
+    Fetched quote saved as shown (`HomeScreen.update_quote_db`) with 10k saved quotes, for new and known quotes.
+    """
+
+    with TemporaryDirectory() as directory:
+        quote_store = QuoteStore(PickleFileStore(join(directory, "quotes.dat")), cap=10_000)
+        for index in range(10_000):
+            quote_store.add(f"Saved quote number {index}.", f"Author {index % 500}")
+        quote_store.flush()
+
+        new_quotes = iter(range(repeat))
+        known_quotes = iter([(f"Saved quote number {index}.", f"Author {index % 500}")
+                             for index in Random(0).sample(range(10_000), repeat)])
+
+        def show_and_flush() -> None:
+            quote_store.mark_shown(next(iter(quote_store.quotes)))
+            quote_store.flush()
+
+        results = {
+            "10k_new": measure(lambda: quote_store.add(f"Fetched quote {next(new_quotes)}.", "Author", shown=1),
+                               repeat),
+            "10k_known": measure(lambda: quote_store.add(*next(known_quotes), shown=1), repeat),
+            "10k_flush": measure(show_and_flush, max(repeat // 100, 5))
+        }
+        quote_store.close()
+
+    return results
+
+
+def bench_log_export(backend: str, repeat: int) -> dict:
+    """
+    Reminder logs export (`SettingsScreen.save_reminder_logs`) of 10 years of history, run synchronously.
+    """
+
+    with TemporaryDirectory() as directory:
+        screen_time_history, event_count_history, _ = open_stores(directory, backend, 10 * 365)
+
+        if backend == "sqlite":
+            def load_columns() -> HistoryColumns:
+                return HistoryColumns.from_stores(screen_time_history, SCREEN_TIME_SCHEMA,
+                                                  event_count_history, EVENT_COUNT_SCHEMA)
+        else:
+            screen_time_history.store.close()
+            event_count_history.store.close()
+
+            def load_columns() -> HistoryColumns:
+                return HistoryColumns.load(join(directory, "screen_time_history"), SCREEN_TIME_SCHEMA,
+                                           join(directory, "event_count_history"), EVENT_COUNT_SCHEMA)
+
+        exporter = LogExporter(load_columns, join(directory, "logs.csv"))
+        return {"10y": measure(exporter.run, max(repeat // 100, 3))}
+
+
+def bench_cold_import(repeat: int) -> dict:
+    """
+    Import time of the application modules in a fresh interpreter, without Kivy's window.
+    """
+
+    modules = "reminders, scheduler, history_log, history_sqlite, buffered_store, history_columns, analytics, " \
+              "rollups, quote_store, log_export"
+    code = f"from time import perf_counter; started = perf_counter(); import {modules}; " \
+           f"print((perf_counter() - started) * 1000)"
+
+    timings = []
+    for _ in range(max(repeat // 100, 3)):
+        result = run([sys.executable, "-c", code], cwd=ROOT, stdout=PIPE, stderr=PIPE, text=True, check=True)
+        timings.append(float(result.stdout))
+
+    return {"headless_modules": {"median_ms": round(median(timings), 1), "min_ms": round(min(timings), 1),
+                                 "runs": len(timings)}}
+
+
+# <<< RESULTS >>>
+
+def current_commit() -> str:
+    """
+    Returns the short hash of the checked out commit, suffixed with "-dirty" if the tree has uncommitted changes.
+    """
+
+    def git(*args) -> str:
+        return run(["git", *args], cwd=ROOT, stdout=PIPE, stderr=PIPE, text=True).stdout.strip()
+
+    commit = git("rev-parse", "--short", "HEAD") or "unknown"
+    return f"{commit}-dirty" if git("status", "--porcelain", "--untracked-files=no") else commit
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict) and "runs" not in value:
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value.get("median_us", value.get("median_ms"))
+
+    return flat
+
+
+def compare(results: dict, baseline: dict) -> None:
+    current, previous = flatten(results), flatten(baseline)
+    for name, value in current.items():
+        if name in previous and previous[name]:
+            print(f"{name:40} {previous[name]:12.2f} -> {value:12.2f}   {value / previous[name]:6.2f}x")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmarks Wellbeing's storage, scheduling and export hot paths.")
+    parser.add_argument("--repeat", type=int, default=1000, help="calls per latency measurement")
+    parser.add_argument("--backend", choices=("log", "sqlite", "both"), default="both", help="storage backend")
+    parser.add_argument("--compare", metavar="COMMIT", help="compare with the saved results of a commit")
+    parser.add_argument("--no-save", action="store_true", help="do not save the results")
+    arguments = parser.parse_args()
+
+    backends = ("log", "sqlite") if arguments.backend == "both" else (arguments.backend,)
+    results = {
+        "screen_time": {backend: bench_screen_time(backend, arguments.repeat) for backend in backends},
+        "event_count": {backend: bench_event_count(backend, arguments.repeat) for backend in backends},
+        "reminder_timing": bench_reminder_timing(arguments.repeat),
+        "quote_db": bench_quote_db(arguments.repeat),
+        "log_export": {backend: bench_log_export(backend, arguments.repeat) for backend in backends},
+        "cold_import": bench_cold_import(arguments.repeat)
+    }
+
+    for name, value in flatten(results).items():
+        print(f"{name:40} {value:12.2f}")
+
+    commit = current_commit()
+    if not arguments.no_save:
+        makedirs(RESULTS_DIR, exist_ok=True)
+        with open(join(RESULTS_DIR, f"{commit}.json"), "w") as file:
+            dump({"commit": commit, "python": python_version(), "platform": platform(), "results": results},
+                 file, indent=4)
+
+    if arguments.compare:
+        baseline_path = join(RESULTS_DIR, f"{arguments.compare}.json")
+        if not exists(baseline_path):
+            sys.exit(f"no saved results for {arguments.compare}")
+
+        with open(baseline_path) as file:
+            compare(results, load(file)["results"])
@@ -0,0 +1,55 @@
+# IDLE BENCHMARK
+# Launches the application hidden, as it is most of the time, and reports its clock wakeups, drawn frames and CPU time
+# while idling, with and without the low-power hidden mode.
+# Run from the repository root while no other instance of Wellbeing is running: python benchmarks/idle.py
+# The application runs on a temporary data directory holding a copy of the shipped quotes, "data/" is left untouched.
+
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import sys
+from os import environ
+from os.path import exists
+from re import findall
+from shutil import copy
+from tempfile import TemporaryDirectory
+from subprocess import run, PIPE
+from argparse import ArgumentParser
+
+
+# <<< BENCHMARK >>>
+
+def measure_idle(low_power: bool, seconds: float, data_dir: str) -> dict:
+    """
+    Launches the application once and returns what it reports after idling hidden for `seconds`.
+
+    :param low_power: Whether to use the low-power hidden mode.
+    :param seconds: Seconds of idling measured, after 5 seconds of startup.
+    :param data_dir: Data directory of the application.
+    :return: A dict with "ticks" (clock wakeups), "draws" (frames drawn) and "cpu_ms" (CPU time of the process).
+    """
+
+    env = dict(environ, WELLBEING_IDLE_BENCHMARK=str(seconds), WELLBEING_LOW_POWER="1" if low_power else "0",
+               WELLBEING_DATA_DIR=data_dir)
+    result = run([sys.executable, "main.py"], env=env, stdout=PIPE, stderr=PIPE, text=True, timeout=seconds + 60)
+
+    values = dict(findall(r"idle_(\w+)=([\d.]+)", result.stdout))
+    if "ticks" not in values:
+        raise RuntimeError(f"application did not report its idle wakeups:\n{result.stderr[-2000:]}")
+
+    return {"ticks": int(values["ticks"]), "draws": int(values["draws"]), "cpu_ms": float(values["cpu_ms"])}
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Measures Wellbeing's wakeups and CPU time while hidden.")
+    parser.add_argument("--seconds", type=float, default=30, help="seconds of idling measured per mode")
+    arguments = parser.parse_args()
+
+    with TemporaryDirectory() as directory:
+        if exists("data/quotes.dat"):
+            copy("data/quotes.dat", directory)
+
+        for mode in ("normal", "low-power"):
+            idle = measure_idle(mode == "low-power", arguments.seconds, directory)
+            print(f"{mode:9} {idle['ticks'] / arguments.seconds:8.1f} wakeups/s "
+                  f"{idle['draws'] / arguments.seconds:8.1f} frames/s "
+                  f"{idle['cpu_ms'] / arguments.seconds:8.2f} ms CPU/s")
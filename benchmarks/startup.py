@@ -0,0 +1,65 @@
+# STARTUP BENCHMARK
+# Launches the application repeatedly in startup benchmark mode and reports import time and time-to-tray.
+# Run from the repository root while no other instance of Wellbeing is running: python benchmarks/startup.py
+# The application runs on a temporary data directory holding a copy of the shipped quotes, "data/" is left untouched.
+
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import sys
+from os import environ
+from os.path import exists
+from re import findall
+from shutil import copy
+from tempfile import TemporaryDirectory
+from statistics import median
+from subprocess import run, PIPE
+from time import perf_counter
+from argparse import ArgumentParser
+
+
+# <<< BENCHMARK >>>
+
+def measure_startup(lazy: bool, data_dir: str, timeout: float = 60) -> dict:
+    """
+    Launches the application once and returns its startup timings.
+
+    :param lazy: Whether to use the lazy startup mode.
+    :param data_dir: Data directory of the application.
+    :param timeout: Seconds after which the launch is considered failed.
+    :return: A dict with "import_ms", "tray_ms" (both measured by the application) and "process_ms" (wall time of
+             the whole process, including interpreter start and exit).
+    """
+
+    env = dict(environ, WELLBEING_STARTUP_BENCHMARK="1", WELLBEING_LAZY_STARTUP="1" if lazy else "0",
+               WELLBEING_DATA_DIR=data_dir)
+
+    started = perf_counter()
+    result = run([sys.executable, "main.py"], env=env, stdout=PIPE, stderr=PIPE, text=True, timeout=timeout)
+    process_ms = (perf_counter() - started) * 1000
+
+    timings = dict(findall(r"startup_(\w+)_ms=([\d.]+)", result.stdout))
+    if "tray" not in timings:
+        raise RuntimeError(f"application did not report its startup timings:\n{result.stderr[-2000:]}")
+
+    return {"import_ms": float(timings["import"]), "tray_ms": float(timings["tray"]), "process_ms": process_ms}
+
+
+def summarize(runs: list) -> dict:
+    return {key: {"median": round(median(run_[key] for run_ in runs), 1),
+                  "min": round(min(run_[key] for run_ in runs), 1)} for key in runs[0]}
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Measures Wellbeing's import time and time-to-tray.")
+    parser.add_argument("--runs", type=int, default=5, help="number of launches per startup mode")
+    parser.add_argument("--eager", action="store_true", help="also measure the eager startup mode for comparison")
+    arguments = parser.parse_args()
+
+    with TemporaryDirectory() as directory:
+        if exists("data/quotes.dat"):
+            copy("data/quotes.dat", directory)
+
+        for mode in (("lazy", "eager") if arguments.eager else ("lazy",)):
+            runs = [measure_startup(mode == "lazy", directory) for _ in range(arguments.runs)]
+            for key, values in summarize(runs).items():
+                print(f"{mode:5} {key:10} median {values['median']:8.1f} ms   min {values['min']:8.1f} ms")
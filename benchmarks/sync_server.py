@@ -0,0 +1,198 @@
+# SYNC SERVER BENCHMARK
+# Starts sync_server.py on a temporary database, uploads the history of many simulated clients over keep-alive
+# connections while querying team and day totals, and reports the ingest throughput and query latency.
+# Run from the repository root: python benchmarks/sync_server.py
+
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import sys
+import asyncio
+from gzip import compress
+from json import dumps, loads
+from os.path import dirname, abspath, join
+from random import Random
+from subprocess import Popen, PIPE
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from datetime import date, timedelta
+from argparse import ArgumentParser
+
+ROOT = dirname(dirname(abspath(__file__)))
+START_DAY = date(2024, 1, 1)
+
+
+# <<< HTTP CLIENT >>>
+
+class Connection:
+    """
+    Keep-alive HTTP/1.1 connection sending requests one at a time.
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method: str, path: str, body: bytes = b"", gzip: bool = False) -> tuple:
+        """
+        :return: A tuple of (status, decoded JSON response).
+        """
+
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        headers = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(body)}\r\n"
+        if gzip:
+            headers += "Content-Type: application/json\r\nContent-Encoding: gzip\r\n"
+        self.writer.write(headers.encode() + b"\r\n" + body)
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while (line := await self.reader.readline()) != b"\r\n":
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+
+        return status, loads(await self.reader.readexactly(length))
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+# <<< LOAD GENERATOR >>>
+
+def client_batches(client: int, teams: int, days: int, batch_size: int, seed: int) -> list:
+    """
+    Returns the compressed upload batches of a simulated client, one record per day as uploaded by sync_client.py.
+    """
+
+    rng = Random(seed * 1_000_003 + client)
+    records = [{"seq": index + 1, "day": (START_DAY + timedelta(days=index)).isoformat(),
+                "deltas": {"minutes": rng.randint(30, 600), "eyes": rng.randint(0, 20),
+                           "water_count": rng.randint(0, 8), "water_quantity": rng.randint(0, 8) * 200,
+                           "exercise": rng.randint(0, 8)}}
+               for index in range(days)]
+
+    return [compress(dumps({"client_id": f"client-{client}", "team": f"team-{client % teams}",
+                            "records": records[start:start + batch_size]}).encode())
+            for start in range(0, days, batch_size)]
+
+
+async def upload(host: str, port: int, queue: asyncio.Queue) -> int:
+    """
+    Uploads the batches of the queued clients over a single connection.
+
+    :return: The number of batches uploaded.
+    """
+
+    connection = Connection(host, port)
+    uploaded = 0
+    while not queue.empty():
+        for batch in queue.get_nowait():
+            status, response = await connection.request("POST", "/ingest", batch, gzip=True)
+            if status != 200:
+                raise RuntimeError(f"ingest failed: {response}")
+            uploaded += 1
+
+    connection.close()
+    return uploaded
+
+
+async def query(host: str, port: int, teams: int, days: int, stopped: asyncio.Event, latencies: list,
+                seed: int) -> None:
+    """
+    Queries team totals over a random month and day totals of random days until stopped.
+    """
+
+    rng = Random(seed)
+    connection = Connection(host, port)
+    while not stopped.is_set():
+        day = START_DAY + timedelta(days=rng.randrange(days))
+        if rng.random() < 0.5:
+            path = f"/teams/team-{rng.randrange(teams)}?start={day.isoformat()}&end={(day + timedelta(days=29))}"
+        else:
+            path = f"/days/{day.isoformat()}"
+
+        started = perf_counter()
+        status, response = await connection.request("GET", path)
+        latencies.append((perf_counter() - started) * 1000)
+        if status != 200:
+            raise RuntimeError(f"query failed: {response}")
+
+    connection.close()
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return round(values[min(int(len(values) * fraction), len(values) - 1)], 3) if values else 0.0
+
+
+async def run_benchmark(host: str, port: int, arguments) -> dict:
+    queue = asyncio.Queue()
+    for client in range(arguments.clients):
+        queue.put_nowait(client_batches(client, arguments.teams, arguments.days, arguments.batch_size, arguments.seed))
+
+    stopped = asyncio.Event()
+    latencies = []
+    queries = [asyncio.create_task(query(host, port, arguments.teams, arguments.days, stopped, latencies,
+                                         arguments.seed + index)) for index in range(arguments.query_connections)]
+
+    started = perf_counter()
+    batches = sum(await asyncio.gather(*(upload(host, port, queue) for _ in range(arguments.connections))))
+    elapsed = perf_counter() - started
+
+    stopped.set()
+    await asyncio.gather(*queries)
+    ingest_latencies, latencies[:] = list(latencies), []
+
+    # Queries once the ingestion is over
+    stopped.clear()
+    queries = [asyncio.create_task(query(host, port, arguments.teams, arguments.days, stopped, latencies,
+                                         arguments.seed + index)) for index in range(arguments.query_connections)]
+    await asyncio.sleep(2)
+    stopped.set()
+    await asyncio.gather(*queries)
+
+    connection = Connection(host, port)
+    _, stats = await connection.request("GET", "/stats")
+    connection.close()
+
+    records = arguments.clients * arguments.days
+    return {
+        "clients": arguments.clients, "records": records, "batches": batches, "ingest_s": round(elapsed, 2),
+        "records_per_s": round(records / elapsed), "batches_per_s": round(batches / elapsed),
+        "query_during_ingest": {"count": len(ingest_latencies), "p50_ms": percentile(ingest_latencies, 0.5),
+                                "p99_ms": percentile(ingest_latencies, 0.99)},
+        "query_idle": {"count": len(latencies), "p50_ms": percentile(latencies, 0.5),
+                       "p99_ms": percentile(latencies, 0.99)},
+        "server": stats
+    }
+
+
+# <<< COMMAND LINE >>>
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmarks the ingestion and queries of sync_server.py.")
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--days", type=int, default=90, help="days of history uploaded per client")
+    parser.add_argument("--batch-size", type=int, default=30, help="records per batch")
+    parser.add_argument("--connections", type=int, default=200, help="concurrent upload connections")
+    parser.add_argument("--query-connections", type=int, default=4, help="concurrent query connections")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    with TemporaryDirectory() as directory:
+        server = Popen([sys.executable, join(ROOT, "sync_server.py"), "--port", "0", "--database",
+                        join(directory, "server.db")], cwd=ROOT, stdout=PIPE, text=True)
+        try:
+            address = server.stdout.readline().split("http://")[1].strip()
+            server_host, server_port = address.rsplit(":", 1)
+            results = asyncio.run(run_benchmark(server_host, int(server_port), arguments))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(dumps(results, indent=4))
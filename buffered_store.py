@@ -0,0 +1,159 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import pickle
+from os import fsync, replace
+from os.path import exists
+from threading import RLock
+
+
+# <<< PICKLE FILE STORE >>>
+
+class PickleFileStore:
+    """
+    Key-value store saved as a pickled dictionary, in the same file format as `DictStore`.
+
+    Note: The file is rewritten through a temporary file which is renamed over it, so it is never left half-written.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._data = {}
+
+        if exists(path):
+            with open(path, "rb") as file:
+                data = file.read()
+            if data:
+                self._data = pickle.loads(data)
+
+    def exists(self, key: str) -> bool:
+        return key in self._data
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, key: str):
+        return self._data[key]
+
+    def __setitem__(self, key: str, value) -> None:
+        self.put_many(((key, value),))
+
+    def keys(self) -> list:
+        return list(self._data.keys())
+
+    def put_many(self, items) -> None:
+        """
+        Stores several values and rewrites the file once.
+
+        :param items: An iterable of (key, value) pairs.
+        """
+
+        self._data.update(items)
+
+        with open(f"{self.path}.tmp", "wb") as file:
+            pickle.dump(self._data, file, protocol=2)  # protocol used by `DictStore`
+            file.flush()
+            fsync(file.fileno())
+        replace(f"{self.path}.tmp", self.path)
+
+
+# <<< BUFFERED STORE >>>
+
+class BufferedStore:
+    """
+    Write-coalescing wrapper around a store which keeps values in memory and writes changed keys in batches.
+
+    | Note:
+    - Reads are served from memory once a key has been read or written.
+    - Writes only mark the key dirty, `flush` hands all dirty keys to the wrapped store in one `put_many` call.
+    - `writes` counts the writes made to the buffer and `flushed_writes` those that reached the wrapped store, their
+      difference is the number of writes saved by coalescing.
+    """
+
+    def __init__(self, store) -> None:
+        """
+        :param store: The wrapped store, it must provide `exists`, `__getitem__`, `keys` and `put_many`.
+        """
+
+        self.store = store
+
+        self.writes = 0
+        self.flushed_writes = 0
+        self.flushes = 0
+
+        self._cache = {}
+        self._dirty = set()
+        self._lock = RLock()  # flushes may run on other threads, e.g. the tray icon's "Quit"
+
+    @property
+    def writes_saved(self) -> int:
+        return self.writes - self.flushed_writes - len(self._dirty)
+
+    def stats(self) -> dict:
+        return {"writes": self.writes, "flushed_writes": self.flushed_writes, "writes_saved": self.writes_saved,
+                "flushes": self.flushes}
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._dirty)
+
+    def exists(self, key: str) -> bool:
+        return key in self._cache or self.store.exists(key)
+
+    def __contains__(self, key: str) -> bool:
+        return self.exists(key)
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __getitem__(self, key: str):
+        if key not in self._cache:
+            self._cache[key] = self.store[key]
+
+        return self._cache[key]
+
+    def __setitem__(self, key: str, value) -> None:
+        with self._lock:
+            self._cache[key] = value
+            self._dirty.add(key)
+            self.writes += 1
+
+    def keys(self) -> list:
+        """
+        Returns the keys of the wrapped store together with the keys which have not been flushed yet.
+        """
+
+        with self._lock:
+            keys = set(self.store.keys()) | self._dirty
+
+        return sorted(keys)
+
+    def put_many(self, items) -> None:
+        for key, value in items:
+            self[key] = value
+
+    def flush(self) -> None:
+        """
+        Writes every dirty key to the wrapped store in a single batch.
+        """
+
+        with self._lock:
+            if not self._dirty:
+                return
+
+            self.store.put_many([(key, self._cache[key]) for key in sorted(self._dirty)])
+            self.flushed_writes += len(self._dirty)
+            self.flushes += 1
+            self._dirty.clear()
+
+    def close(self) -> None:
+        """
+        Flushes the dirty keys and closes the wrapped store if it can be closed.
+        """
+
+        self.flush()
+
+        if hasattr(self.store, "close"):
+            self.store.close()
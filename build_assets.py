@@ -0,0 +1,138 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+# Builds fast-loading artifacts of the assets into "assets/build/", loaded by asset_loader.py when present.
+# Run from the repository root after changing the strings of the interface or the assets: python build_assets.py
+# Requires fontTools (font subsetting), Pillow (texture atlas) and ffmpeg (sound decoding), missing ones are skipped.
+
+import re
+from glob import glob
+from json import dump
+from os import makedirs
+from os.path import getmtime, getsize, basename, splitext, exists
+from shutil import which
+from string import digits, ascii_letters, punctuation
+from subprocess import run
+from asset_loader import BUILD_DIR, MANIFEST_PATH, ATLAS_NAME
+from config import REMINDER_TYPES_PATH
+
+# Files whose strings are rendered with the subset fonts, including the reminder types of the registry
+STRING_SOURCES = ("wellbeing.kv", "main.py", "helpers.py", "reminder_types.py", REMINDER_TYPES_PATH)
+
+# Fonts which only render fixed strings (titles, headings, screen time). nunito.ttf is the default font and renders
+# quotes and user names, so it keeps every glyph, and kalam.ttf is not used by the interface.
+SUBSET_FONTS = ("cabin", "courgette", "sofia-sans", "kenia")
+
+
+# <<< BUILD STEPS >>>
+
+def used_characters(paths=STRING_SOURCES) -> str:
+    """
+    Returns the characters of every string literal of the given files, along with ASCII letters, digits and
+    punctuation so that formatted values (e.g. "Screen time: 2 hours") always render.
+
+    Note: Missing files are skipped, the reminder types file only exists once custom types are defined.
+    """
+
+    characters = set(digits + ascii_letters + punctuation + " ")
+    for path in filter(exists, paths):
+        with open(path, encoding="utf-8") as file:
+            for double_quoted, single_quoted in re.findall(r'"((?:[^"\\\n]|\\.)*)"|\'((?:[^\'\\\n]|\\.)*)\'',
+                                                           file.read()):
+                characters.update(double_quoted or single_quoted)
+
+    return "".join(sorted(characters))
+
+
+def subset_fonts(characters: str) -> dict:
+    """
+    Subsets the fixed-string fonts to the given characters.
+
+    :return: A dict of source font path -> subset font path.
+    """
+
+    from fontTools import subset  # build-time dependency only
+
+    options = subset.Options()
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+
+    artifacts = {}
+    for name in SUBSET_FONTS:
+        source, target = f"assets/fonts/{name}.ttf", f"{BUILD_DIR}/fonts/{name}.ttf"
+
+        font = subset.load_font(source, options)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(text=characters)
+        subsetter.subset(font)
+        subset.save_font(font, target, options)
+
+        artifacts[source] = target
+        print(f"{source}: {getsize(source) / 1024:.0f} KiB -> {getsize(target) / 1024:.0f} KiB")
+
+    return artifacts
+
+
+def build_atlas() -> list:
+    """
+    Packs every image of "assets/images/" into a single texture atlas, decoded once instead of once per image.
+
+    :return: The names of the packed images.
+    """
+
+    from kivy.atlas import Atlas  # requires Pillow
+
+    images = sorted(glob("assets/images/*.png"))
+    Atlas.create(f"{BUILD_DIR}/{ATLAS_NAME}", images, 1024)
+
+    print(f"assets/images: {len(images)} images -> {BUILD_DIR}/{ATLAS_NAME}.atlas")
+    return [splitext(basename(image))[0] for image in images]
+
+
+def decode_sounds() -> dict:
+    """
+    Decodes the MP3 sounds to 16-bit PCM WAV files, which are loaded without an MP3 decoder.
+
+    :return: A dict of source sound path -> decoded sound path.
+    """
+
+    artifacts = {}
+    for source in sorted(glob("assets/sounds/*.mp3")):
+        target = f"{BUILD_DIR}/sounds/{splitext(basename(source))[0]}.wav"
+        run(["ffmpeg", "-y", "-loglevel", "error", "-i", source, "-acodec", "pcm_s16le", target], check=True)
+
+        artifacts[source] = target
+        print(f"{source}: {getsize(source) / 1024:.0f} KiB -> {target}")
+
+    return artifacts
+
+
+# <<< COMMAND LINE >>>
+
+if __name__ == "__main__":
+    for directory in (BUILD_DIR, f"{BUILD_DIR}/fonts", f"{BUILD_DIR}/sounds"):
+        makedirs(directory, exist_ok=True)
+
+    manifest = {"artifacts": {}, "images": [], "sources": {}}
+
+    try:
+        manifest["artifacts"].update(subset_fonts(used_characters()))
+    except ImportError:
+        print("fontTools is not installed, fonts are not subset")
+
+    try:
+        manifest["images"] = build_atlas()
+    except ImportError:
+        print("Kivy or Pillow is not installed, the texture atlas is not built")
+
+    if which("ffmpeg"):
+        manifest["artifacts"].update(decode_sounds())
+    else:
+        print("ffmpeg is not installed, sounds are not decoded")
+
+    # The artifacts are ignored at runtime once any of these files is modified, or created for the missing ones (None)
+    sources = list(STRING_SOURCES) + list(manifest["artifacts"]) + [f"assets/images/{name}.png"
+                                                                    for name in manifest["images"]]
+    manifest["sources"] = {path: getmtime(path) if exists(path) else None for path in sources}
+
+    with open(MANIFEST_PATH, "w") as file:
+        dump(manifest, file, indent=4)
@@ -0,0 +1,72 @@
+# <<< CONFIGURATION >>>
+
+# Options read from environment variables, so that they can be changed without touching the settings database
+
+from os import environ
+
+# Directory of the settings, history, quotes, sync outbox and user sounds, e.g. a temporary one for benchmarks
+DATA_DIR = environ.get("WELLBEING_DATA_DIR", "data")
+
+# Storage backend of settings and history: "log" (append-only history logs) or "sqlite" (single SQLite database)
+STORAGE_BACKEND = environ.get("WELLBEING_STORAGE", "log").lower()
+SQLITE_PATH = environ.get("WELLBEING_SQLITE_PATH", f"{DATA_DIR}/wellbeing.db")
+
+# Seconds between two flushes of the buffered stores, they are also flushed when the window is hidden and on exit
+STORE_FLUSH_INTERVAL = float(environ.get("WELLBEING_FLUSH_INTERVAL", 300))
+
+# Maximum number of quotes kept, the least recently shown quote is evicted first
+QUOTE_STORE_CAP = int(environ.get("WELLBEING_QUOTE_CAP", 500))
+
+# Quotes API, "{count}" is replaced by the number of quotes fetched per batch
+QUOTE_ENDPOINT = environ.get("WELLBEING_QUOTE_ENDPOINT", "https://api.quotable.io/quotes/random?limit={count}")
+QUOTE_BATCH_SIZE = int(environ.get("WELLBEING_QUOTE_BATCH_SIZE", 10))
+
+# Notification backend: "auto", "winotify", "libnotify" or "recording" (keeps notifications in memory)
+NOTIFICATION_BACKEND = environ.get("WELLBEING_NOTIFICATIONS", "auto").lower()
+
+# Defer the tray toolkit, global hotkey, reminder sound and settings screen until after startup or first use
+LAZY_STARTUP = environ.get("WELLBEING_LAZY_STARTUP", "1") != "0"
+
+# Print startup timings and quit as soon as the tray icon is shown, used by benchmarks/startup.py
+STARTUP_BENCHMARK = environ.get("WELLBEING_STARTUP_BENCHMARK", "0") == "1"
+
+# Reminders missed while the computer slept or the clock jumped: "coalesce" (one catch-up reminder) or "replan"
+# (moved forward from the current time without being shown)
+CATCH_UP = environ.get("WELLBEING_CATCH_UP", "coalesce").lower()
+
+# Seconds of difference between the wall and monotonic clocks from which a sleep or clock jump is assumed
+CLOCK_JUMP_THRESHOLD = float(environ.get("WELLBEING_CLOCK_JUMP_THRESHOLD", 90))
+
+# Frames per second of the render loop while the window is hidden, "0" in WELLBEING_LOW_POWER keeps the normal rate
+LOW_POWER_HIDDEN = environ.get("WELLBEING_LOW_POWER", "1") != "0"
+HIDDEN_MAX_FPS = float(environ.get("WELLBEING_HIDDEN_MAX_FPS", 1))
+
+# Seconds of hidden idling after which the clock wakeups and CPU time are printed and the application quits, used by
+# benchmarks/idle.py, 0 to disable
+IDLE_BENCHMARK = float(environ.get("WELLBEING_IDLE_BENCHMARK", 0))
+
+# Maximum number of rendered label textures reused for repeated texts, 0 to render every text
+TEXTURE_CACHE_SIZE = int(environ.get("WELLBEING_TEXTURE_CACHE", 128))
+
+# Audio backend of the reminder sounds: "auto", "winsound", "kivy" or "null" (plays nothing), and the seconds before a
+# reminder at which the sounds are decoded and the audio output is woken up
+AUDIO_BACKEND = environ.get("WELLBEING_AUDIO", "auto").lower()
+AUDIO_WARM_LEAD = float(environ.get("WELLBEING_AUDIO_WARM_LEAD", 2))
+
+# Opt-in upload of the day-level changes of the history to a reporting server: the URL the batches are posted to (empty
+# to disable), the team of this installation, the maximum records per batch and the seconds between two uploads
+SYNC_ENDPOINT = environ.get("WELLBEING_SYNC_ENDPOINT", "")
+SYNC_TEAM = environ.get("WELLBEING_SYNC_TEAM", "")
+SYNC_BATCH_SIZE = int(environ.get("WELLBEING_SYNC_BATCH_SIZE", 500))
+SYNC_INTERVAL = float(environ.get("WELLBEING_SYNC_INTERVAL", 300))
+
+# JSON file of the reminder types added to (or changing) the built-in eyes, water and exercise reminders, see
+# reminder_types.py
+REMINDER_TYPES_PATH = environ.get("WELLBEING_REMINDER_TYPES", "data/reminder_types.json")
+
+# Minimum minutes between two reminders, a reminder which would come closer to another one is moved to a later
+# multiple of its frequency, 1 only prevents reminders at the same minute
+REMINDER_MIN_GAP = float(environ.get("WELLBEING_REMINDER_GAP", 2))
+
+# Number of upcoming reminders listed on the home screen
+TIMELINE_SIZE = int(environ.get("WELLBEING_TIMELINE_SIZE", 5))
@@ -7,11 +7,18 @@ from kivy.metrics import dp
 
 # Kivy UI related imports
 from kivy.uix.image import Image
+from kivy.uix.label import Label
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.behaviors import ButtonBehavior
 from kivy.uix.togglebutton import ToggleButton
 from kivy.uix.relativelayout import RelativeLayout
 
+# Texture cache shared by every cached label
+from config import TEXTURE_CACHE_SIZE
+from texture_cache import TextureCache
+
+texture_cache = TextureCache(TEXTURE_CACHE_SIZE)
+
 
 # <<< CUSTOMIZED WIDGETS >>>
 
@@ -23,6 +30,44 @@ class IconButton(ButtonBehavior, Image):
     img_src = StringProperty("")
 
 
+class CachedLabel(Label):
+    """
+    Label which reuses the texture rendered for the same text and rendering properties by any cached label.
+
+    | Note:
+    - Fixed strings, greetings and recently shown quotes are rasterized once while they stay in `texture_cache`.
+    - Markup labels are always rendered, as their references and anchors are computed while rendering.
+    """
+
+    def texture_key(self) -> tuple:
+        """
+        Returns the key of the texture of the current text and rendering properties.
+        """
+
+        return (self.text, self.font_name, self.font_size, tuple(self.disabled_color if self.disabled else self.color),
+                self.halign, self.valign, tuple(self.text_size), self.bold, self.italic, tuple(self.padding),
+                self.line_height, self.strip, self.shorten, self.max_lines)
+
+    def texture_update(self, *largs) -> None:
+        if self.markup or not self.text:
+            super().texture_update(*largs)
+            return
+
+        key = self.texture_key()
+        cached = texture_cache.get(key)
+        if cached is not None:
+            self.texture, texture_size = cached
+            self.texture_size = list(texture_size)
+            return
+
+        super().texture_update(*largs)
+
+        if self.texture is not None:
+            self.texture.bind()  # render now, a delayed rendering would draw the text the label has at that time
+            texture_cache.put(key, self.texture, self.texture_size)
+            self._label.texture = None  # render the next text into a new texture rather than over the cached one
+
+
 class EventCard(RelativeLayout):
     """
     Event card which contains image, title, count and next reminder timing corresponding to the event.
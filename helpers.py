@@ -2,7 +2,10 @@
 
 from os import getcwd
 from os.path import join
-from winotify import Notification
+from config import NOTIFICATION_BACKEND
+from notifications import NotificationDispatcher, create_backend
+
+notification_dispatcher = NotificationDispatcher(create_backend(NOTIFICATION_BACKEND))
 
 
 # <<< HELPER FUNCTIONS >>>
@@ -37,13 +40,11 @@ def notify(title: str, message: str, icon: str) -> None:
     """
     Displays a notification with the specified title, message, and icon.
 
+    Note: The notification is queued and shown by the worker thread of the notification dispatcher.
+
     :param title: The title of the notification.
     :param message: The message content of the notification.
-    :param icon: The name of the icon file (without extension) located in "assets/images/".
+    :param icon: The path of the icon file, relative to the application directory.
     """
 
-    toast = Notification(app_id="Wellbeing",
-                         title=title,
-                         msg=message,
-                         icon=join(getcwd(), f"assets/images/{icon}.png"))
-    toast.show()
+    notification_dispatcher.notify(title, message, join(getcwd(), icon))
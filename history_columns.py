@@ -0,0 +1,209 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import numpy as np
+from os import stat
+from datetime import date
+from os.path import exists
+from history_log import HistoryLog, read_snapshot, read_log_records, apply_records  # NOQA, re-exported
+
+
+# <<< LOADING >>>
+
+def column_names(schema: tuple) -> list:
+    """
+    Returns the column name of every slot of a history schema, e.g. "water" of width 2 gives "water_count" and
+    "water_quantity".
+    """
+
+    names = []
+    for field, width in schema:
+        names.extend([field] if width == 1 else [f"{field}_count", f"{field}_quantity"][:width])
+
+    return names
+
+
+def snapshot_generation(path: str) -> tuple:
+    """
+    Identifies the snapshot file of a history, which changes whenever a compaction replaces it.
+    """
+
+    snapshot_path = f"{path}.snap"
+    if not exists(snapshot_path):
+        return None
+
+    status = stat(snapshot_path)
+    return status.st_ino, status.st_size, status.st_mtime_ns
+
+
+def load_history_arrays(path: str, schema: tuple) -> tuple:
+    """
+    Loads the files of a history log (see `history_log.HistoryLog`) into arrays without decoding them day by day.
+
+    | Note:
+    - The snapshot is read into memory rather than memory-mapped, so that a compaction can replace it meanwhile.
+    - The records of the log are applied over the snapshot, later records win. Records from the first one failing
+      its checksum are dropped.
+    - A compaction replacing both files between the two reads would leave the records compacted into the new
+      snapshot out, so the files are read again if the snapshot changed meanwhile. Within the application, use
+      `HistoryLog.arrays` which copies the arrays held in memory instead.
+
+    :param path: Path of the history without extension.
+    :param schema: The (field, width) pairs stored for each day.
+    :return: A tuple of (ordinals, values) where ordinals is a sorted int32 array of day ordinals and values is an
+             int32 array of shape (days, slots).
+    """
+
+    while True:
+        generation = snapshot_generation(path)
+        arrays = _load_history_arrays(path, schema)
+        if snapshot_generation(path) == generation:
+            return arrays
+
+
+def _load_history_arrays(path: str, schema: tuple) -> tuple:
+    slot_count = sum(width for _, width in schema)
+    ordinals = np.empty(0, dtype=np.int32)
+    values = np.empty((0, slot_count), dtype=np.int32)
+
+    if exists(f"{path}.snap"):
+        ordinals, values = read_snapshot(f"{path}.snap", slot_count)
+    if exists(f"{path}.log"):
+        ordinals, values = apply_records(ordinals, values, read_log_records(f"{path}.log"))
+
+    return ordinals, values
+
+
+# <<< HISTORY COLUMNS >>>
+
+class HistoryColumns:
+    """
+    Columnar view of the screen time and event count history: a sorted array of day ordinals and one int32 array
+    per value, e.g. "minutes", "eyes", "water_count", "water_quantity" and "exercise".
+
+    | Note:
+    - `has_screen_time` and `has_event_counts` tell which days were recorded in each history, days recorded in only
+      one of them hold zeros in the columns of the other.
+    - The columns are a copy for exports and statistics, loaded on demand. With the "log" backend they are built
+      from the arrays `HistoryLog` keeps in memory, without reading or decoding the files.
+    """
+
+    def __init__(self, ordinals: np.ndarray, columns: dict, has_screen_time: np.ndarray,
+                 has_event_counts: np.ndarray) -> None:
+        self.ordinals = ordinals
+        self.columns = columns
+        self.has_screen_time = has_screen_time
+        self.has_event_counts = has_event_counts
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the arrays, in bytes.
+        """
+
+        return (self.ordinals.nbytes + self.has_screen_time.nbytes + self.has_event_counts.nbytes +
+                sum(column.nbytes for column in self.columns.values()))
+
+    def dates(self) -> list:
+        """
+        Returns the ISO date of every day.
+        """
+
+        return [str(date.fromordinal(int(ordinal))) for ordinal in self.ordinals]
+
+    def between(self, start: str = None, end: str = None) -> "HistoryColumns":
+        """
+        Returns the days between two dates (both inclusive) without copying the arrays.
+
+        :param start: ISO date of the first day, None for the first recorded day.
+        :param end: ISO date of the last day, None for the last recorded day.
+        """
+
+        first = 0 if start is None else np.searchsorted(self.ordinals, date.fromisoformat(start).toordinal())
+        last = len(self) if end is None else np.searchsorted(self.ordinals, date.fromisoformat(end).toordinal(),
+                                                             side="right")
+
+        return HistoryColumns(self.ordinals[first:last],
+                              {name: column[first:last] for name, column in self.columns.items()},
+                              self.has_screen_time[first:last], self.has_event_counts[first:last])
+
+    def totals(self) -> dict:
+        """
+        Returns the sum of every column.
+        """
+
+        return {name: int(column.sum()) for name, column in self.columns.items()}
+
+    @classmethod
+    def join(cls, screen_time: tuple, screen_time_schema: tuple, event_counts: tuple,
+             event_count_schema: tuple) -> "HistoryColumns":
+        """
+        Builds the columns from the (ordinals, values) arrays of both histories.
+        """
+
+        ordinals = np.union1d(screen_time[0], event_counts[0]).astype(np.int32)
+        columns = {}
+        presence = []
+
+        for (history_ordinals, values), schema in ((screen_time, screen_time_schema),
+                                                   (event_counts, event_count_schema)):
+            rows = np.searchsorted(ordinals, history_ordinals)
+            present = np.zeros(len(ordinals), dtype=bool)
+            present[rows] = True
+            presence.append(present)
+
+            for slot, name in enumerate(column_names(schema)):
+                column = np.zeros(len(ordinals), dtype=np.int32)
+                column[rows] = values[:, slot]
+                columns[name] = column
+
+        return cls(ordinals, columns, *presence)
+
+    @classmethod
+    def load(cls, screen_time_path: str, screen_time_schema: tuple, event_count_path: str,
+             event_count_schema: tuple) -> "HistoryColumns":
+        """
+        Loads the columns from the files of two history logs.
+        """
+
+        return cls.join(load_history_arrays(screen_time_path, screen_time_schema), screen_time_schema,
+                        load_history_arrays(event_count_path, event_count_schema), event_count_schema)
+
+    @classmethod
+    def from_logs(cls, screen_time_history: HistoryLog, event_count_history: HistoryLog) -> "HistoryColumns":
+        """
+        Builds the columns from the arrays of two open history logs.
+        """
+
+        return cls.join(screen_time_history.arrays(), screen_time_history.schema,
+                        event_count_history.arrays(), event_count_history.schema)
+
+    @classmethod
+    def from_stores(cls, screen_times, screen_time_schema: tuple, event_counts,
+                    event_count_schema: tuple) -> "HistoryColumns":
+        """
+        Builds the columns from two stores with the `DictStore` access pattern, e.g. the SQLite tables.
+        """
+
+        arrays = []
+        for store, schema in ((screen_times, screen_time_schema), (event_counts, event_count_schema)):
+            keys = sorted(store.keys())
+            slot_count = sum(width for _, width in schema)
+            values = np.zeros((len(keys), slot_count), dtype=np.int32)
+
+            for row, key in enumerate(keys):
+                slot = 0
+                value = store[key]
+                for field, width in schema:
+                    default = 0 if width == 1 else [0] * width
+                    values[row, slot:slot + width] = value.get(field, default)
+                    slot += width
+
+            arrays.append((np.array([date.fromisoformat(key).toordinal() for key in keys], dtype=np.int32), values))
+
+        return cls.join(arrays[0], screen_time_schema, arrays[1], event_count_schema)
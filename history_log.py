@@ -0,0 +1,376 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import numpy as np
+from os import fsync, replace
+from os.path import exists, getsize
+from struct import Struct
+from zlib import crc32
+from datetime import date
+from threading import Lock, Thread
+from reminder_types import registry
+
+# Layout of the values stored per day, as (field, width) pairs. A width of 1 stores an integer and a greater width
+# stores a list of integers, e.g. "water" is stored as [count, quantity in mL]. The event counts have one field per
+# reminder type, new types append slots which read as 0 on the days recorded before.
+SCREEN_TIME_SCHEMA = (("minutes", 1),)
+EVENT_COUNT_SCHEMA = registry.schema
+
+RECORD = Struct("<IHiI")  # day ordinal, slot, value, CRC32 of the preceding fields
+LOG_RECORD_DTYPE = np.dtype([("ordinal", "<u4"), ("slot", "<u2"), ("value", "<i4"), ("checksum", "<u4")])
+SNAPSHOT_HEADER = Struct("<4sH")  # magic, number of slots per day, followed by (ordinal, slots) rows
+SNAPSHOT_MAGIC = b"WBH1"
+
+
+# <<< FILE ARRAYS >>>
+
+def snapshot_dtype(slot_count: int) -> np.dtype:
+    return np.dtype([("ordinal", "<u4"), ("slots", "<i4", (slot_count,))])
+
+
+def read_snapshot(snapshot_path: str, slot_count: int) -> tuple:
+    """
+    Reads a history snapshot into memory, without keeping the file open or mapped so that a compaction can replace
+    it on every platform.
+
+    :param snapshot_path: Path of the snapshot file.
+    :param slot_count: Number of slots per day, extra slots of the file are dropped and missing ones read as 0.
+    :return: A tuple of (ordinals, values) where ordinals is a sorted int32 array of day ordinals and values is an
+             int32 array of shape (days, slots).
+    """
+
+    with open(snapshot_path, "rb") as file:
+        magic, snapshot_slots = SNAPSHOT_HEADER.unpack(file.read(SNAPSHOT_HEADER.size))
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{snapshot_path} is not a history snapshot")
+        data = file.read()
+
+    dtype = snapshot_dtype(snapshot_slots)
+    rows = np.frombuffer(data, dtype=dtype, count=len(data) // dtype.itemsize)
+    values = np.zeros((len(rows), slot_count), dtype=np.int32)
+    values[:, :min(snapshot_slots, slot_count)] = rows["slots"][:, :slot_count]
+
+    return rows["ordinal"].astype(np.int32), values
+
+
+def read_log_records(log_path: str) -> np.ndarray:
+    """
+    Reads the records of a history log up to the first one failing its checksum, whose following ones are dropped
+    too (torn or corrupt record).
+    """
+
+    with open(log_path, "rb") as file:
+        data = file.read()
+
+    records = np.frombuffer(data, dtype=LOG_RECORD_DTYPE, count=len(data) // RECORD.size)
+    for index, checksum in enumerate(records["checksum"].tolist()):
+        offset = index * RECORD.size
+        if crc32(data[offset:offset + RECORD.size - 4]) != checksum:
+            return records[:index]
+
+    return records
+
+
+def apply_records(ordinals: np.ndarray, values: np.ndarray, records: np.ndarray) -> tuple:
+    """
+    Applies log records over the (ordinals, values) arrays of a snapshot, later records win.
+
+    :return: The new (ordinals, values) arrays, days first recorded in the log are inserted in order.
+    """
+
+    slot_count = values.shape[1]
+    records = records[records["slot"] < slot_count]
+    if not len(records):
+        return ordinals, values
+
+    new_ordinals = np.setdiff1d(records["ordinal"].astype(np.int32), ordinals)
+    if len(new_ordinals):
+        merged = np.union1d(ordinals, new_ordinals)
+        merged_values = np.zeros((len(merged), slot_count), dtype=np.int32)
+        merged_values[np.searchsorted(merged, ordinals)] = values
+        ordinals, values = merged, merged_values
+
+    # Keep only the last record of every (day, slot) pair, then apply them all at once
+    rows = np.searchsorted(ordinals, records["ordinal"].astype(np.int32))
+    cells = rows * slot_count + records["slot"]
+    _, last = np.unique(cells[::-1], return_index=True)
+    last = len(cells) - 1 - last
+    values[rows[last], records["slot"][last]] = records["value"][last]
+
+    return ordinals, values
+
+
+# <<< HISTORY LOG >>>
+
+class HistoryLog:
+    """
+    Per-day history storage made of a snapshot file and an append-only log of fixed-size records.
+
+    | Note:
+    - Keys are ISO date strings and values have the same shape as the `DictStore` values they replace.
+    - Every write appends one record per changed slot, so its cost does not depend on the length of the history.
+    - Records hold absolute values, so replaying a log over a newer snapshot gives the same result.
+    - A torn record at the end of the log (crash mid-write) fails its checksum and is discarded on load.
+    - The log is compacted into the snapshot on a background thread once it grows past `compact_threshold` records.
+    - The days are held in memory in columnar form, a sorted int32 array of day ordinals and an int32 array of slot
+      values per day, grown by doubling. `arrays` copies them for `history_columns.HistoryColumns`.
+    """
+
+    def __init__(self, path: str, schema: tuple, compact_threshold: int = 4096) -> None:
+        """
+        :param path: Path of the store without extension, ".snap" and ".log" files are created next to it.
+        :param schema: The (field, width) pairs stored for each day.
+        :param compact_threshold: Number of log records after which the log is compacted.
+        """
+
+        self.path = path
+        self.snapshot_path = f"{path}.snap"
+        self.log_path = f"{path}.log"
+        self.schema = schema
+        self.slot_count = sum(width for _, width in schema)
+        self.compact_threshold = compact_threshold
+
+        self._ordinals = np.empty(0, dtype=np.int32)  # sorted day ordinals, the first `_size` are used
+        self._values = np.empty((0, self.slot_count), dtype=np.int32)  # slot values of each day of `_ordinals`
+        self._size = 0
+        self._lock = Lock()
+        self._compacting = False
+
+        if exists(self.snapshot_path):
+            self._ordinals, self._values = read_snapshot(self.snapshot_path, self.slot_count)
+        self._records = self._replay_log()
+        self._size = len(self._ordinals)
+        self._log = open(self.log_path, "ab")
+
+    # <<< DICTSTORE-LIKE ACCESS >>>
+
+    def exists(self, key: str) -> bool:
+        return self._row(date.fromisoformat(key).toordinal()) >= 0
+
+    def __contains__(self, key: str) -> bool:
+        return self.exists(key)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, key: str) -> dict:
+        row = self._row(date.fromisoformat(key).toordinal())
+        if row < 0:
+            raise KeyError(key)
+
+        return self.decode(self._values[row].tolist())
+
+    def __setitem__(self, key: str, value: dict) -> None:
+        self.put_many(((key, value),))
+
+    def keys(self) -> list:
+        """
+        Returns the stored dates in ascending order.
+        """
+
+        return [str(date.fromordinal(ordinal)) for ordinal in self._ordinals[:self._size].tolist()]
+
+    def arrays(self) -> tuple:
+        """
+        Returns a copy of the days in columnar form.
+
+        :return: A tuple of (ordinals, values) where ordinals is a sorted int32 array of day ordinals and values is
+                 an int32 array of shape (days, slots).
+        """
+
+        with self._lock:
+            return self._ordinals[:self._size].copy(), self._values[:self._size].copy()
+
+    def put_many(self, items) -> None:
+        """
+        Stores several days at once with a single flush of the log.
+
+        Note: Only the slots whose value differs from the stored one are appended to the log.
+
+        :param items: An iterable of (date string, value) pairs.
+        """
+
+        with self._lock:
+            for key, value in items:
+                ordinal = date.fromisoformat(key).toordinal()
+                slots = self.encode(value)
+                row = self._row(ordinal)
+                previous = self._values[row].tolist() if row >= 0 else None
+
+                for slot, slot_value in enumerate(slots):
+                    if previous is None or previous[slot] != slot_value:
+                        self._append(ordinal, slot, slot_value)
+
+                if row < 0:
+                    row = self._insert_row(ordinal)
+                self._values[row] = slots
+
+            self._log.flush()
+
+        if self._records >= self.compact_threshold:
+            self.compact(background=True)
+
+    def import_items(self, items) -> None:
+        """
+        Imports existing history, e.g. from a `DictStore`, and compacts it into the snapshot right away.
+
+        :param items: An iterable of (date string, value) pairs.
+        """
+
+        self.put_many(items)
+        self.compact()
+
+    # <<< ENCODING >>>
+
+    def encode(self, value: dict) -> list:
+        """
+        Flattens a day value into its list of slot values.
+        """
+
+        slots = []
+        for field, width in self.schema:
+            if width == 1:
+                slots.append(int(value.get(field, 0)))
+            else:
+                slots.extend(int(item) for item in value.get(field, [0] * width))
+
+        return slots
+
+    def decode(self, slots: list) -> dict:
+        """
+        Rebuilds a day value from its list of slot values.
+        """
+
+        value = {}
+        offset = 0
+        for field, width in self.schema:
+            value[field] = slots[offset] if width == 1 else list(slots[offset:offset + width])
+            offset += width
+
+        return value
+
+    # <<< COLUMNAR DAYS >>>
+
+    def _row(self, ordinal: int) -> int:
+        """
+        Returns the row of a day in the arrays, -1 if it is not recorded.
+        """
+
+        size = self._size
+        if size and self._ordinals[size - 1] == ordinal:  # writes mostly go to the last day
+            return size - 1
+
+        row = int(np.searchsorted(self._ordinals[:size], ordinal))
+        return row if row < size and self._ordinals[row] == ordinal else -1
+
+    def _insert_row(self, ordinal: int) -> int:
+        """
+        Inserts a day of zero values in order, appending is amortized O(1) and inserting before the last day moves
+        the following rows.
+
+        :return: The row of the day.
+        """
+
+        size = self._size
+        if size == len(self._ordinals):
+            capacity = max(2 * size, 64)
+            self._ordinals = np.resize(self._ordinals, capacity)
+            self._values = np.resize(self._values, (capacity, self.slot_count))
+
+        row = int(np.searchsorted(self._ordinals[:size], ordinal))
+        self._ordinals[row + 1:size + 1] = self._ordinals[row:size]
+        self._values[row + 1:size + 1] = self._values[row:size]
+        self._ordinals[row] = ordinal
+        self._values[row] = 0
+        self._size = size + 1
+
+        return row
+
+    # <<< PERSISTENCE >>>
+
+    def _append(self, ordinal: int, slot: int, value: int) -> None:
+        packed = RECORD.pack(ordinal, slot, value, 0)[:-4]
+        self._log.write(packed + crc32(packed).to_bytes(4, "little"))
+        self._records += 1
+
+    def _replay_log(self) -> int:
+        """
+        Applies the log records over the snapshot and drops a torn tail, if any.
+
+        :return: The number of valid records in the log.
+        """
+
+        if not exists(self.log_path):
+            return 0
+
+        records = read_log_records(self.log_path)
+        self._ordinals, self._values = apply_records(self._ordinals, self._values, records)
+
+        valid_size = len(records) * RECORD.size
+        if valid_size != getsize(self.log_path):
+            with open(self.log_path, "r+b") as file:
+                file.truncate(valid_size)
+
+        return len(records)
+
+    def compact(self, background: bool = False) -> None:
+        """
+        Writes all days into a new snapshot and removes the compacted records from the log.
+
+        | Note:
+        - The snapshot is written to a temporary file and renamed over the old one, so it is never half-written.
+        - Records appended while the snapshot is being written are kept in the new log.
+
+        :param background: If True, compacts on a daemon thread. Defaults to False.
+        """
+
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+
+        if background:
+            Thread(target=self._compact, daemon=True).start()
+        else:
+            self._compact()
+
+    def _compact(self) -> None:
+        try:
+            with self._lock:
+                rows = np.empty(self._size, dtype=snapshot_dtype(self.slot_count))
+                rows["ordinal"] = self._ordinals[:self._size]
+                rows["slots"] = self._values[:self._size]
+                log_offset = self._log.tell()
+
+            with open(f"{self.snapshot_path}.tmp", "wb") as file:
+                file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, self.slot_count))
+                file.write(rows.tobytes())
+                file.flush()
+                fsync(file.fileno())
+            replace(f"{self.snapshot_path}.tmp", self.snapshot_path)
+
+            with self._lock:
+                self._log.close()
+                with open(self.log_path, "rb") as file:
+                    file.seek(log_offset)
+                    tail = file.read()
+
+                with open(f"{self.log_path}.tmp", "wb") as file:
+                    file.write(tail)
+                    file.flush()
+                    fsync(file.fileno())
+                replace(f"{self.log_path}.tmp", self.log_path)
+
+                self._log = open(self.log_path, "ab")
+                self._records = len(tail) // RECORD.size
+        finally:
+            self._compacting = False
+
+    def close(self) -> None:
+        """
+        Flushes and closes the log.
+        """
+
+        with self._lock:
+            self._log.flush()
+            fsync(self._log.fileno())
+            self._log.close()
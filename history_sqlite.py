@@ -0,0 +1,218 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import sqlite3
+from json import dumps, loads
+from threading import RLock
+from history_log import EVENT_COUNT_SCHEMA
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS rollups (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS screen_time (day TEXT PRIMARY KEY, minutes INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS event_counts (
+    day TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, event_type)
+);
+CREATE INDEX IF NOT EXISTS event_counts_by_type ON event_counts (event_type, day);
+"""
+
+
+# <<< DATABASE >>>
+
+class SQLiteStorage:
+    """
+    SQLite database holding the settings, screen time history, event count history and history rollups of the
+    application.
+
+    | Note:
+    - `settings_store`, `screen_time_history`, `event_count_history` and `rollup_store` expose the `DictStore` access
+      pattern used by the screens, so the database can replace the pickled stores without changes to the screens.
+    - Days are stored as ISO date strings, which sort chronologically, so date-range queries use the primary keys.
+    - The connection is shared between threads and guarded by a lock.
+    - The tables share the connection, so closing them does not close it: `close` the database once every table has
+      been flushed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.lock = RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+        self.settings_store = KeyValueTable(self, "settings")
+        self.rollup_store = KeyValueTable(self, "rollups")
+        self.screen_time_history = ScreenTimeTable(self)
+        self.event_count_history = EventCountTable(self)
+
+    def execute(self, query: str, parameters: tuple = ()) -> list:
+        """
+        Runs a query in its own transaction.
+
+        :return: All rows returned by the query.
+        """
+
+        with self.lock, self.connection:
+            return self.connection.execute(query, parameters).fetchall()
+
+    def executemany(self, query: str, rows) -> None:
+        """
+        Runs a query for every row in a single transaction.
+        """
+
+        with self.lock, self.connection:
+            self.connection.executemany(query, rows)
+
+    @property
+    def migrated(self) -> bool:
+        """
+        Whether the data of the pickled stores has been imported.
+        """
+
+        return bool(self.execute("SELECT 1 FROM meta WHERE key = 'migrated'"))
+
+    def mark_migrated(self) -> None:
+        self.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated', '1')")
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+
+# <<< TABLES >>>
+
+class _Table:
+    table = ""
+    key_column = "key"
+
+    def __init__(self, database: SQLiteStorage) -> None:
+        self.database = database
+
+    def exists(self, key: str) -> bool:
+        return bool(self.database.execute(f"SELECT 1 FROM {self.table} WHERE {self.key_column} = ? LIMIT 1",
+                                          (key,)))
+
+    def __contains__(self, key: str) -> bool:
+        return self.exists(key)
+
+    def __len__(self) -> int:
+        return self.database.execute(f"SELECT COUNT(DISTINCT {self.key_column}) FROM {self.table}")[0][0]
+
+    def __setitem__(self, key: str, value: dict) -> None:
+        self.put_many(((key, value),))
+
+    def keys(self) -> list:
+        """
+        Returns the stored keys in ascending order.
+        """
+
+        return [row[0] for row in self.database.execute(
+            f"SELECT DISTINCT {self.key_column} FROM {self.table} ORDER BY {self.key_column}")]
+
+
+class KeyValueTable(_Table):
+    def __init__(self, database: SQLiteStorage, table: str) -> None:
+        super().__init__(database)
+        self.table = table
+
+    def __getitem__(self, key: str) -> dict:
+        rows = self.database.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,))
+        if not rows:
+            raise KeyError(key)
+
+        return loads(rows[0][0])
+
+    def put_many(self, items) -> None:
+        self.database.executemany(f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)",
+                                  ((key, dumps(value)) for key, value in items))
+
+
+class ScreenTimeTable(_Table):
+    table = "screen_time"
+    key_column = "day"
+
+    def __getitem__(self, key: str) -> dict:
+        rows = self.database.execute("SELECT minutes FROM screen_time WHERE day = ?", (key,))
+        if not rows:
+            raise KeyError(key)
+
+        return {"minutes": rows[0][0]}
+
+    def put_many(self, items) -> None:
+        self.database.executemany("INSERT OR REPLACE INTO screen_time (day, minutes) VALUES (?, ?)",
+                                  ((key, value["minutes"]) for key, value in items))
+
+    def range(self, start: str, end: str) -> list:
+        """
+        Returns the screen time of every recorded day between two dates (both inclusive).
+
+        :param start: ISO date of the first day.
+        :param end: ISO date of the last day.
+        :return: A list of (date, minutes) tuples in ascending date order.
+        """
+
+        return self.database.execute("SELECT day, minutes FROM screen_time WHERE day BETWEEN ? AND ? ORDER BY day",
+                                     (start, end))
+
+
+class EventCountTable(_Table):
+    table = "event_counts"
+    key_column = "day"
+
+    def __init__(self, database: SQLiteStorage, schema: tuple = EVENT_COUNT_SCHEMA) -> None:
+        super().__init__(database)
+        self.schema = schema
+
+    def __getitem__(self, key: str) -> dict:
+        rows = self.database.execute("SELECT event_type, count, quantity FROM event_counts WHERE day = ?", (key,))
+        if not rows:
+            raise KeyError(key)
+
+        return self.decode(rows)
+
+    def decode(self, rows) -> dict:
+        """
+        Builds the day value (e.g. {"eyes": 2, "water": [3, 600], "exercise": 1}) from (event_type, count, quantity)
+        rows, where event types stored with a width of 2 carry their quantity.
+        """
+
+        counts = {event_type: (count, quantity) for event_type, count, quantity in rows}
+
+        value = {}
+        for event_type, width in self.schema:
+            count, quantity = counts.get(event_type, (0, 0))
+            value[event_type] = count if width == 1 else [count, quantity]
+
+        return value
+
+    def put_many(self, items) -> None:
+        rows = []
+        for key, value in items:
+            for event_type, count in value.items():
+                count, quantity = count if isinstance(count, list) else (count, 0)
+                rows.append((key, event_type, count, quantity))
+
+        self.database.executemany("INSERT OR REPLACE INTO event_counts (day, event_type, count, quantity) "
+                                  "VALUES (?, ?, ?, ?)", rows)
+
+    def range(self, start: str, end: str, event_type: str = None) -> list:
+        """
+        Returns event counts between two dates (both inclusive), optionally for a single event type.
+
+        :param start: ISO date of the first day.
+        :param end: ISO date of the last day.
+        :param event_type: If given, only the counts of this event type are returned. Defaults to None.
+        :return: A list of (date, event_type, count, quantity) tuples in ascending date order.
+        """
+
+        if event_type is None:
+            return self.database.execute("SELECT day, event_type, count, quantity FROM event_counts "
+                                         "WHERE day BETWEEN ? AND ? ORDER BY day", (start, end))
+
+        return self.database.execute("SELECT day, event_type, count, quantity FROM event_counts "
+                                     "WHERE event_type = ? AND day BETWEEN ? AND ? ORDER BY day",
+                                     (event_type, start, end))
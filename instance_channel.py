@@ -0,0 +1,108 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import socket
+from os import makedirs, replace
+from os.path import dirname
+from threading import Thread
+from config import DATA_DIR
+
+HOST = "127.0.0.1"
+PORT_FILE = f"{DATA_DIR}/instance.port"
+ENCODING = "utf-8"
+MAX_COMMAND_LENGTH = 1024
+
+
+# <<< SECOND INSTANCE CLIENT >>>
+
+def send_command(command: str, port_file: str = PORT_FILE, timeout: float = 2) -> bool:
+    """
+    Sends a command to the already running instance of the application.
+
+    :param command: The command to be sent, e.g. "show".
+    :param port_file: The file in which the running instance has written its listening port.
+    :param timeout: Seconds to wait while connecting and sending.
+    :return: True if the command was delivered, False otherwise.
+    """
+
+    try:
+        with open(port_file) as file:
+            port = int(file.read().strip())
+
+        with socket.create_connection((HOST, port), timeout=timeout) as connection:
+            connection.sendall(f"{command}\n".encode(ENCODING))
+    except (OSError, ValueError):
+        return False
+
+    return True
+
+
+# <<< PRIMARY INSTANCE SERVER >>>
+
+class InstanceChannel:
+    """
+    Localhost socket on which the primary instance receives commands sent by later launches of the application.
+    """
+
+    def __init__(self, port_file: str = PORT_FILE) -> None:
+        self.port_file = port_file
+        self.handlers = {}
+
+        self._socket = None
+
+    def register(self, command: str, handler) -> None:
+        """
+        Registers a handler for a command.
+
+        Note: Handlers are called from the listener thread, UI handlers should be decorated with `mainthread`.
+
+        :param command: The command name, e.g. "show".
+        :param handler: A callable taking no arguments.
+        """
+
+        self.handlers[command] = handler
+
+    def start(self) -> None:
+        """
+        Binds the socket to a free localhost port, publishes the port in `port_file` and starts listening on a
+        daemon thread which blocks on `accept` instead of polling.
+        """
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.bind((HOST, 0))
+        self._socket.listen()
+
+        # Write the port to a temporary file first so that a second instance never reads a partial port number
+        makedirs(dirname(self.port_file) or ".", exist_ok=True)
+        with open(f"{self.port_file}.tmp", "w") as file:
+            file.write(str(self._socket.getsockname()[1]))
+        replace(f"{self.port_file}.tmp", self.port_file)
+
+        Thread(target=self._listen, daemon=True).start()
+
+    def stop(self) -> None:
+        """
+        Stops accepting commands.
+        """
+
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _listen(self) -> None:
+        while self._socket is not None:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:  # socket closed by `stop`
+                return
+
+            with connection:
+                connection.settimeout(2)
+                try:
+                    data = connection.recv(MAX_COMMAND_LENGTH)
+                except OSError:
+                    continue
+
+            for command in data.decode(ENCODING, "ignore").split():
+                handler = self.handlers.get(command)
+                if handler is not None:
+                    handler()
@@ -0,0 +1,92 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+from csv import writer
+from threading import Thread
+from helpers import format_time
+from reminder_types import registry
+
+LOG_HEADERS = ("Date", "Screen Time") + tuple(header for reminder_type in registry.all
+                                              for header in reminder_type.log_headers)
+
+
+# <<< REMINDER LOGS EXPORT >>>
+
+def iter_log_rows(columns):
+    """
+    Yields one CSV row per recorded day, in ascending date order.
+
+    | Note:
+    - Values missing for a date are written as "N/A", so every row has as many columns as `LOG_HEADERS`.
+    - Reminder types with a quantity have a count and a quantity column, a quantity of 0 is written as "N/A".
+
+    :param columns: The `HistoryColumns` of the days to export.
+    """
+
+    event_columns = [columns[name].tolist() for name in registry.columns]
+    quantity_columns = {registry.columns.index(reminder_type.columns[1]) for reminder_type in registry.all
+                        if reminder_type.width == 2}
+
+    values = zip(columns.dates(), columns.has_screen_time.tolist(), columns.has_event_counts.tolist(),
+                 columns["minutes"].tolist(), *event_columns)
+
+    for date, has_screen_time, has_event_counts, minutes, *event_values in values:
+        row = [date, "N/A"] + ["N/A"] * len(event_values)
+
+        if has_screen_time:
+            row[1] = format_time(minutes)
+
+        if has_event_counts:
+            for index, value in enumerate(event_values):
+                if value or index not in quantity_columns:
+                    row[index + 2] = value
+
+        yield row
+
+
+class LogExporter:
+    """
+    Writes reminder logs to a CSV file on a worker thread, row by row, so that the window stays responsive.
+    """
+
+    def __init__(self, load_columns, path: str, since: str = None, on_progress=None, on_done=None) -> None:
+        """
+        :param load_columns: Called from the worker thread, returns the `HistoryColumns` of the whole history.
+        :param path: Path of the CSV file to write.
+        :param since: If given, only dates from this ISO date onwards are exported. Defaults to None.
+        :param on_progress: Called from the worker thread with (rows written, total rows).
+        :param on_done: Called from the worker thread with (last exported date or None, error or None) when finished.
+        """
+
+        self.load_columns = load_columns
+        self.path = path
+        self.since = since
+        self.on_progress = on_progress
+        self.on_done = on_done
+
+        self.progress_step = 500  # rows written between two progress reports
+
+    def start(self) -> None:
+        Thread(target=self.run, daemon=True).start()
+
+    def run(self) -> None:
+        last_date = None
+        try:
+            columns = self.load_columns().between(self.since)
+
+            with open(self.path, "w", newline="") as log_file:
+                csv_writer = writer(log_file)
+                csv_writer.writerow(LOG_HEADERS)
+
+                for index, row in enumerate(iter_log_rows(columns), 1):
+                    csv_writer.writerow(row)
+                    last_date = row[0]
+
+                    if self.on_progress is not None and index % self.progress_step == 0:
+                        self.on_progress(index, len(columns))
+        except Exception as error:  # NOQA, any error is reported so that the caller never waits forever
+            if self.on_done is not None:
+                self.on_done(last_date, error)
+            return
+
+        if self.on_done is not None:
+            self.on_done(last_date, None)
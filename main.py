@@ -1,25 +1,42 @@
 # <<< IMPORTS AND CONFIGURATION >>>
 
 # Initial setup
+from time import perf_counter, process_time
+
+start_time = perf_counter()  # to measure startup timings
+
+# Lifecycle tracing, enabled with the WELLBEING_TRACE environment variable or the --trace <path> command line flag
+from tracing import tracer
+
+tracer.begin("kivy config")
 from kivy.config import Config
+from config import LOW_POWER_HIDDEN
 
 Config.set("graphics", "resizable", False)  # disable window resizing
 Config.set("input", "mouse", "mouse, disable_multitouch")  # disable multitouch emulation (orange dot on right click)
+if LOW_POWER_HIDDEN:
+    # Events scheduled from other threads (tray, hotkey, second launch) interrupt the sleep of the slowed render loop
+    Config.set("kivy", "kivy_clock", "interrupt")
+tracer.end("kivy config")
 
 # Setup opening of already running instance of the application if attempt is made to open second instance
 from sys import exit
 from tendo import singleton
-from kivy.storage.dictstore import DictStore
-from keyboard import add_hotkey, remove_hotkey
+from instance_channel import InstanceChannel, send_command
 
+tracer.begin("singleton check")
 try:
-    DictStore("data/instance.dat")["instance"] = {"show": False}
     me = singleton.SingleInstance()
 except singleton.SingleInstanceException:
-    DictStore("data/instance.dat")["instance"] = {"show": True}
+    send_command("show")  # ask the running instance to show its window
     exit(-1)
 
+instance_channel = InstanceChannel()
+instance_channel.start()
+tracer.end("singleton check")
+
 # Set default window color and hide it
+tracer.begin("window setup")
 from kivy.clock import Clock
 from kivy.core.window import Window
 
@@ -30,27 +47,48 @@ Clock.schedule_once(lambda dt: Window.hide(), 0)
 from kivy.core.text import LabelBase, DEFAULT_FONT
 
 LabelBase.register(DEFAULT_FONT, "assets/fonts/nunito.ttf")
+tracer.end("window setup")
 
 # Kivy usual imports
+tracer.begin("imports")
 from kivy.app import App
 from kivy.clock import mainthread
-from kivy.core.audio import SoundLoader
-from kivy.network.urlrequest import UrlRequest
 from kivy.properties import ObjectProperty, BooleanProperty, StringProperty, NumericProperty
 
 # Kivy UI related imports
 from kivy.uix.screenmanager import ScreenManager, Screen, NoTransition
-from custom_widgets import IconButton, EventCard, CustomToggleButton, ToggleButtonContainer, SettingBox  # NOQA
+from custom_widgets import IconButton, CachedLabel, EventCard, CustomToggleButton, ToggleButtonContainer, \
+    SettingBox, texture_cache  # NOQA
 
 # Miscellaneous imports
-from csv import writer
 from os import makedirs
 from os.path import join
 from random import choice
-from tray_icon import TrayIconApp
+from uuid import uuid4
+from threading import Thread
+from quote_store import QuoteStore
+from quote_prefetch import QuotePrefetcher
+from log_export import LogExporter
+from analytics import WellbeingAnalytics
+from scheduler import ReminderScheduler
+from buffered_store import PickleFileStore
+from stores import AppStores
+from config import DATA_DIR, STORE_FLUSH_INTERVAL, QUOTE_STORE_CAP, QUOTE_ENDPOINT, \
+    QUOTE_BATCH_SIZE, LAZY_STARTUP, STARTUP_BENCHMARK, CATCH_UP, CLOCK_JUMP_THRESHOLD, HIDDEN_MAX_FPS, \
+    IDLE_BENCHMARK, AUDIO_BACKEND, AUDIO_WARM_LEAD, SYNC_ENDPOINT, SYNC_TEAM, SYNC_BATCH_SIZE, \
+    SYNC_INTERVAL, REMINDER_MIN_GAP, TIMELINE_SIZE
 from helpers import format_time, notify
+from asset_loader import asset_path
+from audio import AudioEngine, create_audio_backend, parse_quiet_hours
+from sync_client import SyncOutbox, SyncClient
+from reminder_types import registry
+from reminders import MAX_SKIPS, SlotAllocator, frequency_minutes, reminders_to_update, add_screen_time, \
+    get_event_counts, add_event_count
 from datetime import datetime, timedelta
 
+import_time = perf_counter() - start_time
+tracer.end("imports")
+
 
 # <<< SCREENS AND SCREEN MANAGER >>>
 
@@ -58,9 +96,8 @@ class HomeScreen(Screen):
     quote = ObjectProperty()
     welcome_text = ObjectProperty()
     screen_time = ObjectProperty()
-    eyes_event_card = ObjectProperty()
-    water_event_card = ObjectProperty()
-    exercise_event_card = ObjectProperty()
+    event_cards = ObjectProperty()
+    timeline = ObjectProperty()
 
     greets = {
         "morning": [
@@ -90,27 +127,48 @@ class HomeScreen(Screen):
         self.app = App.get_running_app()
 
         # Set initial quote from the saved quotes
-        self.set_quote_text(None, choice(self.app.quotes_store["quotes"]["quotes"]))
+        self.set_quote_text(None, self.app.quote_store.next_quote())
 
-        # Store last hour in which user was greeted and try to update greeting every second
-        self.greet_hour = datetime.now().hour
-        Clock.schedule_interval(lambda dt: self.update_welcome_text(), 1/60)
+        # Store last hour in which user was greeted and update greeting when the next hour starts
+        self.greet_hour = self.app.now().hour
+        self.schedule_welcome_text_update()
 
         # Set initial screen time fetched from database without incrementing the value and
         # schedule increment every minute
         self.update_screen_time(False)
         Clock.schedule_interval(lambda dt: self.update_screen_time(), 60)
 
-        self.event_card_mappings = {  # to access event cards using event types/names
-            "eyes": self.eyes_event_card,
-            "water": self.water_event_card,
-            "exercise": self.exercise_event_card
-        }
+        self.event_card_mappings = {}  # to access event cards using event types/names
+        self.add_event_cards()
 
         # Set event count for each event fetched from database
-        self.update_event_count_text("eyes")
-        self.update_event_count_text("water")
-        self.update_event_count_text("exercise")
+        for event_type in self.event_card_mappings:
+            self.update_event_count_text(event_type)
+
+    def add_event_cards(self) -> None:
+        """
+        Adds an event card for each enabled reminder type of the registry.
+
+        Note: The cards are resized with the screen and show "Paused" while the application is paused.
+        """
+
+        for reminder_type in registry:
+            event_card = EventCard(img_src=asset_path(reminder_type.icon), event_title=reminder_type.title)
+            self.event_card_mappings[reminder_type.name] = event_card
+            self.event_cards.add_widget(event_card)
+
+        self.bind(width=lambda screen, width: self.resize_event_cards())
+        self.app.bind(running=lambda app, running: self.reset_event_timings())
+        self.resize_event_cards()
+        self.reset_event_timings()
+
+    def resize_event_cards(self) -> None:
+        for event_card in self.event_card_mappings.values():
+            event_card.size = self.width / 3.5, self.width / 3.5
+
+    def reset_event_timings(self) -> None:
+        for event_card in self.event_card_mappings.values():
+            event_card.event_timing = "Setting reminder..." if self.app.running else "Paused"
 
     def get_greeting(self, name: str) -> str:
         """
@@ -120,7 +178,7 @@ class HomeScreen(Screen):
         :return: A greeting message based on the time of day and the provided name.
         """
 
-        self.greet_hour = datetime.now().hour
+        self.greet_hour = self.app.now().hour
 
         if name:
             hello_text = f"Hello, {name.title()}!"
@@ -146,12 +204,37 @@ class HomeScreen(Screen):
         :param force_update: If True, forces an update of the welcome text regardless of the time. Defaults to False.
         """
 
-        new_greet_hour = datetime.now().hour != self.greet_hour
+        new_greet_hour = self.app.now().hour != self.greet_hour
 
         if force_update or new_greet_hour:
             new_name = self.app.settings_store["user_name"]["value"].lower()
             self.welcome_text.text = self.get_greeting(new_name)
 
+    def schedule_welcome_text_update(self) -> None:
+        """
+        Schedules an update of the welcome text at the start of the next hour, which schedules the following one.
+        """
+
+        def update(dt) -> None:  # NOQA
+            self.update_welcome_text()
+            self.schedule_welcome_text_update()
+
+        now = self.app.now()
+        next_hour = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        Clock.schedule_once(update, (next_hour - now).total_seconds() + 1)  # a second late so that the hour changed
+
+    def refresh(self) -> None:
+        """
+        Refreshes the greeting, screen time, event counts and next reminder timings, e.g. when the window is shown
+        after the labels were left untouched while hidden.
+        """
+
+        self.update_welcome_text()
+        self.update_screen_time(False)
+        for event_type in self.event_card_mappings:
+            self.update_event_count_text(event_type)
+        self.set_reminders_text()
+
     def toggle_app_status(self):
         """
         Toggles the running status of the application.
@@ -159,34 +242,30 @@ class HomeScreen(Screen):
         | Note:
         - Toggles the `running` attribute of the application.
         - Retrieves the "Reminder Screen" and its associated objects.
-        - If the application is paused, clears reminder timings and cancels the reminder event.
-        - If the application is resumed, sets new reminders and schedules the reminder interval.
+        - If the application is paused, clears reminder timings and the reminder scheduler.
+        - If the application is resumed, sets new reminders which re-arms the reminder scheduler.
         """
 
         self.app.running = not self.app.running
 
         reminder_screen = self.app.screen_manager.get_screen("Reminder Screen")
         if not self.app.running:
-            reminder_screen.reminder_timings.clear()
-            reminder_screen.remind_event.cancel()
+            reminder_screen.slots.clear()
+            reminder_screen.scheduler.clear()
+            self.set_reminders_text()
         else:
             reminder_screen.set_reminders()
-            reminder_screen.schedule_remind_interval()
 
     def update_quote_db(self, quote_data: dict) -> None:
         """
         Updates a quote database with new quote data.
 
-        Note: If the provided quote is not already in the database, it is added to the list of quotes.
+        Note: If the provided quote is not already in the database, it is added to the quotes and marked as shown.
 
         :param quote_data: A dictionary containing quote information.
         """
 
-        new_quote = {"content": quote_data["content"], "author": quote_data["author"]}
-        if new_quote not in self.app.quotes_store["quotes"]["quotes"]:
-            quotes = self.app.quotes_store["quotes"]["quotes"]
-            quotes.append(new_quote)
-            self.app.quotes_store["quotes"] = {"quotes": quotes}
+        self.app.quote_store.add(quote_data["content"], quote_data["author"], shown=1)
 
     def set_quote_text(self, req, res: dict) -> None:
         """
@@ -195,7 +274,7 @@ class HomeScreen(Screen):
         Note: If a request is provided (not None), it means the quote is fetched from the API hence the quote database
         is updated with the response data.
 
-        :param req: The request data, which is optional.
+        :param req: The request (or the quote prefetcher) which fetched the quote, None for a saved quote.
         :param res: A dictionary containing quote information.
         """
 
@@ -207,10 +286,17 @@ class HomeScreen(Screen):
 
     def get_quote(self) -> None:
         """
-        Requests a quote using the quotable API and updates the text of the quote widget with the retrieved quote.
+        Updates the text of the quote widget with the next quote.
+
+        Note: Quotes prefetched from the quotes API are shown first. When none are available, e.g. while offline,
+        the next saved quote of the shuffled rotation is shown instead.
         """
 
-        UrlRequest("https://api.quotable.io/random", self.set_quote_text)
+        quote = self.app.quote_prefetcher.pop()
+        if quote is not None:
+            self.set_quote_text(self.app.quote_prefetcher, quote)
+        else:
+            self.set_quote_text(None, self.app.quote_store.next_quote())
 
     def update_screen_time(self, increment: bool = True) -> None:
         """
@@ -219,49 +305,46 @@ class HomeScreen(Screen):
         | Note:
         - The screen time is tracked on a per-day basis.
         - If the screen time history for the current day does not exist, it is initialized with zero minutes.
-        - If increment is True, the screen time for the current day is incremented by 1 minute.
-        - The updated screen time is displayed on the screen.
+        - If increment is True, the screen time for the current day and its rollups are incremented by 1 minute.
+        - The updated screen time is displayed on the screen, unless the window is hidden in low-power mode as the
+          label is refreshed when the window is shown.
 
         :param increment: If True, increments the screen time; otherwise, keeps it unchanged. Defaults to True.
         """
 
-        today = str(datetime.now().date())
-
-        if not self.app.screen_time_history.exists(today):
-            self.app.screen_time_history[today] = {"minutes": 0}
-        if increment:
-            prev_minutes = self.app.screen_time_history[today]["minutes"]
-            self.app.screen_time_history[today] = {"minutes": prev_minutes + 1}
+        curr_minutes = add_screen_time(self.app.screen_time_history, self.app.rollups, self.app.now().date(),
+                                       1 if increment else 0)
+        if self.app.low_power:
+            return
 
-        curr_minutes = self.app.screen_time_history[today]["minutes"]
         screen_time_text = "Screen time: " + format_time(curr_minutes)
 
         self.screen_time.text = screen_time_text
         self.screen_time.texture_update()
 
-    def set_reminders_text(self, reminder_timings: dict = None) -> None:
+    def set_reminders_text(self, slots: SlotAllocator = None) -> None:
         """
-        Sets the timing for reminders based on the provided or "Reminder Screen" reminder timings.
+        Sets the timing for reminders based on the provided or "Reminder Screen" reminder slots.
 
         | Note:
-        - If reminder_timings is None, it uses the timings from the "Reminder Screen" in the app.
+        - If slots is None, it uses the slots from the "Reminder Screen" in the app.
         - The time format is determined by the user's settings (AM/PM or 24-hour format).
         - The formatted reminder timings are assigned to respective event text properties.
+        - The timeline label lists the next `TIMELINE_SIZE` reminders in chronological order.
 
-        :param reminder_timings: A dictionary containing reminder timings for different events. Defaults to None.
+        :param slots: The `SlotAllocator` holding the reminder timings. Defaults to None.
         """
 
-        if reminder_timings is None:
-            reminder_timings = self.app.screen_manager.get_screen("Reminder Screen").reminder_timings
+        if slots is None:
+            slots = self.app.screen_manager.get_screen("Reminder Screen").slots
 
         time_format = "%I:%M %p" if self.app.settings_store["time_format"]["value"] == "AM/PM" else "%H:%M"
-        str_timings = {}
-        for event_type in reminder_timings:
-            str_timings[event_type] = reminder_timings[event_type].strftime(time_format)
+        for event_type, timing in slots.timings.items():
+            self.event_card_mappings[event_type].event_timing = f"Next reminder: {timing.strftime(time_format)}"
 
-        self.eyes_event_card.event_timing = f"Next reminder: {str_timings['eyes']}"
-        self.water_event_card.event_timing = f"Next reminder: {str_timings['water']}"
-        self.exercise_event_card.event_timing = f"Next reminder: {str_timings['exercise']}"
+        upcoming = [f"{timing.strftime(time_format)} {registry[event_type].name.replace('_', ' ').title()}"
+                    for timing, event_type in slots.timeline(TIMELINE_SIZE)]
+        self.timeline.text = f"Coming up: {' · '.join(upcoming)}" if upcoming else ""
 
     def update_event_count_db(self, event_type: str) -> None:
         """
@@ -270,33 +353,16 @@ class HomeScreen(Screen):
         | Note:
         - The event count history is tracked on a per-day basis.
         - The count for the specified event type is incremented by 1.
-        - For the water reminder, both the count and total water intake are updated.
+        - For reminder types with a quantity (e.g. water), both the count and the total quantity are updated.
+        - The week, month and year rollups of the day are updated with the same changes.
         - The corresponding event count text is updated to reflect the changes.
 
         :param event_type: The type of the event for which the count is to be updated.
         """
 
-        event_card = self.event_card_mappings[event_type]
-        today = str(datetime.now().date())
-
-        if not self.app.event_count_history.exists(today):
-            self.app.event_count_history[today] = {"eyes": 0, "water": [0, 0], "exercise": 0}
-
-        event_counts = self.app.event_count_history[today]
-        prev_count = event_counts[event_type]
-
-        if event_card.event_title != "Drank water":
-            event_counts[event_type] = prev_count + 1
-            self.app.event_count_history[today] = event_counts
-        else:
-            event_counts["water"][0] += 1
-
-            water_intake = self.app.settings_store["water_intake"]["value"]
-            if water_intake:
-                event_counts["water"][1] += int(water_intake)
-
-            self.app.event_count_history[today] = event_counts
-
+        quantity_setting = registry[event_type].quantity_setting
+        add_event_count(self.app.event_count_history, self.app.rollups, self.app.now().date(), event_type,
+                        self.app.settings_store[quantity_setting]["value"] if quantity_setting else "")
         self.update_event_count_text(event_type)
 
     def update_event_count_text(self, event_type: str) -> None:
@@ -305,181 +371,151 @@ class HomeScreen(Screen):
 
         | Note:
         - The event count text is updated based on the count history for the current day.
-        - In case of water reminder, the text is updated based on the state of water intake tracker.
+        - For reminder types with a quantity (e.g. water), the text shows the quantity while its quantity setting is
+          filled in, e.g. the water intake tracker.
         - The updated event count text is reflected in the corresponding event widget.
 
         :param event_type: The type of the event for which the count text is to be updated.
         """
 
         event_card = self.event_card_mappings[event_type]
-        today = str(datetime.now().date())
+        reminder_type = registry[event_type]
+        count = get_event_counts(self.app.event_count_history, self.app.now().date())[event_type]
 
-        if not self.app.event_count_history.exists(today):
-            self.app.event_count_history[today] = {"eyes": 0, "water": [0, 0], "exercise": 0}
-
-        count = self.app.event_count_history[today][event_type]
-
-        if event_card.event_title != "Drank water":
+        if reminder_type.quantity_setting is None:
             event_card.event_count = f"{count} times"
             return
 
-        water_intake = self.app.settings_store["water_intake"]["value"]
-        if water_intake:
-            water_quantity = self.app.event_count_history[today]["water"][1]
-            water_quantity = f"{water_quantity / 1000} L" if water_quantity > 1000 else f"{water_quantity} mL"
-            event_card.event_count = water_quantity
+        if self.app.settings_store[reminder_type.quantity_setting]["value"]:
+            quantity, unit = count[1], reminder_type.unit
+            if unit == "mL" and quantity > 1000:
+                quantity, unit = quantity / 1000, "L"
+            event_card.event_count = f"{quantity} {unit}"
         else:
             event_card.event_count = f"{count[0]} times"
 
 
 class ReminderScreen(Screen):
-    skip_count = NumericProperty(3)
+    skip_count = NumericProperty(MAX_SKIPS)
     reminder_text = ObjectProperty()
     img_src = StringProperty("")
     event_type = StringProperty("")
 
-    freq_mappings = {
-        "20 min": 20,
-        "30 min": 30,
-        "45 min": 45,
-        "1 hr": 60,
-        "1.5 hr": 90,
-        "2 hr": 120
-    }
-
-    notification_titles = {
-        "eyes": "Eyes Relaxation Reminder",
-        "water": "Hydration Reminder",
-        "exercise": "Exercise Reminder"
-    }
-
-    reminder_texts = {
-        "eyes": [
-            "Take a break! Relax your eyes and look away from the screen for a minute.",
-            "Let your eyes stretch too! Pause and focus on a distant object for a quick refresh.",
-            "It's time to refresh your eyes. Close them for a moment and let them rest."
-        ],
-        "water": [
-            "Stay hydrated! Grab your water bottle and take a moment for a drink.",
-            "It's water time! Remember to keep yourself hydrated throughout the day.",
-            "Water break! Pour yourself a glass and savor the goodness of staying hydrated."
-        ],
-        "exercise": [
-            "Get moving! Stand up, stretch, and take a short walk around.",
-            "Exercise break! Do a quick set of stretches or simple exercises to boost your energy.",
-            "Time to move! Incorporate some physical activity into your routine for a healthy break."
-        ]
-    }
-
     def __init__(self) -> None:
         super().__init__(name="Reminder Screen")
         self.app = App.get_running_app()
-        self.reminder_sound = SoundLoader.load("assets/sounds/reminder_sound.mp3")
 
-        self.frequencies = {
-            "eyes": self.freq_mappings[self.app.settings_store["eyes_freq"]["value"]],
-            "water": self.freq_mappings[self.app.settings_store["water_freq"]["value"]],
-            "exercise": self.freq_mappings[self.app.settings_store["exercise_freq"]["value"]]
-        }
+        # With lazy startup the sounds are decoded shortly before the first reminder is due
+        if not LAZY_STARTUP:
+            self.app.audio.preload()
 
-        self.reminder_timings = {
-            "eyes": None,
-            "water": None,
-            "exercise": None
-        }
+        self.frequencies = {}
+        self.set_frequencies()
 
-        # Set initial reminders on app start and schedule interval to check and remind on the calculated time
+        # Reminder timings are kept at least REMINDER_MIN_GAP minutes apart
+        self.slots = SlotAllocator(REMINDER_MIN_GAP)
+        self.reminder_timings = self.slots.timings
+
+        # Set initial reminders on app start, the scheduler wakes up only when the earliest reminder is due (and
+        # shortly before, to warm the audio output up) and checks every minute for reminders missed while the
+        # computer slept
+        self.scheduler = ReminderScheduler(self.remind, now=self.app.now,
+                                           on_missed=self.replan_reminders if CATCH_UP == "replan" else None,
+                                           jump_threshold=CLOCK_JUMP_THRESHOLD, on_lead=self.app.audio.warm,
+                                           lead_time=AUDIO_WARM_LEAD)
         self.set_reminders()
-        self.remind_event = None
-        self.schedule_remind_interval()
+        self.scheduler.start_heartbeat()
 
-        # Schedule interval to run reset_skip_count method every second so that skip_count resets on new day
-        Clock.schedule_interval(lambda dt: self.reset_skip_count(), 1)
+        # Reset skip_count when a new day starts
+        self.skip_count_day = self.app.now().date()
+        self.schedule_skip_count_reset()
 
     def on_pre_enter(self, *args) -> None:
-        self.reminder_sound.play()
-
-    def schedule_remind_interval(self):
-        """
-        Schedule to run `remind` method every second.
-        """
-
-        self.remind_event = Clock.schedule_interval(lambda dt: self.remind(), 1/60)
+        self.app.audio.play(self.event_type, self.app.now())
 
     def set_reminders(self) -> None:
         """
-        Sets reminder timings for eyes, water, and exercise events.
+        Sets reminder timings for the enabled reminder types.
 
         | Note:
         - Calls the `set_reminder_timing` method for each event type to set their respective reminder timings.
+        - Arms the reminder scheduler for the earliest of the new timings.
         - Updates the reminders text on the "Home Screen" using the `set_reminders_text` method.
         """
 
-        self.set_reminder_timing("eyes")
-        self.set_reminder_timing("water")
-        self.set_reminder_timing("exercise")
-        self.app.screen_manager.get_screen("Home Screen").set_reminders_text(self.reminder_timings)
+        for event_type in self.frequencies:
+            self.set_reminder_timing(event_type)
+        self.scheduler.arm()
+        self.app.screen_manager.get_screen("Home Screen").set_reminders_text(self.slots)
 
     def set_frequencies(self) -> None:
         """
-        Sets frequencies for eyes, water, and exercise events based on user settings.
+        Sets frequencies for the enabled reminder types based on user settings.
 
         | Note:
-        - Retrieves frequency values from user settings for each event type.
-        - Retrieves integer values of corresponding frequency settings using `freq_mappings`.
+        - Retrieves the frequency setting of each reminder type, e.g. "45 min".
+        - Converts the settings to minutes using `frequency_minutes`.
         - Assigns the frequencies to the respective events in the `frequencies` dictionary.
         """
 
-        self.frequencies["eyes"] = self.freq_mappings[self.app.settings_store[f"eyes_freq"]["value"]]
-        self.frequencies["water"] = self.freq_mappings[self.app.settings_store[f"water_freq"]["value"]]
-        self.frequencies["exercise"] = self.freq_mappings[self.app.settings_store[f"exercise_freq"]["value"]]
+        for reminder_type in registry:
+            self.frequencies[reminder_type.name] = frequency_minutes(
+                self.app.settings_store[reminder_type.frequency_setting]["value"])
 
     def set_reminder_timing(self, event_type: str) -> None:
         """
         Sets the reminder timing for a specific event type.
 
         | Note:
-        - Calculates the reminder timing based on the current time and frequency settings.
-        - Iteratively checks for collisions with existing reminder timings.
-        - Sets the reminder timing when a non-colliding time is found and exits the loop.
+        - Places the reminder at the next multiple of its frequency which is at least `REMINDER_MIN_GAP` minutes away
+          from the other reminder timings, see `SlotAllocator.place`.
+        - Queues the timing in the reminder scheduler without re-arming it, callers arm once after their updates.
 
         :param event_type: The type of the event for which the reminder timing is to be set.
         """
 
-        multiplier = 1
-        while True:
-            timing = (datetime.now().replace(second=0, microsecond=0) +
-                      timedelta(minutes=self.frequencies[event_type] * multiplier))
-            if timing not in self.reminder_timings.values():
-                self.reminder_timings[event_type] = timing
-                break
+        timing = self.slots.place(event_type, self.app.now(), self.frequencies[event_type])
+        self.scheduler.set(event_type, timing, arm=False)
+
+    def replan_reminders(self, missed_events: list) -> None:
+        """
+        Moves reminders missed while the computer slept or the clock jumped forward from the current time.
+
+        Note: Called by the reminder scheduler with the "replan" catch-up mode, the scheduler re-arms itself after.
+
+        :param missed_events: Event types whose reminder timing was missed.
+        """
 
-            multiplier += 1
+        for event_type in missed_events:
+            self.set_reminder_timing(event_type)
+        self.app.screen_manager.get_screen("Home Screen").set_reminders_text(self.slots)
 
-    def remind(self) -> None:
+    def remind(self, due_events: list) -> None:
         """
-        Triggers reminders for scheduled events.
+        Triggers the reminder for the earliest due event.
 
         | Note:
-        - Iterates through each event type in the reminder timings.
-        - Checks if the current time matches the scheduled reminder time.
-        - If a match is found, updates UI elements and displays the reminder on the "Reminder Screen."
-        - Cancels the reminder event to prevent repeated triggering.
+        - Called by the reminder scheduler once the earliest reminder timing has been reached.
+        - Reminders missed while the computer slept are coalesced into this single reminder, answering it re-plans
+          all of them.
+        - Updates UI elements and displays the reminder on the "Reminder Screen."
+        - Pauses the scheduler to prevent repeated triggering until the reminder is answered.
         - Shows the application window and notifies the user with a notification.
+
+        :param due_events: Event types whose reminder timing has been reached, earliest first.
         """
 
-        for event_type in self.reminder_timings:
-            if datetime.now().strftime("%I:%M") == self.reminder_timings[event_type].strftime("%I:%M"):
-                self.img_src = f"assets/images/{event_type}.png"
-                self.event_type = event_type
-                self.reminder_text.text = choice(self.reminder_texts[event_type])
-                self.app.screen_manager.current = "Reminder Screen"
-                self.remind_event.cancel()  # NOQA
-                self.remind_event = None
+        event_type = due_events[0]
+        reminder_type = registry[event_type]
+        self.img_src = asset_path(reminder_type.icon)
+        self.event_type = event_type
+        self.reminder_text.text = choice(reminder_type.texts)
+        self.app.screen_manager.current = "Reminder Screen"
+        self.scheduler.pause()
 
-                self.app.show_app()
+        self.app.show_app()
 
-                notify(self.notification_titles[event_type], self.reminder_text.text, event_type)
+        notify(reminder_type.notification_title, self.reminder_text.text, reminder_type.icon)
 
     def update_reminders(self) -> None:
         """
@@ -491,16 +527,14 @@ class ReminderScreen(Screen):
         - If the time has passed and the event type is not the current event, updates the reminder timing.
         - Sets the reminder timing for the current event to ensure it continues to trigger.
         - Updates the reminders text on the "Home Screen."
-        - Reschedules interval to check and remind on the calculated time
+        - Resumes the reminder scheduler which re-arms it for the earliest calculated time.
         """
 
-        for event_type in self.reminder_timings:
-            if datetime.now() >= self.reminder_timings[event_type] and event_type != self.event_type:
-                self.set_reminder_timing(event_type)
-        self.set_reminder_timing(self.event_type)
-        self.app.screen_manager.get_screen("Home Screen").set_reminders_text(self.reminder_timings)
+        for event_type in reminders_to_update(self.reminder_timings, self.event_type, self.app.now()):
+            self.set_reminder_timing(event_type)
+        self.app.screen_manager.get_screen("Home Screen").set_reminders_text(self.slots)
 
-        self.schedule_remind_interval()
+        self.scheduler.resume()
 
     def handle_reminder_btn_click(self, action: str):
         """
@@ -517,21 +551,41 @@ class ReminderScreen(Screen):
         elif action == "skip":
             self.skip_count -= 1
 
+    def schedule_skip_count_reset(self) -> None:
+        """
+        Schedules a reset of the skip count at the next midnight, which schedules the following one.
+        """
+
+        def reset(dt) -> None:  # NOQA
+            self.reset_skip_count()
+            self.schedule_skip_count_reset()
+
+        now = self.app.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        Clock.schedule_once(reset, (midnight - now).total_seconds() + 1)  # a second late so that the day changed
+
     def reset_skip_count(self):
         """
         Resets the daily skip count to the maximum value if new day has started.
+
+        Note: Compares dates rather than waiting for midnight, so a midnight slept through is caught up on the next
+        call, e.g. when the window is shown.
         """
 
-        if "00:00:00" in str(datetime.now().time()):
-            self.skip_count = 3
+        today = self.app.now().date()
+        if today != self.skip_count_day:
+            self.skip_count = MAX_SKIPS
+            self.skip_count_day = today
 
 
 class SettingsScreen(Screen):
+    reminder_settings = ObjectProperty()
     name_text_input = ObjectProperty()
     water_intake = ObjectProperty()
     hotkey = ObjectProperty()
     log_save_location = ObjectProperty()
     log_save_btn = ObjectProperty()
+    weekly_summary = ObjectProperty()
 
     def __init__(self) -> None:
         super().__init__(name="Settings Screen")
@@ -539,6 +593,47 @@ class SettingsScreen(Screen):
         self.max_name_length = 20
         self.alphabets = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
+        self.add_frequency_settings()
+
+    def add_frequency_settings(self) -> None:
+        """
+        Adds the frequency setting of each enabled reminder type of the registry.
+        """
+
+        set_frequencies = self.app.screen_manager.get_screen("Reminder Screen").set_frequencies
+        for reminder_type in registry:
+            toggle_buttons = ToggleButtonContainer(group=reminder_type.frequency_setting,
+                                                   toggle_options=reminder_type.frequencies)
+            toggle_buttons.action = set_frequencies
+            toggle_buttons.max_width = self.width * 0.6  # adds the toggle buttons
+            self.bind(width=lambda screen, width, container=toggle_buttons: setattr(container, "max_width",
+                                                                                      width * 0.6))
+
+            setting_box = SettingBox(heading=reminder_type.heading)
+            setting_box.add_widget(toggle_buttons)
+            self.reminder_settings.add_widget(setting_box)
+
+    def on_pre_enter(self, *args) -> None:
+        self.update_weekly_summary()
+
+    def update_weekly_summary(self) -> None:
+        """
+        Updates the summary of the current week, computed from the days before today.
+
+        Note: The statistics are cached by the analytics and only recomputed once a new day has started.
+        """
+
+        week = self.app.analytics.current_week()
+        if week is None:
+            self.weekly_summary.text = "Your weekly summary will appear after the first full day of the week."
+            return
+
+        streak = self.app.analytics.summary()["streaks"]
+        self.weekly_summary.text = (f"Week of {week['period']}: {format_time(round(week['minutes_mean']))} of "
+                                    f"screen time a day, {week['breaks_per_screen_hour']} breaks per screen hour.\n"
+                                    f"Daily goals met {streak['current']} days in a row "
+                                    f"(best: {streak['longest']} days).")
+
     def update_user_name(self) -> None:
         """
         Updates the user's name in the application settings and refreshes the welcome text.
@@ -570,7 +665,7 @@ class SettingsScreen(Screen):
         - Checks for valid input (a single alphabet) and clears the input field if invalid.
         - Sets the hint text for the hotkey field with the formatted hotkey combination.
         - Updates the visibility hotkey in the application settings.
-        - Removes the current hotkey binding and creates a new one based on the updated settings.
+        - Replaces the current hotkey binding with a new one based on the updated settings.
         - Clears the hotkey input field and unfocuses it.
         """
 
@@ -583,7 +678,6 @@ class SettingsScreen(Screen):
         self.hotkey.hint_text = f"Ctrl + Shift + {alphabet}"
         self.app.settings_store["visibility_hotkey"] = {"value": self.hotkey.hint_text}
 
-        remove_hotkey(self.app.hotkey_return_value)
         self.app.create_hotkey()
 
         self.hotkey.text = ""
@@ -597,17 +691,19 @@ class SettingsScreen(Screen):
         - Retrieves the water intake value from the input field.
         - Updates the water intake in the application settings.
         - Triggers the refresh of the water event count text on the "Home Screen."
-        - If the water intake is cleared, sets the total water intake for the day to zero in the event count history.
+        - If the water intake is cleared, sets the total water intake for the day to zero in the event count history
+          and removes it from the rollups.
         """
 
         self.app.settings_store["water_intake"] = {"value": self.water_intake.text}
         self.app.screen_manager.get_screen("Home Screen").update_event_count_text("water")
 
         if self.water_intake.text == "":
-            today = str(datetime.now().date())
-            event_counts = self.app.event_count_history[today]
+            today = self.app.now().date()
+            event_counts = get_event_counts(self.app.event_count_history, today)
+            self.app.rollups.add(today, {"water_quantity": -event_counts["water"][1]})
             event_counts["water"][1] = 0
-            self.app.event_count_history[today] = event_counts
+            self.app.event_count_history[str(today)] = event_counts
 
     def reset_log_save_btn_text(self) -> None:
         """
@@ -623,42 +719,52 @@ class SettingsScreen(Screen):
         | Note:
         - Creates the directory specified in the log save location input field if it doesn't exist.
         - Generates a unique log filename based on the current date and time.
-        - Opens the log file in write mode and initializes a CSV writer.
-        - Writes headers and log data to the CSV file based on screen time and event counts.
-        - Closes the log file after writing and updates the log save button text.
-        - Resets the log save button text after a delay of 3 seconds.
+        - Exports only the dates since the last saved log if "Since last save" is selected, the last saved date is
+          exported again as it may have been updated after that save.
+        - Writes the rows on a worker thread, reporting progress on the log save button.
         """
 
         makedirs(self.log_save_location.text, exist_ok=True)
-        log_id = str(datetime.now().replace(microsecond=0)).replace(':', '.')
+        log_id = str(self.app.now().replace(microsecond=0)).replace(':', '.')
         log_filename = f"Wellbeing Reminder Logs {log_id}.csv"
-        log_file = open(join(self.log_save_location.text, log_filename), "w", newline="")
-        csv_writer = writer(log_file)
-        csv_writer.writerow(("Date", "Screen Time", "Eye Care Count", "Hydration Count", "Water Quantity",
-                             "Exercise Count"))
 
-        screen_times = self.app.screen_time_history
-        event_counts = self.app.event_count_history
+        since = None
+        if self.app.settings_store["log_export_range"]["value"] == "Since last save":
+            since = self.app.settings_store["last_log_export"]["value"] or None
+
+        self.log_save_btn.text = "Saving..."
+        LogExporter(self.app.storage.load_history_columns, join(self.log_save_location.text, log_filename), since,
+                    self.show_log_save_progress,
+                    lambda last_date, error: self.finish_log_save(log_filename, last_date, error)).start()
+
+    @mainthread
+    def show_log_save_progress(self, rows_written: int, total_rows: int) -> None:
+        """
+        Shows the progress of the reminder logs export on the log save button.
+
+        :param rows_written: Number of rows written so far.
+        :param total_rows: Number of rows to be written.
+        """
 
-        logs = {}
-        for date in screen_times.keys():
-            logs[date] = [date, format_time(screen_times[date]["minutes"]), "N/A", "N/A", "N/A", "N/A"]
+        self.log_save_btn.text = f"Saving... {rows_written * 100 // total_rows}%"
 
-        for date in event_counts.keys():
-            if date not in logs.keys():
-                logs[date] = [date, "N/A", "N/A", "N/A", "N/A"]
+    @mainthread
+    def finish_log_save(self, log_filename: str, last_date: str, error: Exception) -> None:
+        """
+        Shows the result of the reminder logs export and remembers the last exported date.
 
-            logs[date][2] = event_counts[date]["eyes"]
-            water_count, water_quantity = event_counts[date]["water"]
-            logs[date][3] = water_count
-            if water_quantity:
-                logs[date][4] = water_quantity
-            logs[date][5] = event_counts[date]["exercise"]
+        :param log_filename: Name of the saved log file.
+        :param last_date: The last date written to the log file, None if no date was written.
+        :param error: The error which stopped the export, None if the export succeeded.
+        """
 
-        csv_writer.writerows(logs.values())
-        log_file.close()
+        if error is not None:
+            self.log_save_btn.text = "Could not save the logs"
+        else:
+            self.log_save_btn.text = f"Saved {log_filename}"
+            if last_date is not None:
+                self.app.settings_store["last_log_export"] = {"value": last_date}
 
-        self.log_save_btn.text = f"Saved {log_filename}"
         Clock.schedule_once(lambda dt: self.reset_log_save_btn_text(), 3)
 
 
@@ -677,25 +783,53 @@ class WellbeingApp(App):
     running = BooleanProperty(True)
 
     def __init__(self) -> None:
+        tracer.begin("app init")
         super().__init__()
         Window.bind(on_request_close=self.hide_app)  # hide app when closed with "X" button
+        Window.bind(on_draw=self.on_window_draw, on_flip=lambda *args: self.low_power)  # not drawn while hidden
         self.icon = "assets/images/heart.png"
 
         self.visible = False
+        self.max_fps = Clock._max_fps  # NOQA, render rate restored when the window is shown
+        self.drawn_frames = 0
         self.hotkey_return_value = None
-
-        self.quotes_store = DictStore("data/quotes.dat")
-        self.set_default_quotes()
-
-        self.settings_store = DictStore("data/settings.dat")
-        self.set_default_settings()
-
-        self.screen_time_history = DictStore("data/screen_time_history.dat")
-        self.event_count_history = DictStore("data/event_count_history.dat")
+        self.now = datetime.now  # every time decision of the screens goes through this clock
+
+        with tracer.phase("open quotes"):
+            self.quote_store = QuoteStore(PickleFileStore(join(DATA_DIR, "quotes.dat")), QUOTE_STORE_CAP)
+            self.set_default_quotes()
+        self.quote_prefetcher = QuotePrefetcher(QUOTE_ENDPOINT, QUOTE_BATCH_SIZE)
+
+        with tracer.phase("open stores"):
+            self.storage = AppStores()
+            self.settings_store = self.storage.settings_store
+            self.screen_time_history = self.storage.screen_time_history
+            self.event_count_history = self.storage.event_count_history
+            self.rollups = self.storage.rollups
+            self.set_default_settings()
+        self.analytics = WellbeingAnalytics(self.storage.load_history_columns, now=lambda: self.now())
+
+        self.audio = AudioEngine(create_audio_backend(AUDIO_BACKEND))
+        self.update_audio_settings()
+
+        # Stores only keep changes in memory, write them to disk in batches
+        self.stores = (self.quote_store,) + self.storage.stores
+
+        # Every change of the day totals goes through the rollup index, which records it in the outbox when syncing
+        self.sync_client = None
+        if SYNC_ENDPOINT:
+            outbox = SyncOutbox(join(DATA_DIR, "outbox.db"))
+            self.rollups.listeners.append(outbox.add)
+            self.sync_client = SyncClient(outbox, SYNC_ENDPOINT, self.settings_store["sync_client_id"]["value"],
+                                          SYNC_TEAM, SYNC_BATCH_SIZE, SYNC_INTERVAL)
+            self.stores += (outbox,)
+        Clock.schedule_interval(lambda dt: self.flush_stores(), STORE_FLUSH_INTERVAL)
 
         self.screen_manager = CustomScreenManager(transition=NoTransition())
 
-        Clock.schedule_interval(lambda dt: self.handle_second_instance(), 1/60)
+        # Commands sent by later launches of the application
+        instance_channel.register("show", self.show_app)
+        tracer.end("app init")
 
     def hide_app(self, *args) -> bool:  # NOQA
         """
@@ -706,30 +840,98 @@ class WellbeingApp(App):
 
         self.root_window.minimize()
         self.root_window.hide()
-
-        if self.screen_manager.get_screen("Reminder Screen").remind_event is not None:
-            self.screen_manager.current = "Home Screen"
-            self.screen_manager.get_screen("Home Screen").get_quote()
+        self.flush_stores()
 
         self.visible = False
+        self.enter_low_power()
+        tracer.mark("hide")
         return True
 
     @mainthread
     def close_app(self, *args) -> None:  # NOQA
         """
-        Closes the application window.
+        Closes the application window after writing the pending changes of every store to disk.
         """
 
+        self.flush_stores()
         self.root_window.close()
 
     @mainthread
     def show_app(self, *args) -> None:  # NOQA
         """
-        Shows the application window.
+        Shows the application window, on the home screen with a new quote unless a reminder is waiting for an answer.
         """
 
+        if not self.visible and self.screen_manager.has_screen("Home Screen") and \
+                not self.screen_manager.get_screen("Reminder Screen").scheduler.paused:
+            self.screen_manager.current = "Home Screen"
+            self.screen_manager.get_screen("Home Screen").get_quote()
+
+        self.exit_low_power()
         self.root_window.show()
         self.visible = True
+        tracer.mark("show")
+
+    @property
+    def low_power(self) -> bool:
+        """
+        Whether the window is hidden in low-power mode, in which labels are not updated and frames are not drawn.
+        """
+
+        return LOW_POWER_HIDDEN and not self.visible
+
+    def enter_low_power(self) -> None:
+        """
+        Lowers the render loop to `HIDDEN_MAX_FPS` frames per second while the window is hidden, frames are not drawn
+        at all (see `on_window_draw`).
+
+        | Note:
+        - Reminders and the per-minute counters run on clock events, so they only lose sub-second accuracy.
+        - Show requests are scheduled from other threads on the "interrupt" clock, which wakes the loop at once.
+        """
+
+        if LOW_POWER_HIDDEN:
+            Clock._max_fps = HIDDEN_MAX_FPS  # NOQA
+
+    def exit_low_power(self) -> None:
+        """
+        Restores the render loop rate and refreshes the labels left untouched while the window was hidden.
+        """
+
+        Clock._max_fps = self.max_fps  # NOQA
+        Window.canvas.ask_update()  # draw the changes left undrawn while hidden
+
+        if self.screen_manager.has_screen("Home Screen"):
+            self.screen_manager.get_screen("Home Screen").refresh()
+            self.screen_manager.get_screen("Reminder Screen").reset_skip_count()
+
+    def on_window_draw(self, *args) -> bool:  # NOQA
+        """
+        Counts the drawn frames, or skips drawing the window while it is hidden in low-power mode.
+
+        :return: True to stop the window from drawing.
+        """
+
+        if self.low_power:
+            return True
+
+        self.drawn_frames += 1
+        return False
+
+    def report_idle_wakeups(self, seconds: float) -> None:
+        """
+        Prints the clock ticks, drawn frames and CPU time of the next `seconds` of idling and quits, used by
+        benchmarks/idle.py.
+        """
+
+        frames, drawn_frames, cpu_time = Clock.frames, self.drawn_frames, process_time()
+
+        def report(dt) -> None:  # NOQA
+            print(f"idle_ticks={Clock.frames - frames} idle_draws={self.drawn_frames - drawn_frames} "
+                  f"idle_cpu_ms={(process_time() - cpu_time) * 1000:.1f} idle_seconds={seconds:g}", flush=True)
+            self.close_app()
+
+        Clock.schedule_once(report, seconds)
 
     @mainthread
     def toggle_app_visibility(self) -> None:
@@ -742,34 +944,76 @@ class WellbeingApp(App):
         else:
             self.show_app()
 
-    def handle_second_instance(self):
+    def flush_stores(self) -> None:
         """
-        This method checks if the app should be shown when a second instance is launched.
-        It reads the value of the 'show' key from the DictStore file 'data/instance.dat'.
-        If the value is True, it sets it to False and calls the show_app() method.
-        Otherwise, it does nothing.
+        Writes the pending changes of every store to disk.
         """
 
-        to_show = DictStore("data/instance.dat")["instance"]["show"]
-        if to_show:
-            DictStore("data/instance.dat")["instance"] = {"show": False}
-            self.show_app()
+        for store in self.stores:
+            store.flush()
 
     def create_hotkey(self) -> None:
         """
-        Creates a global hotkey for toggling the visibility of the application window.
+        Creates a global hotkey for toggling the visibility of the application window, replacing the existing one.
         """
 
+        from keyboard import add_hotkey, remove_hotkey  # imported on first use as it installs a keyboard hook
+
+        if self.hotkey_return_value is not None:
+            remove_hotkey(self.hotkey_return_value)
+
         self.hotkey_return_value = add_hotkey(self.settings_store["visibility_hotkey"]["value"],
                                               self.toggle_app_visibility)
 
+    def start_tray_icon(self) -> None:
+        """
+        Shows the tray icon, running the tray toolkit on its own thread.
+        """
+
+        from tray_icon import TrayIconApp  # imported on the tray thread so that wx never delays the main thread
+
+        TrayIconApp("Wellbeing", "assets/images/heart.ico",
+                    ({"name": "Show", "action": self.show_app}, {"name": "Quit", "action": self.close_app}),
+                    self.show_app, on_ready=self.on_tray_ready).run()
+
+    def on_tray_ready(self) -> None:
+        """
+        Called from the tray thread once the tray icon is shown, reports startup timings in benchmark mode.
+        """
+
+        tracer.mark("tray ready")
+        tracer.write()
+
+        if STARTUP_BENCHMARK:
+            print(f"startup_import_ms={import_time * 1000:.1f} "
+                  f"startup_tray_ms={(perf_counter() - start_time) * 1000:.1f}", flush=True)
+            self.close_app()
+
+    def open_settings(self) -> None:
+        """
+        Switches to the settings screen, building it on first use.
+        """
+
+        if not self.screen_manager.has_screen("Settings Screen"):
+            self.screen_manager.add_widget(SettingsScreen())
+
+        self.screen_manager.current = "Settings Screen"
+
+    def update_audio_settings(self) -> None:
+        """
+        Applies the reminder volume and quiet hours settings to the audio engine.
+        """
+
+        self.audio.volume = int(self.settings_store["reminder_volume"]["value"].rstrip("%")) / 100
+        self.audio.quiet_hours = parse_quiet_hours(self.settings_store["quiet_hours"]["value"])
+
     def set_default_quotes(self) -> None:
         """
         Sets default quotes if the quotes database is empty or does not exist.
         """
 
-        if not self.quotes_store.exists("quotes") or len(self.quotes_store["quotes"]["quotes"]) == 0:
-            self.quotes_store["quotes"] = {"quotes": [
+        if len(self.quote_store) == 0:
+            for quote in [
                 {"content": "You can tell whether a man is clever by his answers. You can tell whether a man "
                             "is wise by his questions.", "author": "Naguib Mahfouz"},
                 {'content': 'The first duty of a human being is to assume the right functional relationship to'
@@ -781,7 +1025,8 @@ class WellbeingApp(App):
                  'author': 'Pope Paul VI'},
                 {'content': "Don't settle for a relationship that won't let you be yourself.",
                  'author': 'Oprah Winfrey'}
-            ]}
+            ]:
+                self.quote_store.add(quote["content"], quote["author"])
 
     def set_default_settings(self) -> None:
         """
@@ -791,27 +1036,74 @@ class WellbeingApp(App):
         default_settings = {
             "user_name": "",
             "time_format": "AM/PM",
-            "eyes_freq": "20 min",
-            "water_freq": "45 min",
-            "exercise_freq": "1 hr",
+            **registry.default_settings(),
             "visibility_hotkey": "Ctrl + Shift + W",
-            "water_intake": "200"
+            "log_export_range": "All dates",
+            "reminder_volume": "100%",
+            "quiet_hours": "Off",
+            "last_log_export": "",
+            "sync_client_id": uuid4().hex
         }
 
         for key in default_settings:
             if not self.settings_store.exists(key):
                 self.settings_store[key] = {"value": default_settings[key]}
 
+    def on_first_frame(self) -> None:
+        """
+        Called once the first frame has been drawn, writes the startup phases when tracing.
+        """
+
+        tracer.mark("first frame")
+        tracer.write()
+
+    def load_kv(self, filename: str = None) -> bool:
+        with tracer.phase("load kv"):
+            return super().load_kv(filename)
+
     def on_start(self) -> None:
-        TrayIconApp("Wellbeing", "assets/images/heart.ico",
-                    ({"name": "Show", "action": self.show_app}, {"name": "Quit", "action": self.close_app}),
-                    self.show_app).run_detached(True)
-        self.create_hotkey()
+        tracer.begin("on start")
+        Thread(target=self.start_tray_icon, daemon=True).start()
+        self.quote_prefetcher.start()
+        if self.sync_client is not None:
+            self.sync_client.start()
+
+        if LAZY_STARTUP:
+            Clock.schedule_once(lambda dt: self.create_hotkey(), 1)  # once the first frames have been drawn
+        else:
+            self.create_hotkey()
+
+        Clock.schedule_once(lambda dt: self.on_first_frame())
+        self.enter_low_power()  # the window starts hidden
+
+        if IDLE_BENCHMARK:
+            Clock.schedule_once(lambda dt: self.report_idle_wakeups(IDLE_BENCHMARK), 5)  # once startup has settled
+        tracer.end("on start")
+
+    def on_stop(self) -> None:
+        tracer.mark("stop")
+        self.quote_prefetcher.stop()
+        if self.sync_client is not None:
+            self.sync_client.stop()  # joins the worker before its outbox is closed
+        self.flush_stores()
+        self.quote_store.close()
+        if self.sync_client is not None:
+            self.sync_client.outbox.close()
+        self.storage.close()  # the history, then the rollups with the clean shutdown marker, then the database
+        tracer.counter("store writes saved", self.storage.writes_saved())
+        tracer.counter("texture cache", texture_cache.stats())
+        tracer.counter("audio latency", self.audio.latency_stats())
+        tracer.write()
 
     def build(self) -> ScreenManager:
-        self.screen_manager.add_widget(HomeScreen())
-        self.screen_manager.add_widget(ReminderScreen())
-        self.screen_manager.add_widget(SettingsScreen())
+        with tracer.phase("build"):
+            with tracer.phase("build home screen"):
+                self.screen_manager.add_widget(HomeScreen())
+            with tracer.phase("build reminder screen"):
+                self.screen_manager.add_widget(ReminderScreen())
+            if not LAZY_STARTUP:
+                with tracer.phase("build settings screen"):
+                    self.screen_manager.add_widget(SettingsScreen())
         return self.screen_manager
 
 
@@ -0,0 +1,150 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import sys
+from shutil import which
+from subprocess import run, DEVNULL, SubprocessError
+from queue import Queue, Empty
+from threading import Thread, Lock
+
+
+# <<< BACKENDS >>>
+
+class NotificationBackend:
+    """
+    Shows notifications through the toast machinery of the operating system.
+    """
+
+    def show(self, title: str, message: str, icon: str) -> None:
+        """
+        Shows a notification, called from the dispatcher's worker thread.
+
+        :param title: The title of the notification.
+        :param message: The message content of the notification.
+        :param icon: The absolute path of the icon image.
+        """
+
+        raise NotImplementedError
+
+
+class WinotifyBackend(NotificationBackend):
+    """
+    Windows toast notifications through `winotify`.
+    """
+
+    def __init__(self, app_id: str = "Wellbeing") -> None:
+        from winotify import Notification  # imported here as it is only available on Windows
+
+        self.app_id = app_id
+        self.notification_class = Notification
+
+    def show(self, title: str, message: str, icon: str) -> None:
+        self.notification_class(app_id=self.app_id, title=title, msg=message, icon=icon).show()
+
+
+class LibnotifyBackend(NotificationBackend):
+    """
+    Desktop notifications on Linux through the `notify-send` command of libnotify.
+    """
+
+    def __init__(self, app_name: str = "Wellbeing", command: str = "notify-send") -> None:
+        self.app_name = app_name
+        self.command = command
+
+    def show(self, title: str, message: str, icon: str) -> None:
+        try:
+            run([self.command, f"--app-name={self.app_name}", f"--icon={icon}", title, message],
+                stdout=DEVNULL, stderr=DEVNULL, timeout=10)
+        except (OSError, SubprocessError):
+            pass
+
+
+class RecordingBackend(NotificationBackend):
+    """
+    Keeps shown notifications in memory instead of showing them, for tests and headless runs.
+    """
+
+    def __init__(self) -> None:
+        self.notifications = []
+
+    def show(self, title: str, message: str, icon: str) -> None:
+        self.notifications.append({"title": title, "message": message, "icon": icon})
+
+
+def create_backend(name: str = "auto") -> NotificationBackend:
+    """
+    Creates a notification backend.
+
+    :param name: "winotify", "libnotify", "recording" or "auto" to pick the backend of the current platform.
+    :return: The notification backend, a recording backend if the platform has none.
+    """
+
+    if name == "auto":
+        if sys.platform == "win32":
+            name = "winotify"
+        elif which("notify-send"):
+            name = "libnotify"
+        else:
+            name = "recording"
+
+    return {"winotify": WinotifyBackend, "libnotify": LibnotifyBackend, "recording": RecordingBackend}[name]()
+
+
+# <<< DISPATCHER >>>
+
+class NotificationDispatcher:
+    """
+    Shows notifications from a worker thread so that the UI never waits on the operating system.
+
+    Note: Notifications queued within `coalesce_window` seconds of each other are shown as a single notification.
+    """
+
+    def __init__(self, backend: NotificationBackend, coalesce_window: float = 0.5) -> None:
+        self.backend = backend
+        self.coalesce_window = coalesce_window
+
+        self.queued = 0
+        self.shown = 0
+
+        self._queue = Queue()
+        self._worker = None
+        self._lock = Lock()
+
+    def notify(self, title: str, message: str, icon: str) -> None:
+        """
+        Queues a notification and returns immediately.
+
+        :param title: The title of the notification.
+        :param message: The message content of the notification.
+        :param icon: The absolute path of the icon image.
+        """
+
+        with self._lock:
+            if self._worker is None:
+                self._worker = Thread(target=self._run, daemon=True)
+                self._worker.start()
+
+        self.queued += 1
+        self._queue.put((title, message, icon))
+
+    def _run(self) -> None:
+        while True:
+            notifications = [self._queue.get()]
+            try:
+                while True:
+                    notifications.append(self._queue.get(timeout=self.coalesce_window))
+            except Empty:
+                pass
+
+            if len(notifications) == 1:
+                title, message, icon = notifications[0]
+            else:
+                title = f"{len(notifications)} Wellbeing Reminders"
+                message = "\n".join(notification[0] for notification in notifications)
+                icon = notifications[0][2]
+
+            try:
+                self.backend.show(title, message, icon)
+            except Exception:  # NOQA, a failing toast must not stop the worker
+                continue
+
+            self.shown += 1
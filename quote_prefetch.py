@@ -0,0 +1,129 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+from json import loads
+from collections import deque
+from threading import Thread, Event, Lock
+from urllib.parse import urlsplit
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+
+
+# <<< QUOTE PREFETCHER >>>
+
+class QuotePrefetcher:
+    """
+    Keeps a small buffer of quotes fetched in batches on a worker thread, so that showing a new quote never waits
+    on the network.
+
+    | Note:
+    - The endpoint is a URL template in which "{count}" is replaced by the batch size, it must return a JSON quote
+      or a JSON list of quotes with "content" and "author" keys.
+    - A single keep-alive connection is reused between batches and recreated after an error.
+    - Failed batches are retried after an exponential backoff.
+    """
+
+    def __init__(self, endpoint: str, batch_size: int = 10, low_water: int = 3, timeout: float = 10,
+                 backoff: float = 30, max_backoff: float = 3600) -> None:
+        """
+        :param endpoint: URL template of the quotes API.
+        :param batch_size: Number of quotes requested per batch.
+        :param low_water: A new batch is fetched when fewer quotes than this are buffered.
+        :param timeout: Seconds to wait for the server.
+        :param backoff: Seconds to wait after the first failure, doubled after every further failure.
+        :param max_backoff: Upper bound of the backoff.
+        """
+
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.failures = 0
+
+        self._buffer = deque()
+        self._lock = Lock()
+        self._wanted = Event()
+        self._stopped = Event()
+        self._connection = None
+
+    def start(self) -> None:
+        """
+        Starts the worker thread which fills the buffer.
+        """
+
+        self._wanted.set()
+        Thread(target=self._run, daemon=True).start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wanted.set()
+
+    def pop(self) -> dict:
+        """
+        Takes a quote from the buffer and asks the worker for a new batch if the buffer is running low.
+
+        :return: A dictionary with the "content" and "author" of the quote, or None if the buffer is empty.
+        """
+
+        with self._lock:
+            quote = self._buffer.popleft() if self._buffer else None
+            if len(self._buffer) < self.low_water:
+                self._wanted.set()
+
+        return quote
+
+    def fetch_batch(self) -> list:
+        """
+        Requests a batch of quotes from the endpoint over the reused connection.
+
+        :return: A list of quotes.
+        """
+
+        url = urlsplit(self.endpoint.format(count=self.batch_size))
+        path = f"{url.path or '/'}?{url.query}" if url.query else (url.path or "/")
+
+        if self._connection is None:
+            connection_class = HTTPSConnection if url.scheme == "https" else HTTPConnection
+            self._connection = connection_class(url.netloc, timeout=self.timeout)
+
+        try:
+            self._connection.request("GET", path, headers={"Accept": "application/json"})
+            response = self._connection.getresponse()
+            body = response.read()
+        except (OSError, HTTPException):
+            self._connection.close()
+            self._connection = None
+            raise
+
+        if response.status != 200:
+            raise HTTPException(f"quote endpoint returned {response.status}")
+
+        data = loads(body)
+        quotes = data if isinstance(data, list) else [data]
+        if not quotes:
+            raise ValueError("quote endpoint returned no quotes")
+
+        return [{"content": quote["content"], "author": quote["author"]} for quote in quotes]
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wanted.wait()
+            if self._stopped.is_set():
+                break
+
+            try:
+                quotes = self.fetch_batch()
+            except (OSError, ValueError, KeyError, TypeError, HTTPException):
+                self.failures += 1
+                self._stopped.wait(min(self.backoff * 2 ** min(self.failures - 1, 16), self.max_backoff))
+                continue
+
+            self.failures = 0
+            with self._lock:
+                self._buffer.extend(quotes)
+                if len(self._buffer) >= self.low_water:
+                    self._wanted.clear()
+
+        if self._connection is not None:
+            self._connection.close()
@@ -0,0 +1,148 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+from hashlib import blake2b
+from collections import OrderedDict
+from random import randrange, shuffle
+
+
+# <<< QUOTE STORE >>>
+
+def quote_key(content: str, author: str) -> str:
+    """
+    Returns the content hash identifying a quote.
+
+    :param content: The text of the quote.
+    :param author: The author of the quote.
+    :return: A hexadecimal hash of the content and author.
+    """
+
+    return blake2b(f"{content}\0{author}".encode("utf-8"), digest_size=12).hexdigest()
+
+
+class QuoteStore:
+    """
+    Size-capped collection of quotes with a content-hash index and a non-repeating shuffled rotation.
+
+    | Note:
+    - Quotes are kept ordered from least to most recently shown (or added), so the quote evicted when the cap is
+      exceeded is the one which has gone unseen the longest.
+    - `next_quote` deals quotes from a shuffled deck and reshuffles only once every quote has been shown. The deck
+      only holds stored quotes not shown since the last shuffle, shown and evicted quotes leave it right away.
+    - The quotes are saved in the wrapped store under the "quotes" key, in the same {"quotes": [...]} shape used by
+      earlier versions, with a "shown" count added to each quote.
+    """
+
+    def __init__(self, store, cap: int = 500) -> None:
+        """
+        :param store: The store in which the quotes are saved.
+        :param cap: The maximum number of quotes kept.
+        """
+
+        self.store = store
+        self.cap = cap
+
+        self.quotes = OrderedDict()  # content hash -> quote, least recently shown first
+        self._deck = []  # keys of the quotes left in the rotation, dealt from the end
+        self._deck_positions = {}  # key -> index in `_deck`
+        self._dirty = False
+
+        if store.exists("quotes"):
+            for quote in store["quotes"]["quotes"]:
+                self.add(quote["content"], quote["author"], quote.get("shown", 0))
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self.quotes)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.quotes
+
+    def add(self, content: str, author: str, shown: int = 0) -> str:
+        """
+        Adds a quote unless it is already stored, evicting the least recently shown quote if the cap is exceeded.
+
+        :param content: The text of the quote.
+        :param author: The author of the quote.
+        :param shown: The number of times the quote has been shown. Defaults to 0. A quote which has been shown only
+                      joins the rotation at the next shuffle.
+        :return: The content hash of the quote.
+        """
+
+        key = quote_key(content, author)
+        if key in self.quotes:
+            return key
+
+        self.quotes[key] = {"content": content, "author": author, "shown": shown}
+        self._dirty = True
+
+        # Put the new quote at a random position in the current deck
+        if not shown:
+            self._deck.append(key)
+            self._deck_positions[key] = len(self._deck) - 1
+            self._swap(randrange(len(self._deck)), len(self._deck) - 1)
+
+        while len(self.quotes) > self.cap:
+            self._remove_from_deck(self.quotes.popitem(last=False)[0])
+
+        return key
+
+    def _swap(self, first: int, second: int) -> None:
+        deck = self._deck
+        deck[first], deck[second] = deck[second], deck[first]
+        self._deck_positions[deck[first]] = first
+        self._deck_positions[deck[second]] = second
+
+    def _remove_from_deck(self, key: str) -> None:
+        position = self._deck_positions.get(key)
+        if position is not None:
+            self._swap(position, len(self._deck) - 1)
+            del self._deck_positions[self._deck.pop()]
+
+    def mark_shown(self, key: str) -> None:
+        """
+        Records that a quote has been shown.
+
+        :param key: The content hash of the quote.
+        """
+
+        self.quotes[key]["shown"] += 1
+        self.quotes.move_to_end(key)
+        self._remove_from_deck(key)
+        self._dirty = True
+
+    def next_quote(self) -> dict:
+        """
+        Returns the next quote of the shuffled rotation and records that it has been shown.
+
+        :return: A dictionary with the "content" and "author" of the quote.
+        """
+
+        if not self._deck:
+            if not self.quotes:
+                raise IndexError("no quotes stored")
+
+            self._deck = list(self.quotes)
+            shuffle(self._deck)
+            self._deck_positions = {key: position for position, key in enumerate(self._deck)}
+
+        key = self._deck[-1]
+        self.mark_shown(key)
+        return {"content": self.quotes[key]["content"], "author": self.quotes[key]["author"]}
+
+    def flush(self) -> None:
+        """
+        Saves the quotes in the wrapped store if they changed.
+        """
+
+        if self._dirty:
+            self.store["quotes"] = {"quotes": list(self.quotes.values())}
+            self._dirty = False
+
+        if hasattr(self.store, "flush"):
+            self.store.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+        if hasattr(self.store, "close"):
+            self.store.close()
@@ -0,0 +1,213 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+# Registry of the reminder types: what each reminder says and shows, how often it is due and what it counts. The
+# scheduler, the history stores and the screens iterate over the registry instead of naming the reminder types.
+
+from json import load
+from os.path import exists
+from config import REMINDER_TYPES_PATH
+
+DEFAULT_ICON = "assets/images/heart.png"
+DEFAULT_SOUND = "assets/sounds/reminder_sound.mp3"
+
+# Built-in reminder types, in the slot order of the event count history
+BUILTIN_TYPES = [
+    {
+        "name": "eyes",
+        "title": "Relaxed eyes",
+        "heading": "Eye Care Interval",
+        "notification_title": "Eyes Relaxation Reminder",
+        "texts": [
+            "Take a break! Relax your eyes and look away from the screen for a minute.",
+            "Let your eyes stretch too! Pause and focus on a distant object for a quick refresh.",
+            "It's time to refresh your eyes. Close them for a moment and let them rest."
+        ],
+        "icon": "assets/images/eyes.png",
+        "frequency": "20 min",
+        "frequencies": ["20 min", "30 min", "45 min", "1 hr"],
+        "log_headers": ["Eye Care Count"],
+        "goal": 8
+    },
+    {
+        "name": "water",
+        "title": "Drank water",
+        "heading": "Hydration Interval",
+        "notification_title": "Hydration Reminder",
+        "texts": [
+            "Stay hydrated! Grab your water bottle and take a moment for a drink.",
+            "It's water time! Remember to keep yourself hydrated throughout the day.",
+            "Water break! Pour yourself a glass and savor the goodness of staying hydrated."
+        ],
+        "icon": "assets/images/water.png",
+        "frequency": "45 min",
+        "frequencies": ["30 min", "45 min", "1 hr", "2 hr"],
+        "quantity_setting": "water_intake",
+        "quantity_default": "200",
+        "unit": "mL",
+        "log_headers": ["Hydration Count", "Water Quantity"],
+        "goal": 8
+    },
+    {
+        "name": "exercise",
+        "title": "Exercised",
+        "heading": "Exercise Interval",
+        "notification_title": "Exercise Reminder",
+        "texts": [
+            "Get moving! Stand up, stretch, and take a short walk around.",
+            "Exercise break! Do a quick set of stretches or simple exercises to boost your energy.",
+            "Time to move! Incorporate some physical activity into your routine for a healthy break."
+        ],
+        "icon": "assets/images/exercise.png",
+        "frequency": "1 hr",
+        "frequencies": ["1 hr", "1.5 hr", "2 hr"],
+        "log_headers": ["Exercise Count"],
+        "goal": 4
+    }
+]
+
+
+# <<< REMINDER TYPES >>>
+
+class ReminderType:
+    """
+    A kind of reminder, e.g. eyes relaxation, hydration or posture.
+
+    | Note:
+    - Every type counts the reminders answered with "done" per day. A type with a `quantity_setting` also adds the
+      value of that setting (e.g. the water intake per reminder) to a daily quantity, it is stored as [count,
+      quantity] like "water".
+    - The reminder frequency is stored in the "<name>_freq" setting.
+    """
+
+    def __init__(self, name: str, title: str, heading: str = "", notification_title: str = "", texts: list = None,
+                 icon: str = DEFAULT_ICON, frequency: str = "1 hr", frequencies: list = None,
+                 quantity_setting: str = None, quantity_default: str = "", unit: str = "", log_headers: list = None,
+                 sound: str = DEFAULT_SOUND, goal: int = 0, enabled: bool = True) -> None:
+        """
+        :param name: Identifier of the type, used in the history stores and settings.
+        :param title: Title of the home screen card, e.g. "Drank water".
+        :param heading: Heading of the frequency setting. Defaults to "<Name> Interval".
+        :param notification_title: Title of the notification. Defaults to "<Name> Reminder".
+        :param texts: Reminder texts, one is chosen at random per reminder.
+        :param icon: Path of the image of the card, reminder and notification.
+        :param frequency: Default frequency, e.g. "45 min".
+        :param frequencies: Frequencies offered in the settings. Defaults to `frequency` only.
+        :param quantity_setting: Setting holding the quantity added per reminder, None to count reminders only.
+        :param quantity_default: Default value of the quantity setting.
+        :param unit: Unit of the quantity, e.g. "mL".
+        :param log_headers: CSV headers of the count (and quantity) columns of the exported logs.
+        :param sound: Path of the reminder sound.
+        :param goal: Daily count to reach, 0 for no goal.
+        :param enabled: Disabled types keep their history but are neither scheduled nor shown.
+        """
+
+        label = name.replace("_", " ").title()
+
+        self.name = name
+        self.title = title
+        self.heading = heading or f"{label} Interval"
+        self.notification_title = notification_title or f"{label} Reminder"
+        self.texts = texts or [f"Time for your {label.lower()} break!"]
+        self.icon = icon
+        self.frequency = frequency
+        self.frequencies = frequencies or [frequency]
+        self.quantity_setting = quantity_setting
+        self.quantity_default = quantity_default
+        self.unit = unit
+        self.sound = sound
+        self.goal = goal
+        self.enabled = enabled
+
+        self.frequency_setting = f"{name}_freq"
+        self.width = 2 if quantity_setting else 1  # slots in the event count history
+        self.columns = (name,) if self.width == 1 else (f"{name}_count", f"{name}_quantity")
+        self.log_headers = log_headers or [f"{label} Count", f"{label} Quantity"][:self.width]
+
+    @property
+    def empty_count(self):
+        """
+        The count of a day without any answered reminder, 0 or [0, 0] with a quantity.
+        """
+
+        return 0 if self.width == 1 else [0, 0]
+
+
+class ReminderRegistry:
+    """
+    Ordered collection of the reminder types.
+
+    | Note:
+    - Iterating over the registry yields the enabled types, `all` also holds the disabled ones.
+    - The order of `all` is the slot order of the event count history: the built-in types first, then the configured
+      ones. Configured types must therefore only be appended, and disabled rather than removed.
+    """
+
+    def __init__(self, types: list) -> None:
+        self.all = list(types)
+        self._types = {reminder_type.name: reminder_type for reminder_type in self.all}
+        self._enabled = [reminder_type for reminder_type in self.all if reminder_type.enabled]
+
+        self.schema = tuple((reminder_type.name, reminder_type.width) for reminder_type in self.all)
+        self.columns = tuple(column for reminder_type in self.all for column in reminder_type.columns)
+
+    @classmethod
+    def load(cls, path: str = REMINDER_TYPES_PATH) -> "ReminderRegistry":
+        """
+        Loads the built-in types, updated and extended by the types of a JSON file.
+
+        Note: The file holds a list of objects with the parameters of `ReminderType`. An object named after an
+        existing type updates it, e.g. {"name": "water", "enabled": false}, the others add new types.
+
+        :param path: Path of the JSON file, ignored if it does not exist.
+        """
+
+        definitions = {definition["name"]: dict(definition) for definition in BUILTIN_TYPES}
+
+        if exists(path):
+            with open(path, encoding="utf-8") as file:
+                for definition in load(file):
+                    definitions.setdefault(definition["name"], {}).update(definition)
+
+        return cls([ReminderType(**definition) for definition in definitions.values()])
+
+    def __iter__(self):
+        return iter(self._enabled)
+
+    def __len__(self) -> int:
+        return len(self._enabled)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._types
+
+    def __getitem__(self, name: str) -> ReminderType:
+        return self._types[name]
+
+    def names(self) -> list:
+        """
+        Returns the names of the enabled types.
+        """
+
+        return [reminder_type.name for reminder_type in self._enabled]
+
+    def empty_counts(self) -> dict:
+        """
+        Returns the event counts of a day without any answered reminder, e.g. {"eyes": 0, "water": [0, 0], ...}.
+        """
+
+        return {reminder_type.name: reminder_type.empty_count for reminder_type in self.all}
+
+    def default_settings(self) -> dict:
+        """
+        Returns the default frequency and quantity settings of every type.
+        """
+
+        settings = {}
+        for reminder_type in self.all:
+            settings[reminder_type.frequency_setting] = reminder_type.frequency
+            if reminder_type.quantity_setting:
+                settings[reminder_type.quantity_setting] = reminder_type.quantity_default
+
+        return settings
+
+
+registry = ReminderRegistry.load()
@@ -0,0 +1,329 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+# Reminder timings and daily counters, kept free of Kivy so that the simulation runner uses the same logic as the UI
+
+from math import ceil
+from datetime import datetime, date, timedelta
+from reminder_types import registry
+
+FREQ_MAPPINGS = {
+    "20 min": 20,
+    "30 min": 30,
+    "45 min": 45,
+    "1 hr": 60,
+    "1.5 hr": 90,
+    "2 hr": 120
+}
+MAX_SKIPS = 3  # skips allowed per day
+EPOCH = datetime(2000, 1, 1)  # origin of the minute numbers of `SlotAllocator`
+MINUTE = timedelta(minutes=1)
+BITMAP_LEVELS = 6  # levels of 64 bit words of `_Bitmap`, 64 ** 6 minutes are 130 000 years
+FULL_WORD = (1 << 64) - 1
+
+
+# <<< REMINDER TIMINGS >>>
+
+def frequency_minutes(frequency: str) -> int:
+    """
+    Converts a frequency setting such as "45 min" or "1.5 hr" to minutes.
+    """
+
+    if frequency in FREQ_MAPPINGS:
+        return FREQ_MAPPINGS[frequency]
+
+    value, unit = frequency.split()
+    return round(float(value) * (60 if unit.startswith("h") else 1))
+
+
+class _Bitmap:
+    """
+    Set of non-negative integers kept as a tree of 64 bit words, which finds the first member or the first free
+    integer from a position with one word operation per level.
+
+    | Note:
+    - The first level holds the members. A bit of a higher level marks a word of the level below which is not
+      empty (`_used`) or full (`_full`).
+    - Empty words are not stored, so the memory follows the number of members rather than their range.
+    """
+
+    def __init__(self) -> None:
+        words = {}  # word index -> member bits
+        self._used = [words] + [{} for _ in range(BITMAP_LEVELS - 1)]
+        self._full = [words] + [{} for _ in range(BITMAP_LEVELS - 1)]
+
+    def __contains__(self, position: int) -> bool:
+        return bool(self._used[0].get(position >> 6, 0) >> (position & 63) & 1)
+
+    def add(self, position: int) -> None:
+        if position not in self:
+            self._raise(self._used, position, False)
+            self._raise(self._full, position, True)
+
+    def discard(self, position: int) -> None:
+        if position in self:
+            self._lower(self._full, position, True)
+            self._lower(self._used, position, False)
+
+    def first_member(self, position: int):
+        """
+        :return: The first member from `position`, None if there is none.
+        """
+
+        return self._first(self._used, 0, position, 0)
+
+    def first_free(self, position: int) -> int:
+        """
+        :return: The first integer from `position` which is not a member.
+        """
+
+        return self._first(self._full, 0, position, FULL_WORD)
+
+    @staticmethod
+    def _raise(levels: list, position: int, full: bool) -> None:
+        # Sets the bit of a position, and the bit of its word in the next level once the word became full / used
+        for words in levels:
+            index, bit = position >> 6, 1 << (position & 63)
+            old = words.get(index, 0)
+            words[index] = old | bit
+            if (old | bit != FULL_WORD) if full else old:
+                return
+            position = index
+
+    @staticmethod
+    def _lower(levels: list, position: int, full: bool) -> None:
+        # Clears the bit of a position, and the bit of its word in the next level once the word is no longer full / used
+        for words in levels:
+            index, bit = position >> 6, 1 << (position & 63)
+            old = words.get(index, 0)
+            new = old & ~bit
+            if new:
+                words[index] = new
+            else:
+                words.pop(index, None)
+            if (old != FULL_WORD) if full else new:
+                return
+            position = index
+
+    def _first(self, levels: list, level: int, position: int, flip: int):
+        # First position from `position` whose bit at `level` is set, or clear when `flip` is FULL_WORD
+        index, offset = position >> 6, position & 63
+        bits = (levels[level].get(index, 0) ^ flip) >> offset << offset
+        if not bits:
+            if level + 1 == len(levels):
+                return None
+            index = self._first(levels, level + 1, index + 1, flip)
+            if index is None:
+                return None
+            bits = levels[level].get(index, 0) ^ flip
+
+        return (index << 6) + (bits & -bits).bit_length() - 1
+
+
+class SlotAllocator:
+    """
+    Reminder timings placing every new timing at least `min_gap` away from the others.
+
+    | Note:
+    - A timing is the next multiple of the frequency from the current minute which keeps the gap with every other
+      timing. Each frequency has a `_Bitmap` of the blocked multiples per residue (the minutes less than `min_gap`
+      away from a timing), so the first free multiple is found without stepping over the colliding timings.
+    - A placement or removal updates the grid of every frequency placed so far, once per blocked minute. It costs
+      O(F * min_gap) word operations for F frequencies, the handful offered in the settings of each reminder type,
+      whatever the number of timings. The first placement with a new frequency builds its grid in O(n * min_gap).
+    - Timings are kept as whole minutes since `EPOCH`, which keeps datetime arithmetic out of the search.
+    - `timings` maps each event type to its timing, `timeline` lists the timings in chronological order.
+    """
+
+    def __init__(self, min_gap: float = 2) -> None:
+        """
+        :param min_gap: Minimum minutes between two reminders, 1 only prevents reminders at the same minute.
+        """
+
+        self.min_gap = min_gap
+        self.timings = {}  # event type -> timing
+
+        self._reach = max(ceil(min_gap) - 1, -1)  # minutes blocked on each side of a timing
+        self._placed = {}  # event type -> (minute, frequency)
+        self._events = {}  # minute -> event types of the timings at that minute, in placement order
+        self._minutes = _Bitmap()  # minutes of the timings, in minutes since EPOCH
+        self._blocked = {}  # blocked minute -> number of timings blocking it
+        self._grids = {}  # frequency -> {residue: _Bitmap of the blocked minutes // frequency}
+
+    def __len__(self) -> int:
+        return len(self._placed)
+
+    def place(self, event_type: str, now: datetime, frequency: int) -> datetime:
+        """
+        Calculates the next reminder timing of an event, replacing its previous timing.
+
+        :param event_type: The type of the event.
+        :param now: The current datetime.
+        :param frequency: The frequency of the event in minutes.
+        :return: The next reminder timing.
+        """
+
+        self.remove(event_type)
+
+        start = (now - EPOCH) // MINUTE
+        residue, multiple = start % frequency, start // frequency + 1
+
+        if frequency not in self._grids:
+            self._grids[frequency] = {}
+            for minute in self._blocked:
+                self._grids[frequency].setdefault(minute % frequency, _Bitmap()).add(minute // frequency)
+
+        blocked = self._grids[frequency].get(residue)
+        if blocked is not None:
+            multiple = blocked.first_free(multiple)
+        minute = multiple * frequency + residue
+
+        self._placed[event_type] = (minute, frequency)
+        self._events.setdefault(minute, []).append(event_type)
+        self._minutes.add(minute)
+        for blocked_minute in range(minute - self._reach, minute + self._reach + 1):
+            self._block(blocked_minute)
+
+        self.timings[event_type] = EPOCH + minute * MINUTE
+        return self.timings[event_type]
+
+    def remove(self, event_type: str) -> None:
+        placed = self._placed.pop(event_type, None)
+        if placed is None:
+            return
+
+        minute = placed[0]
+        del self.timings[event_type]
+
+        events = self._events[minute]
+        events.remove(event_type)
+        if not events:
+            del self._events[minute]
+            self._minutes.discard(minute)
+
+        for blocked_minute in range(minute - self._reach, minute + self._reach + 1):
+            self._unblock(blocked_minute)
+
+    def clear(self) -> None:
+        self.timings.clear()
+        self._placed.clear()
+        self._events.clear()
+        self._minutes = _Bitmap()
+        self._blocked.clear()
+        self._grids.clear()
+
+    def timeline(self, limit: int = None) -> list:
+        """
+        Returns the upcoming reminders in chronological order.
+
+        :param limit: Maximum number of reminders returned. Defaults to all of them.
+        :return: A list of (timing, event type) tuples.
+        """
+
+        timeline = []
+        minute = self._minutes.first_member(0)
+        while minute is not None and (limit is None or len(timeline) < limit):
+            timeline.extend((self.timings[event_type], event_type) for event_type in self._events[minute])
+            minute = self._minutes.first_member(minute + 1)
+
+        return timeline[:limit]
+
+    def _block(self, minute: int) -> None:
+        count = self._blocked.get(minute, 0)
+        self._blocked[minute] = count + 1
+        if not count:
+            for frequency, grid in self._grids.items():
+                grid.setdefault(minute % frequency, _Bitmap()).add(minute // frequency)
+
+    def _unblock(self, minute: int) -> None:
+        count = self._blocked.pop(minute) - 1
+        if count:
+            self._blocked[minute] = count
+        else:
+            for frequency, grid in self._grids.items():
+                grid[minute % frequency].discard(minute // frequency)
+
+
+def reminders_to_update(reminder_timings: dict, answered_event: str, now: datetime) -> list:
+    """
+    Returns the event types whose reminder timing has to be recalculated once a reminder has been answered.
+
+    :param reminder_timings: The current reminder timing of each event type.
+    :param answered_event: The event type of the answered reminder, it is always recalculated (last).
+    :param now: The current datetime.
+    :return: Event types whose timing has passed, followed by the answered event type.
+    """
+
+    return [event_type for event_type, timing in reminder_timings.items()
+            if now >= timing and event_type != answered_event] + [answered_event]
+
+
+# <<< DAILY COUNTERS >>>
+
+def add_screen_time(screen_time_history, rollups, day: date, minutes: int = 1) -> int:
+    """
+    Adds screen time to a day, initializing the day with zero minutes if it has no record.
+
+    :param screen_time_history: The screen time history store.
+    :param rollups: The `RollupIndex` updated with the same change.
+    :param day: The day of the screen time.
+    :param minutes: The minutes to add, 0 only initializes the day.
+    :return: The screen time of the day in minutes.
+    """
+
+    key = str(day)
+
+    if not screen_time_history.exists(key):
+        screen_time_history[key] = {"minutes": 0}
+    if minutes:
+        screen_time_history[key] = {"minutes": screen_time_history[key]["minutes"] + minutes}
+        rollups.add(day, {"minutes": minutes})
+
+    return screen_time_history[key]["minutes"]
+
+
+def get_event_counts(event_count_history, day: date) -> dict:
+    """
+    Returns the event counts of a day, initializing the day with zero counts if it has no record.
+
+    Note: Every reminder type of the registry has a count, including types added after the day was recorded.
+    """
+
+    key = str(day)
+
+    if not event_count_history.exists(key):
+        event_count_history[key] = registry.empty_counts()
+
+    return {**registry.empty_counts(), **event_count_history[key]}
+
+
+def add_event_count(event_count_history, rollups, day: date, event_type: str, quantity: str = "") -> dict:
+    """
+    Counts a reminder answered with "done".
+
+    Note: For reminder types with a quantity (e.g. water), both the count and the daily quantity are updated.
+
+    :param event_count_history: The event count history store.
+    :param rollups: The `RollupIndex` updated with the same changes.
+    :param day: The day of the event.
+    :param event_type: The type of the event.
+    :param quantity: The quantity per reminder setting of the type (e.g. the water intake), empty if the quantity is
+                     not tracked.
+    :return: The updated event counts of the day.
+    """
+
+    event_counts = get_event_counts(event_count_history, day)
+    reminder_type = registry[event_type]
+
+    if reminder_type.width == 1:
+        event_counts[event_type] += 1
+        deltas = {event_type: 1}
+    else:
+        quantity = int(quantity) if quantity else 0
+        event_counts[event_type][0] += 1
+        event_counts[event_type][1] += quantity
+        deltas = dict(zip(reminder_type.columns, (1, quantity)))
+
+    event_count_history[str(day)] = event_counts
+    rollups.add(day, deltas)
+
+    return event_counts
@@ -0,0 +1,330 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import numpy as np
+from os import fsync, replace
+from os.path import exists
+from json import dumps, loads
+from zlib import crc32
+from datetime import date
+from analytics import EPOCH_ORDINAL, group_totals
+from history_columns import HistoryColumns
+from history_log import SCREEN_TIME_SCHEMA, EVENT_COUNT_SCHEMA
+from reminder_types import registry
+
+ROLLUP_FIELDS = ("minutes",) + registry.columns
+STATE_KEY = "state"  # "open" while the application runs, "closed" once every store has been closed
+
+
+# <<< ROLLUP LOG >>>
+
+class RollupLog:
+    """
+    Append-only store of the rollup totals, with the `DictStore` access pattern.
+
+    | Note:
+    - Every write appends one line per changed period, so a flush costs the same for any length of history.
+    - A line holds the CRC32 of its JSON [key, value] pair. A torn line at the end of the file (crash mid-write) fails
+      its checksum and is discarded on load, together with the lines after it.
+    - The file is rewritten with one line per key once it holds `compact_threshold` lines more than keys.
+    """
+
+    def __init__(self, path: str, compact_threshold: int = 4096) -> None:
+        """
+        :param path: Path of the log file.
+        :param compact_threshold: Number of superseded lines after which the log is compacted.
+        """
+
+        self.path = path
+        self.compact_threshold = compact_threshold
+
+        self._data = {}
+        self._lines = self._load()
+        self._log = open(path, "ab")
+
+    def exists(self, key: str) -> bool:
+        return key in self._data
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, key: str):
+        return self._data[key]
+
+    def __setitem__(self, key: str, value) -> None:
+        self.put_many(((key, value),))
+
+    def keys(self) -> list:
+        return list(self._data.keys())
+
+    def put_many(self, items) -> None:
+        """
+        Stores several values with a single write of the log.
+
+        :param items: An iterable of (key, value) pairs.
+        """
+
+        lines = []
+        for key, value in items:
+            self._data[key] = value
+            lines.append(self._encode(key, value))
+
+        self._log.write(b"".join(lines))
+        self._log.flush()
+        self._lines += len(lines)
+
+        if self._lines - len(self._data) >= self.compact_threshold:
+            self.compact()
+
+    @staticmethod
+    def _encode(key: str, value) -> bytes:
+        payload = dumps([key, value], separators=(",", ":")).encode()
+        return b"%08x %s\n" % (crc32(payload), payload)
+
+    def _load(self) -> int:
+        """
+        Reads the log and drops a torn tail, if any.
+
+        :return: The number of valid lines in the log.
+        """
+
+        if not exists(self.path):
+            return 0
+
+        with open(self.path, "rb") as file:
+            data = file.read()
+
+        lines = 0
+        valid_size = 0
+        for line in data.splitlines(keepends=True):
+            checksum, _, payload = line.rstrip(b"\n").partition(b" ")
+            if not line.endswith(b"\n") or checksum != b"%08x" % crc32(payload):
+                break
+
+            key, value = loads(payload)
+            self._data[key] = value
+            lines += 1
+            valid_size += len(line)
+
+        if valid_size != len(data):
+            with open(self.path, "r+b") as file:
+                file.truncate(valid_size)
+
+        return lines
+
+    def compact(self) -> None:
+        """
+        Rewrites the log with the current value of every key only.
+
+        Note: The log is written to a temporary file and renamed over the old one, so it is never half-written.
+        """
+
+        with open(f"{self.path}.tmp", "wb") as file:
+            file.write(b"".join(self._encode(key, value) for key, value in self._data.items()))
+            file.flush()
+            fsync(file.fileno())
+
+        self._log.close()
+        replace(f"{self.path}.tmp", self.path)
+        self._log = open(self.path, "ab")
+        self._lines = len(self._data)
+
+    def close(self) -> None:
+        """
+        Flushes and closes the log.
+        """
+
+        self._log.flush()
+        fsync(self._log.fileno())
+        self._log.close()
+
+
+# <<< ROLLUP INDEX >>>
+
+def period_keys(day: date) -> tuple:
+    """
+    Returns the keys of the ISO week, month and year containing a day, e.g. ("week:2026-W42", "month:2026-10",
+    "year:2026").
+    """
+
+    iso_year, iso_week, _ = day.isocalendar()
+    return f"week:{iso_year}-W{iso_week:02d}", f"month:{day.year}-{day.month:02d}", f"year:{day.year}"
+
+
+class RollupIndex:
+    """
+    Persisted totals of screen minutes and event counts per ISO week, month and year.
+
+    | Note:
+    - `add` updates the three periods containing a day, so keeping the index current costs the same for any length
+      of history.
+    - `rebuild` recomputes every period from the history, `verify` compares the index with the history.
+    - The history and the index are flushed separately, so a crash between both flushes leaves them diverged. The
+      index records whether the application closed cleanly (`mark_open`, `mark_closed`), `repair` rebuilds it from
+      the history otherwise.
+    - `listeners` are called with the day and the deltas of every `add`, e.g. to record them for the sync client.
+    """
+
+    def __init__(self, store) -> None:
+        """
+        :param store: The store in which the totals are saved, keyed by period key.
+        """
+
+        self.store = store
+        self.listeners = []
+
+    def get(self, key: str) -> dict:
+        """
+        Returns the totals of a period, zeros if nothing was recorded in it.
+
+        :param key: A period key, e.g. "month:2026-10".
+        """
+
+        totals = dict.fromkeys(ROLLUP_FIELDS, 0)
+        if self.store.exists(key):
+            totals.update(self.store[key])  # totals saved before a reminder type was added lack its fields
+
+        return totals
+
+    def week(self, day: date) -> dict:
+        return self.get(period_keys(day)[0])
+
+    def month(self, day: date) -> dict:
+        return self.get(period_keys(day)[1])
+
+    def year(self, day: date) -> dict:
+        return self.get(period_keys(day)[2])
+
+    def add(self, day: date, deltas: dict) -> None:
+        """
+        Adds changes of a day's values to the totals of its week, month and year.
+
+        :param day: The day whose values changed.
+        :param deltas: The change of each field, e.g. {"water_count": 1, "water_quantity": 200}.
+        """
+
+        for key in period_keys(day):
+            totals = self.get(key)
+            for field, delta in deltas.items():
+                totals[field] = totals.get(field, 0) + delta
+            self.store[key] = totals
+
+        for listener in self.listeners:
+            listener(day, deltas)
+
+    @property
+    def closed_cleanly(self) -> bool:
+        """
+        Whether the application closed cleanly after its last start, so the index matches the history.
+        """
+
+        return self.store.exists(STATE_KEY) and self.store[STATE_KEY] == "closed"
+
+    def mark_open(self) -> None:
+        """
+        Records a start of the application, to flush right away so that a crash is detected on the next start.
+        """
+
+        self.store[STATE_KEY] = "open"
+
+    def mark_closed(self) -> None:
+        """
+        Records a clean shutdown, to call once the history has been flushed and before the index store is closed.
+        """
+
+        self.store[STATE_KEY] = "closed"
+
+    def periods(self) -> list:
+        """
+        Returns the keys of the stored periods.
+        """
+
+        return [key for key in self.store.keys() if key != STATE_KEY]
+
+    def repair(self, columns: HistoryColumns) -> list:
+        """
+        Rebuilds the periods whose stored totals differ from the history.
+
+        :return: The keys of the rebuilt periods.
+        """
+
+        rollups = self.compute(columns)
+        zeros = dict.fromkeys(ROLLUP_FIELDS, 0)
+        mismatches = [key for key in sorted(set(rollups) | set(self.periods()))
+                      if self.get(key) != rollups.get(key, zeros)]
+
+        self.store.put_many((key, rollups.get(key, zeros)) for key in mismatches)
+        return mismatches
+
+    def compute(self, columns: HistoryColumns) -> dict:
+        """
+        Computes the totals of every period from the history columns.
+
+        :return: A dict of period key -> totals.
+        """
+
+        ordinals = columns.ordinals.astype(np.int64)
+        days = (ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+        week_starts = ordinals - (ordinals - 1) % 7  # ordinal 1 (0001-01-01) is a Monday
+
+        rollups = {}
+        for keys, label in ((week_starts, lambda key: period_keys(date.fromordinal(int(key)))[0]),
+                            (days.astype("datetime64[M]"), lambda key: f"month:{key}"),
+                            (days.astype("datetime64[Y]"), lambda key: f"year:{key}")):
+            totals = group_totals(keys, columns, ROLLUP_FIELDS)
+            for index, key in enumerate(totals["keys"]):
+                rollups[label(key)] = {field: int(totals[field][index]) for field in ROLLUP_FIELDS}
+
+        return rollups
+
+    def rebuild(self, columns: HistoryColumns) -> None:
+        """
+        Replaces every stored total with the totals computed from the history columns.
+        """
+
+        rollups = self.compute(columns)
+        for key in self.periods():
+            if key not in rollups:
+                rollups[key] = dict.fromkeys(ROLLUP_FIELDS, 0)
+
+        self.store.put_many(rollups.items())
+
+    def verify(self, columns: HistoryColumns) -> list:
+        """
+        Compares the stored totals with the totals computed from the history columns.
+
+        :return: The keys of the periods whose stored totals differ.
+        """
+
+        rollups = self.compute(columns)
+        keys = set(rollups) | set(self.periods())
+        zeros = dict.fromkeys(ROLLUP_FIELDS, 0)
+
+        return sorted(key for key in keys if self.get(key) != rollups.get(key, zeros))
+
+
+# <<< COMMAND LINE >>>
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+    from config import DATA_DIR
+
+    parser = ArgumentParser(description="Verifies or rebuilds the rollup index of the history logs. "
+                                        "Close Wellbeing before rebuilding.")
+    parser.add_argument("--data", default=DATA_DIR, help="directory containing the history logs")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the index instead of verifying it")
+    arguments = parser.parse_args()
+
+    history = HistoryColumns.load(f"{arguments.data}/screen_time_history", SCREEN_TIME_SCHEMA,
+                                  f"{arguments.data}/event_count_history", EVENT_COUNT_SCHEMA)
+    index = RollupIndex(RollupLog(f"{arguments.data}/rollups.log"))
+
+    if arguments.rebuild:
+        index.rebuild(history)
+        index.store.close()
+        print(f"Rebuilt {len(index.periods())} rollups from {len(history)} days")
+    else:
+        mismatches = index.verify(history)
+        print("\n".join(mismatches) if mismatches else "Rollup index matches the history")
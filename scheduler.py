@@ -0,0 +1,248 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+from heapq import heappush, heappop
+from itertools import count
+from time import monotonic
+from datetime import datetime
+
+
+# <<< REMINDER SCHEDULER >>>
+
+class ReminderScheduler:
+    """
+    Event-driven scheduler which keeps reminder deadlines in a priority queue and arms a single clock event for
+    the earliest deadline only.
+
+    | Note:
+    - Deadlines are wall-clock datetimes while the clock event waits on the monotonic clock, which does not advance
+      while the computer sleeps and ignores wall-clock adjustments.
+    - `heartbeat` reconciles both clocks: a deadline missed during a sleep or a wall-clock jump is caught up at once
+      instead of waiting for the stale clock event.
+    - Missed deadlines are either coalesced into a single call of `callback` with every missed event type, or, when
+      `on_missed` is given, handed to it to be re-planned forward.
+    """
+
+    def __init__(self, callback, clock=None, now=datetime.now, monotonic_time=monotonic, on_missed=None,
+                 jump_threshold: float = 90, on_lead=None, lead_time: float = 2) -> None:
+        """
+        :param callback: Called with the list of due event types (earliest first) when the next deadline is reached.
+        :param clock: Object providing `schedule_once(callback, timeout)` and `schedule_interval(callback, interval)`
+                      whose return values have `cancel()`. Defaults to the Kivy clock.
+        :param now: Callable returning the current datetime.
+        :param monotonic_time: Callable returning the monotonic time in seconds.
+        :param on_missed: Called with the event types whose deadline was missed by more than `jump_threshold`
+                          seconds, it must set their new deadlines. Defaults to None, which coalesces them instead.
+        :param jump_threshold: Seconds of difference between the wall and monotonic clocks, or of lateness of a
+                               deadline, from which a sleep or clock jump is assumed.
+        :param on_lead: Called `lead_time` seconds before the earliest deadline, e.g. to prepare the reminder sound.
+                        Defaults to None.
+        :param lead_time: Seconds before the earliest deadline at which `on_lead` is called.
+        """
+
+        if clock is None:
+            from kivy.clock import Clock  # imported here so that headless runs with a virtual clock never load Kivy
+            clock = Clock
+
+        self.callback = callback
+        self.clock = clock
+        self.now = now
+        self.monotonic_time = monotonic_time
+        self.on_missed = on_missed
+        self.jump_threshold = jump_threshold
+        self.on_lead = on_lead
+        self.lead_time = lead_time
+
+        self.deadlines = {}  # event type -> current deadline, entries in the queue not matching this are stale
+        self.paused = False
+        self.clock_jumps = 0
+
+        self._reference = None  # (wall clock, monotonic clock) at the last heartbeat
+        self._heartbeat_event = None
+
+        self._queue = []  # heap of (deadline, sequence, event_type)
+        self._sequence = count()
+        self._event = None
+        self._lead_event = None
+
+    def set(self, event_type: str, deadline: datetime, arm: bool = True) -> None:
+        """
+        Sets or replaces the deadline of an event type.
+
+        :param event_type: The type of the event.
+        :param deadline: The datetime at which the event is due.
+        :param arm: If True, re-arms the clock event for the (possibly new) earliest deadline. Defaults to True.
+        """
+
+        self.deadlines[event_type] = deadline
+        heappush(self._queue, (deadline, next(self._sequence), event_type))
+
+        if arm:
+            self.arm()
+
+    def remove(self, event_type: str) -> None:
+        """
+        Removes an event type from the schedule and re-arms the clock event.
+
+        :param event_type: The type of the event.
+        """
+
+        self.deadlines.pop(event_type, None)
+        self.arm()
+
+    def clear(self) -> None:
+        """
+        Removes every deadline and cancels the armed clock event.
+        """
+
+        self.deadlines.clear()
+        self._queue.clear()
+        self._cancel()
+
+    def peek(self) -> tuple:
+        """
+        Returns the earliest scheduled event.
+
+        Note: Stale queue entries (replaced or removed deadlines) are discarded on the way.
+
+        :return: A tuple of (deadline, event_type) or None if nothing is scheduled.
+        """
+
+        while self._queue:
+            deadline, _, event_type = self._queue[0]
+            if self.deadlines.get(event_type) == deadline:
+                return deadline, event_type
+
+            heappop(self._queue)
+
+        return None
+
+    def due(self, now: datetime = None) -> list:
+        """
+        Returns event types whose deadline has been reached, earliest first.
+
+        :param now: The datetime to compare the deadlines with. Defaults to the current time.
+        :return: A list of due event types.
+        """
+
+        now = self.now() if now is None else now
+        return [event_type for event_type, deadline in sorted(self.deadlines.items(), key=lambda item: item[1])
+                if deadline <= now]
+
+    def arm(self) -> None:
+        """
+        Arms a single clock event for the earliest deadline, replacing the previously armed one.
+        """
+
+        self._cancel()
+
+        next_event = self.peek()
+        if self.paused or next_event is None:
+            return
+
+        delay = max((next_event[0] - self.now()).total_seconds(), 0)
+        self._event = self.clock.schedule_once(self._on_deadline, delay)
+
+        if self.on_lead is not None and delay > self.lead_time:
+            self._lead_event = self.clock.schedule_once(lambda dt: self.on_lead(), delay - self.lead_time)
+
+    def pause(self) -> None:
+        """
+        Stops firing reminders while keeping the deadlines.
+        """
+
+        self.paused = True
+        self._cancel()
+
+    def resume(self) -> None:
+        """
+        Resumes firing reminders and re-arms the clock event.
+        """
+
+        self.paused = False
+        self.arm()
+
+    def start_heartbeat(self, interval: float = 60) -> None:
+        """
+        Calls `heartbeat` every `interval` seconds.
+        """
+
+        self.stop_heartbeat()
+        self._reference = (self.now(), self.monotonic_time())
+        self._heartbeat_event = self.clock.schedule_interval(lambda dt: self.heartbeat(), interval)
+
+    def stop_heartbeat(self) -> None:
+        if self._heartbeat_event is not None:
+            self._heartbeat_event.cancel()
+            self._heartbeat_event = None
+
+    def heartbeat(self) -> bool:
+        """
+        Reconciles the wall clock with the monotonic clock and catches up the deadlines missed in between.
+
+        | Note:
+        - A sleep or a wall-clock adjustment shows as a difference between the time elapsed on both clocks.
+        - Due deadlines are caught up in one step, future deadlines get the clock event re-armed from the wall clock.
+
+        :return: True if a sleep or clock jump was detected since the previous heartbeat.
+        """
+
+        wall, monotonic_now = self.now(), self.monotonic_time()
+
+        jumped = False
+        if self._reference is not None:
+            drift = (wall - self._reference[0]).total_seconds() - (monotonic_now - self._reference[1])
+            jumped = abs(drift) > self.jump_threshold
+        self._reference = (wall, monotonic_now)
+
+        if jumped:
+            self.clock_jumps += 1
+
+        if self.paused:
+            return jumped
+
+        if self.due(wall):
+            self._fire()
+        elif jumped:
+            self.arm()
+
+        return jumped
+
+    def missed(self, now: datetime = None) -> list:
+        """
+        Returns event types whose deadline passed more than `jump_threshold` seconds ago, earliest first.
+        """
+
+        now = self.now() if now is None else now
+        return [event_type for event_type in self.due(now)
+                if (now - self.deadlines[event_type]).total_seconds() > self.jump_threshold]
+
+    def _fire(self) -> None:
+        """
+        Calls the callback with the due event types, after handing the missed ones to `on_missed` if given.
+        """
+
+        self._cancel()
+
+        if self.on_missed is not None:
+            missed_events = self.missed()
+            if missed_events:
+                self.on_missed(missed_events)
+
+        due_events = self.due()
+        if due_events:
+            self.callback(due_events)
+        else:
+            self.arm()
+
+    def _cancel(self) -> None:
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+        if self._lead_event is not None:
+            self._lead_event.cancel()
+            self._lead_event = None
+
+    def _on_deadline(self, dt) -> None:  # NOQA
+        self._event = None
+        self._fire()  # re-arms if woken up early, e.g. timer granularity or wall clock adjustment
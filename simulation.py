@@ -0,0 +1,344 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+# Runs the reminder scheduler, daily counters and stores headless against a virtual clock, weeks of use take seconds
+
+from heapq import heappush, heappop, heapify
+from itertools import count
+from random import Random
+from datetime import datetime, timedelta
+from rollups import RollupIndex
+from scheduler import ReminderScheduler
+from reminder_types import registry
+from config import REMINDER_MIN_GAP
+from reminders import MAX_SKIPS, SlotAllocator, frequency_minutes, reminders_to_update, add_screen_time, \
+    get_event_counts, add_event_count
+
+DEFAULT_SETTINGS = registry.default_settings()
+
+
+# <<< VIRTUAL CLOCK >>>
+
+class VirtualClockEvent:
+    def __init__(self, callback, timeout: float, interval: bool, wall: bool = False) -> None:
+        self.callback = callback
+        self.timeout = timeout
+        self.interval = interval
+        self.wall = wall  # due at a wall-clock time rather than after a monotonic delay
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class VirtualClock:
+    """
+    Stand-in for the Kivy clock whose time only moves forward in `run_until`, callbacks run in deadline order.
+
+    | Note:
+    - `now` is passed to the scheduler and the counters in place of `datetime.now`, `monotonic` in place of
+      `time.monotonic`.
+    - `suspend` moves the wall clock forward without the monotonic clock, like a computer going to sleep.
+    - Callbacks scheduled with `schedule_at` happen at a wall-clock time, e.g. the user answering a reminder, so a
+      suspend does not delay them. Those due during the suspend run at wake-up.
+    """
+
+    def __init__(self, start: datetime) -> None:
+        self.start = start
+        self.current = start
+        self.suspended = 0.0  # seconds spent suspended, which the monotonic clock does not count
+        self.callbacks_run = 0
+
+        self._queue = []  # heap of (time, sequence, event)
+        self._sequence = count()
+
+    def now(self) -> datetime:
+        return self.current
+
+    def monotonic(self) -> float:
+        return (self.current - self.start).total_seconds() - self.suspended
+
+    def suspend(self, seconds: float) -> None:
+        """
+        Suspends the clock: the wall clock moves forward and the pending clock events are delayed by `seconds`, as
+        they wait on the monotonic clock. Wall-clock callbacks keep their time, or run at wake-up if it has passed.
+        """
+
+        self.current += timedelta(seconds=seconds)
+        self.suspended += seconds
+        self._queue = [(max(time, self.current) if event.wall else time + timedelta(seconds=seconds), sequence, event)
+                       for time, sequence, event in self._queue]
+        heapify(self._queue)
+
+    def _push(self, event: VirtualClockEvent) -> VirtualClockEvent:
+        heappush(self._queue, (self.current + timedelta(seconds=event.timeout), next(self._sequence), event))
+        return event
+
+    def schedule_once(self, callback, timeout: float = 0) -> VirtualClockEvent:
+        return self._push(VirtualClockEvent(callback, timeout, False))
+
+    def schedule_interval(self, callback, interval: float) -> VirtualClockEvent:
+        return self._push(VirtualClockEvent(callback, interval, True))
+
+    def schedule_at(self, callback, when: datetime) -> VirtualClockEvent:
+        event = VirtualClockEvent(callback, (when - self.current).total_seconds(), False, wall=True)
+        heappush(self._queue, (when, next(self._sequence), event))
+        return event
+
+    def run_until(self, end: datetime) -> None:
+        """
+        Runs every callback due before `end` and moves the time to `end`.
+        """
+
+        while self._queue and self._queue[0][0] <= end:
+            time, _, event = heappop(self._queue)
+            if event.cancelled:
+                continue
+
+            self.current = time
+            if event.interval:
+                self._push(event)
+
+            event.callback(event.timeout)
+            self.callbacks_run += 1
+
+        self.current = end
+
+
+# <<< SCRIPTED USER >>>
+
+class ScriptedUser:
+    """
+    Answers reminders with "done" or "skip" during working hours, reminders shown outside them wait for the next
+    working day.
+
+    Note: The answers only depend on the seed, so a simulation is reproducible.
+    """
+
+    def __init__(self, done_ratio: float = 0.8, delay: float = 60, hours: tuple = (9, 18), seed: int = 0) -> None:
+        """
+        :param done_ratio: Share of reminders answered with "done", the others are skipped while skips are left.
+        :param delay: Seconds taken to answer a reminder during working hours.
+        :param hours: First and last (excluded) hour of the working hours.
+        :param seed: Seed of the random answers.
+        """
+
+        self.done_ratio = done_ratio
+        self.delay = delay
+        self.hours = hours
+        self.random = Random(seed)
+
+    def answer(self, event_type: str, now: datetime) -> tuple:  # NOQA
+        """
+        :return: A tuple of (action, seconds until the answer).
+        """
+
+        action = "done" if self.random.random() < self.done_ratio else "skip"
+
+        start = now.replace(hour=self.hours[0], minute=0, second=0, microsecond=0)
+        if now.hour >= self.hours[1]:
+            start += timedelta(days=1)
+        if now < start:
+            return action, (start - now).total_seconds() + self.delay
+
+        return action, self.delay
+
+
+# <<< SIMULATION >>>
+
+class MemoryStore(dict):
+    """
+    In-memory store with the `DictStore` access pattern.
+    """
+
+    def exists(self, key: str) -> bool:
+        return key in self
+
+    def put_many(self, items) -> None:
+        self.update(items)
+
+
+class Simulation:
+    """
+    Drives the reminder scheduler, the screen time and event counters and the stores like the application does, and
+    records what happens in a deterministic event trace.
+
+    | Note:
+    - Screen time is counted every minute and reminders are answered by a `ScriptedUser`.
+    - The computer can be put to sleep every day, reminders missed meanwhile are caught up like in the application.
+      The user's answers, midnight and the sleeps follow the wall clock, an answer due during a sleep is given at
+      wake-up.
+    - The trace has one dict per reminder, answer, re-planned reminder, sleep and completed day.
+    """
+
+    def __init__(self, start: datetime, user: ScriptedUser = None, settings: dict = None,
+                 screen_time_history=None, event_count_history=None, rollup_store=None, sleep: tuple = None,
+                 catch_up: str = "coalesce", min_gap: float = REMINDER_MIN_GAP) -> None:
+        """
+        :param start: The datetime at which the simulated application starts.
+        :param user: The user answering reminders. Defaults to a `ScriptedUser` with seed 0.
+        :param settings: Reminder frequency and quantity settings overriding `DEFAULT_SETTINGS`.
+        :param screen_time_history: Screen time history store. Defaults to an in-memory store.
+        :param event_count_history: Event count history store. Defaults to an in-memory store.
+        :param rollup_store: Store of the rollup index. Defaults to an in-memory store.
+        :param sleep: (hour, hours) to put the computer to sleep every day at `hour` for `hours`. Defaults to None.
+        :param catch_up: "coalesce" or "replan", what happens to reminders missed during a sleep.
+        :param min_gap: Minimum minutes between two reminders.
+        """
+
+        self.clock = VirtualClock(start)
+        self.user = ScriptedUser() if user is None else user
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+
+        self.screen_time_history = MemoryStore() if screen_time_history is None else screen_time_history
+        self.event_count_history = MemoryStore() if event_count_history is None else event_count_history
+        self.rollups = RollupIndex(MemoryStore() if rollup_store is None else rollup_store)
+
+        self.frequencies = {reminder_type.name: frequency_minutes(self.settings[reminder_type.frequency_setting])
+                            for reminder_type in registry}
+        self.slots = SlotAllocator(min_gap)
+        self.reminder_timings = self.slots.timings
+        self.skip_count = MAX_SKIPS
+        self.trace = []
+
+        self.scheduler = ReminderScheduler(self.remind, self.clock, self.clock.now, self.clock.monotonic,
+                                           self.replan if catch_up == "replan" else None)
+        for event_type in self.frequencies:
+            self.set_reminder_timing(event_type)
+        self.scheduler.arm()
+        self.scheduler.start_heartbeat()
+
+        add_screen_time(self.screen_time_history, self.rollups, start.date(), 0)
+        self.clock.schedule_interval(lambda dt: self.count_minute(), 60)
+        self.schedule_midnight()
+
+        self.sleep = sleep
+        if sleep is not None:
+            self.schedule_sleep()
+
+    def record(self, event: str, **fields) -> None:
+        self.trace.append({"time": self.clock.now().isoformat(), "event": event, **fields})
+
+    def set_reminder_timing(self, event_type: str) -> None:
+        timing = self.slots.place(event_type, self.clock.now(), self.frequencies[event_type])
+        self.scheduler.set(event_type, timing, arm=False)
+
+    def replan(self, missed_events: list) -> None:
+        for event_type in missed_events:
+            self.set_reminder_timing(event_type)
+        self.record("replan", types=missed_events)
+
+    def remind(self, due_events: list) -> None:
+        event_type = due_events[0]
+        self.scheduler.pause()
+        self.record("remind", type=event_type, due=len(due_events))
+
+        action, delay = self.user.answer(event_type, self.clock.now())
+        if action == "skip" and self.skip_count == 0:
+            action = "done"  # the skip button is disabled once every skip of the day is used
+
+        self.clock.schedule_at(lambda dt: self.answer(event_type, action), self.clock.now() + timedelta(seconds=delay))
+
+    def answer(self, event_type: str, action: str) -> None:
+        for reminder in reminders_to_update(self.reminder_timings, event_type, self.clock.now()):
+            self.set_reminder_timing(reminder)
+        self.scheduler.resume()
+
+        if action == "done":
+            quantity_setting = registry[event_type].quantity_setting
+            add_event_count(self.event_count_history, self.rollups, self.clock.now().date(), event_type,
+                            self.settings[quantity_setting] if quantity_setting else "")
+        else:
+            self.skip_count -= 1
+
+        self.record("answer", type=event_type, action=action)
+
+    def count_minute(self) -> None:
+        add_screen_time(self.screen_time_history, self.rollups, self.clock.now().date())
+
+    def schedule_midnight(self) -> None:
+        now = self.clock.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        self.clock.schedule_at(lambda dt: self.start_day(), midnight)
+
+    def start_day(self) -> None:
+        day = self.clock.now().date() - timedelta(days=1)
+        fields = {}
+        for event_type, value in get_event_counts(self.event_count_history, day).items():
+            if isinstance(value, list):
+                fields[event_type], fields[f"{event_type}_quantity"] = value
+            else:
+                fields[event_type] = value
+
+        self.record("day", date=str(day), minutes=self.screen_time_history[str(day)]["minutes"], **fields,
+                    skips_left=self.skip_count)
+
+        self.skip_count = MAX_SKIPS
+        self.schedule_midnight()
+
+    def schedule_sleep(self) -> None:
+        now = self.clock.now()
+        start = now.replace(hour=self.sleep[0], minute=0, second=0, microsecond=0)
+        if start <= now:
+            start += timedelta(days=1)
+        self.clock.schedule_at(lambda dt: self.go_to_sleep(), start)
+
+    def go_to_sleep(self) -> None:
+        self.record("sleep", hours=self.sleep[1])
+        self.clock.suspend(self.sleep[1] * 3600)
+        self.schedule_sleep()
+
+    def run(self, days: float) -> list:
+        """
+        Simulates a number of days of use.
+
+        :return: The event trace.
+        """
+
+        self.clock.run_until(self.clock.now() + timedelta(days=days))
+        return self.trace
+
+
+# <<< COMMAND LINE >>>
+
+if __name__ == "__main__":
+    from json import dumps
+    from time import perf_counter
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Simulates Wellbeing headless and prints the event trace as JSON lines.")
+    parser.add_argument("--days", type=float, default=28, help="number of days to simulate")
+    parser.add_argument("--start", default="2024-01-01T08:00", help="start of the simulation (ISO datetime)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the scripted answers")
+    parser.add_argument("--done-ratio", type=float, default=0.8, help="share of reminders answered with done")
+    parser.add_argument("--delay", type=float, default=60, help="seconds taken to answer a reminder")
+    for reminder in registry:
+        parser.add_argument(f"--{reminder.name.replace('_', '-')}-freq", default=reminder.frequency,
+                            dest=reminder.frequency_setting, help=f"{reminder.name} reminder frequency, e.g. '45 min'")
+    parser.add_argument("--min-gap", type=float, default=REMINDER_MIN_GAP, help="minimum minutes between reminders")
+    parser.add_argument("--sleep", metavar="HOUR:HOURS", help="put the computer to sleep daily, e.g. 23:8")
+    parser.add_argument("--catch-up", choices=("coalesce", "replan"), default="coalesce",
+                        help="what happens to reminders missed during a sleep")
+    parser.add_argument("--trace", help="file to write the trace to instead of the standard output")
+    parser.add_argument("--quiet", action="store_true", help="only print the throughput")
+    arguments = parser.parse_args()
+
+    frequencies = {reminder.frequency_setting: getattr(arguments, reminder.frequency_setting) for reminder in registry}
+    simulation = Simulation(datetime.fromisoformat(arguments.start),
+                            ScriptedUser(arguments.done_ratio, arguments.delay, seed=arguments.seed), frequencies,
+                            sleep=tuple(map(int, arguments.sleep.split(":"))) if arguments.sleep else None,
+                            catch_up=arguments.catch_up, min_gap=arguments.min_gap)
+
+    started = perf_counter()
+    trace = simulation.run(arguments.days)
+    elapsed = perf_counter() - started
+
+    lines = "\n".join(dumps(event) for event in trace)
+    if arguments.trace:
+        with open(arguments.trace, "w") as file:
+            file.write(lines + "\n")
+    elif not arguments.quiet:
+        print(lines)
+
+    print(f"simulated {arguments.days:g} days ({simulation.clock.callbacks_run} clock callbacks, "
+          f"{sum(event['event'] == 'remind' for event in trace)} reminders) in {elapsed:.2f} s, "
+          f"{arguments.days / elapsed:.0f} days/s")
@@ -0,0 +1,178 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+# Settings, history and rollup stores of the application, kept free of Kivy so that tests and benchmarks open and
+# close them like the application does
+
+from os import makedirs
+from os.path import exists, join, dirname
+from rollups import RollupIndex, RollupLog
+from history_sqlite import SQLiteStorage
+from history_columns import HistoryColumns
+from buffered_store import BufferedStore, PickleFileStore
+from history_log import HistoryLog, SCREEN_TIME_SCHEMA, EVENT_COUNT_SCHEMA
+from config import DATA_DIR, STORAGE_BACKEND, SQLITE_PATH
+
+
+def open_dict_store(path: str):
+    """
+    Opens a `DictStore` file written by earlier versions, only needed to import it.
+    """
+
+    from kivy.storage.dictstore import DictStore
+
+    return DictStore(path)
+
+
+# <<< APPLICATION STORES >>>
+
+class AppStores:
+    """
+    Opens the settings and history stores of a storage backend, and flushes and closes them in a safe order.
+
+    | Note:
+    - "log" backend: settings in a pickled file, history and rollups in append-only logs.
+    - "sqlite" backend: everything in a single SQLite database, the existing stores are imported on first start.
+    - Every store is wrapped in a `BufferedStore`, so UI event handlers never write to disk themselves.
+    - `close` closes the history before recording the clean shutdown in the rollups, and the SQLite database, which
+      every table shares, only once every store has been flushed.
+    """
+
+    def __init__(self, directory: str = DATA_DIR, backend: str = STORAGE_BACKEND,
+                 sqlite_path: str = SQLITE_PATH) -> None:
+        """
+        :param directory: Directory of the settings, history and rollup files of the "log" backend, and of the files
+                          imported by the "sqlite" backend.
+        :param backend: "log" or "sqlite".
+        :param sqlite_path: Path of the database of the "sqlite" backend.
+        """
+
+        self.directory = directory
+        self.backend = backend
+        self.database = None
+
+        makedirs(directory, exist_ok=True)
+        if backend != "sqlite":
+            settings_store = PickleFileStore(join(directory, "settings.dat"))
+            screen_time_history = self.open_history(join(directory, "screen_time_history"), SCREEN_TIME_SCHEMA)
+            event_count_history = self.open_history(join(directory, "event_count_history"), EVENT_COUNT_SCHEMA)
+            rollup_store = RollupLog(join(directory, "rollups.log"))
+        else:
+            makedirs(dirname(sqlite_path) or ".", exist_ok=True)
+            self.database = SQLiteStorage(sqlite_path)
+            if not self.database.migrated:
+                self.migrate_to_database()
+
+            settings_store = self.database.settings_store
+            screen_time_history = self.database.screen_time_history
+            event_count_history = self.database.event_count_history
+            rollup_store = self.database.rollup_store
+
+        self.settings_store = BufferedStore(settings_store)
+        self.screen_time_history = BufferedStore(screen_time_history)
+        self.event_count_history = BufferedStore(event_count_history)
+        self.rollups = RollupIndex(BufferedStore(rollup_store))
+
+        # Build the rollups of the history recorded before the rollup index existed, and repair them after a crash
+        # which may have happened between the flushes of the history and the rollups
+        self.closed_cleanly = self.rollups.closed_cleanly  # whether the previous run closed the stores
+        self.repaired = []  # keys of the rollups rebuilt from the history
+        if not self.closed_cleanly and (len(self.screen_time_history) or len(self.event_count_history)):
+            self.repaired = self.rollups.repair(self.load_history_columns())
+        self.rollups.mark_open()
+        self.rollups.store.flush()
+
+    @property
+    def stores(self) -> tuple:
+        """
+        The buffered stores, the history before the rollups.
+        """
+
+        return self.settings_store, self.screen_time_history, self.event_count_history, self.rollups.store
+
+    def flush(self) -> None:
+        for store in self.stores:
+            store.flush()
+
+    def writes_saved(self) -> dict:
+        """
+        Returns the writes saved by coalescing in each buffered store, reported in the trace on exit.
+        """
+
+        return {"settings": self.settings_store.writes_saved, "screen_time": self.screen_time_history.writes_saved,
+                "event_counts": self.event_count_history.writes_saved, "rollups": self.rollups.store.writes_saved}
+
+    def close(self) -> None:
+        """
+        Flushes and closes every store, then the database.
+        """
+
+        self.flush()
+        self.rollups.mark_closed()  # written when the rollup store is closed, after the history stores
+
+        for store in self.stores:
+            store.close()
+        if self.database is not None:
+            self.database.close()
+
+    def load_history_columns(self) -> HistoryColumns:
+        """
+        Flushes the history stores and loads the whole history in columnar form.
+
+        Note: The history logs copy the arrays they hold in memory, the SQLite tables are read through their
+        `DictStore` access pattern.
+
+        :return: The `HistoryColumns` of the screen time and event count history.
+        """
+
+        self.screen_time_history.flush()
+        self.event_count_history.flush()
+
+        if self.database is None:
+            return HistoryColumns.from_logs(self.screen_time_history.store, self.event_count_history.store)
+
+        return HistoryColumns.from_stores(self.screen_time_history, SCREEN_TIME_SCHEMA,
+                                          self.event_count_history, EVENT_COUNT_SCHEMA)
+
+    def migrate_to_database(self) -> None:
+        """
+        Imports the settings and history stored by the "log" backend (or the older `DictStore` history files)
+        into the SQLite database.
+        """
+
+        settings_path = join(self.directory, "settings.dat")
+        if exists(settings_path):
+            settings = open_dict_store(settings_path)
+            self.database.settings_store.put_many((key, settings[key]) for key in settings.keys())
+
+        for name, schema, table in (
+                ("screen_time_history", SCREEN_TIME_SCHEMA, self.database.screen_time_history),
+                ("event_count_history", EVENT_COUNT_SCHEMA, self.database.event_count_history)):
+            path = join(self.directory, name)
+            if exists(f"{path}.snap") or exists(f"{path}.log"):
+                history = HistoryLog(path, schema)
+            elif exists(f"{path}.dat"):
+                history = open_dict_store(f"{path}.dat")
+            else:
+                continue
+
+            table.put_many((date, history[date]) for date in history.keys())
+
+        self.database.mark_migrated()
+
+    @staticmethod
+    def open_history(path: str, schema: tuple) -> HistoryLog:
+        """
+        Opens a history log and imports the history of the previous `DictStore` file on first start.
+
+        :param path: Path of the history without extension.
+        :param schema: The (field, width) pairs stored for each day.
+        :return: The opened history log.
+        """
+
+        history = HistoryLog(path, schema)
+
+        if len(history) == 0 and exists(f"{path}.dat"):
+            old_history = open_dict_store(f"{path}.dat")
+            history.import_items((date, old_history[date]) for date in old_history.keys())
+
+        return history
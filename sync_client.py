@@ -0,0 +1,250 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import sqlite3
+from gzip import compress
+from json import dumps, loads
+from threading import Thread, Event, RLock
+from urllib.parse import urlsplit
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (seq INTEGER PRIMARY KEY AUTOINCREMENT, day TEXT NOT NULL, deltas TEXT NOT NULL);
+"""
+
+
+# <<< OUTBOX >>>
+
+class SyncOutbox:
+    """
+    Durable queue of day-level deltas of the screen time and event counts waiting to be uploaded, kept in its own
+    SQLite database.
+
+    | Note:
+    - `add` only merges the deltas of a day in memory, `flush` writes one record per changed day, so the outbox grows
+      with the flushes rather than with every minute of screen time.
+    - Every record gets a sequence number which only grows, so the server can ignore records it already received.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.lock = RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(OUTBOX_SCHEMA)
+
+        self._pending = {}  # day -> merged deltas not written yet
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def add(self, day, deltas: dict) -> None:
+        """
+        Merges the changes of a day's values into the pending deltas.
+
+        :param day: The day whose values changed, a date or an ISO date string.
+        :param deltas: The change of each field, e.g. {"water_count": 1, "water_quantity": 200}.
+        """
+
+        with self.lock:
+            pending = self._pending.setdefault(str(day), {})
+            for field, delta in deltas.items():
+                pending[field] = pending.get(field, 0) + delta
+
+    def flush(self) -> None:
+        """
+        Writes the pending deltas to the outbox, one record per day, in a single transaction.
+        """
+
+        with self.lock:
+            if not self._pending:
+                return
+
+            with self.connection:
+                self.connection.executemany("INSERT INTO outbox (day, deltas) VALUES (?, ?)",
+                                            [(day, dumps(deltas)) for day, deltas in self._pending.items()])
+            self._pending.clear()
+
+    def peek(self, limit: int) -> list:
+        """
+        Returns the oldest records of the outbox.
+
+        :return: A list of dicts with the "seq", "day" and "deltas" of each record.
+        """
+
+        with self.lock:
+            rows = self.connection.execute("SELECT seq, day, deltas FROM outbox ORDER BY seq LIMIT ?",
+                                           (limit,)).fetchall()
+
+        return [{"seq": seq, "day": day, "deltas": loads(deltas)} for seq, day, deltas in rows]
+
+    def acknowledge(self, seq: int) -> None:
+        """
+        Removes the records up to a sequence number, once the server has stored them.
+        """
+
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM outbox WHERE seq <= ?", (seq,))
+
+    def close(self) -> None:
+        self.flush()
+        with self.lock:
+            self.connection.close()
+
+
+# <<< SYNC CLIENT >>>
+
+class SyncClient:
+    """
+    Uploads the outbox to a reporting server in gzip-compressed batches on a worker thread, so that the UI never
+    waits on the network.
+
+    | Note:
+    - A batch is a POST of {"client_id", "team", "records"} as gzip-compressed JSON, the server answers with the
+      highest sequence number it has stored as {"acked": seq}, and the acknowledged records are removed.
+    - Batches are resent until acknowledged, the sequence numbers make resending the same records harmless.
+    - Failed uploads are retried after an exponential backoff, a single keep-alive connection is reused otherwise.
+    """
+
+    def __init__(self, outbox: SyncOutbox, endpoint: str, client_id: str, team: str = "", batch_size: int = 500,
+                 interval: float = 300, timeout: float = 10, backoff: float = 30, max_backoff: float = 3600) -> None:
+        """
+        :param outbox: The outbox to upload.
+        :param endpoint: URL to which the batches are posted.
+        :param client_id: Identifier of this installation.
+        :param team: Team whose totals this installation contributes to.
+        :param batch_size: Maximum number of records per batch.
+        :param interval: Seconds between two uploads of the outbox.
+        :param timeout: Seconds to wait for the server.
+        :param backoff: Seconds to wait after the first failure, doubled after every further failure.
+        :param max_backoff: Upper bound of the backoff.
+        """
+
+        self.outbox = outbox
+        self.endpoint = endpoint
+        self.client_id = client_id
+        self.team = team
+        self.batch_size = batch_size
+        self.interval = interval
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.failures = 0
+        self.uploaded = 0  # records acknowledged by the server
+
+        self._wake = Event()
+        self._stopped = Event()
+        self._connection = None
+        self._thread = None
+
+    def start(self) -> None:
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None) -> bool:
+        """
+        Stops the worker and waits for it to finish its upload, so that the outbox can be closed afterwards.
+
+        Note: An upload still waiting on the server after the timeout fails once the outbox is closed, its records
+        stay in the outbox.
+
+        :param timeout: Seconds to wait for the worker. Defaults to the timeout of the server.
+        :return: Whether the worker has finished.
+        """
+
+        self._stopped.set()
+        self._wake.set()
+
+        if self._thread is not None:
+            self._thread.join(self.timeout if timeout is None else timeout)
+            return not self._thread.is_alive()
+
+        return True
+
+    def wake(self) -> None:
+        """
+        Asks the worker to upload the outbox now.
+        """
+
+        self._wake.set()
+
+    def upload_batch(self) -> int:
+        """
+        Uploads the oldest records of the outbox over the reused connection.
+
+        :return: The number of records acknowledged, 0 if the outbox is empty.
+        """
+
+        records = self.outbox.peek(self.batch_size)
+        if not records:
+            return 0
+
+        body = compress(dumps({"client_id": self.client_id, "team": self.team, "records": records}).encode())
+        url = urlsplit(self.endpoint)
+
+        if self._connection is None:
+            connection_class = HTTPSConnection if url.scheme == "https" else HTTPConnection
+            self._connection = connection_class(url.netloc, timeout=self.timeout)
+
+        try:
+            self._connection.request("POST", url.path or "/", body, headers={
+                "Content-Type": "application/json", "Content-Encoding": "gzip", "Accept": "application/json"})
+            response = self._connection.getresponse()
+            data = response.read()
+        except (OSError, HTTPException):
+            self._connection.close()
+            self._connection = None
+            raise
+
+        if response.status != 200:
+            raise HTTPException(f"sync endpoint returned {response.status}")
+
+        acked = int(loads(data)["acked"])
+        self.outbox.acknowledge(acked)
+
+        count = sum(record["seq"] <= acked for record in records)
+        self.uploaded += count
+        return count
+
+    def upload(self) -> None:
+        """
+        Uploads batches until the outbox is empty or the server stops acknowledging records.
+        """
+
+        while not self._stopped.is_set() and self.upload_batch() == self.batch_size:
+            pass
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.upload()
+            except (OSError, ValueError, KeyError, TypeError, HTTPException, sqlite3.Error):
+                self.failures += 1
+                self._stopped.wait(min(self.backoff * 2 ** min(self.failures - 1, 16), self.max_backoff))
+                continue
+
+            self.failures = 0
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+        if self._connection is not None:
+            self._connection.close()
+
+
+# <<< COMMAND LINE >>>
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+    from config import DATA_DIR
+
+    parser = ArgumentParser(description="Uploads the sync outbox once. Close Wellbeing first.")
+    parser.add_argument("endpoint", help="URL to which the batches are posted")
+    parser.add_argument("--outbox", default=f"{DATA_DIR}/outbox.db", help="path of the outbox database")
+    parser.add_argument("--client-id", required=True, help="identifier of this installation")
+    parser.add_argument("--team", default="", help="team of this installation")
+    arguments = parser.parse_args()
+
+    sync_outbox = SyncOutbox(arguments.outbox)
+    pending = len(sync_outbox)
+    SyncClient(sync_outbox, arguments.endpoint, arguments.client_id, arguments.team).upload()
+    print(f"Uploaded {pending - len(sync_outbox)} of {pending} records")
@@ -0,0 +1,421 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+# Reporting server collecting the day totals uploaded by the sync clients (sync_client.py) of a team's installations.
+# Run: python sync_server.py --port 8750 --database data/server.db
+
+import sqlite3
+import asyncio
+from zlib import decompressobj, error as ZlibError
+from json import dumps, loads
+from datetime import date, timedelta
+from urllib.parse import urlsplit, parse_qs, unquote
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (client_id TEXT PRIMARY KEY, acked INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS days (
+    client_id TEXT NOT NULL,
+    team TEXT NOT NULL,
+    day TEXT NOT NULL,
+    minutes INTEGER NOT NULL DEFAULT 0,
+    eyes INTEGER NOT NULL DEFAULT 0,
+    water_count INTEGER NOT NULL DEFAULT 0,
+    water_quantity INTEGER NOT NULL DEFAULT 0,
+    exercise INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (client_id, team, day)
+);
+CREATE INDEX IF NOT EXISTS days_by_team ON days (team, day);
+CREATE INDEX IF NOT EXISTS days_by_day ON days (day);
+"""
+
+# Aggregated fields, the counts of other reminder types configured by the clients are ignored
+FIELDS = ("minutes", "eyes", "water_count", "water_quantity", "exercise")
+COLUMNS = ", ".join(FIELDS)
+UPSERT = f"""
+INSERT INTO days (client_id, team, day, {COLUMNS}) VALUES (?, ?, ?{", ?" * len(FIELDS)})
+ON CONFLICT (client_id, team, day) DO UPDATE SET {", ".join(f"{field} = {field} + excluded.{field}"
+                                                           for field in FIELDS)}
+"""
+
+MAX_BODY_SIZE = 8 * 1024 * 1024  # bytes of a decompressed request body
+MAX_VALUE = 2 ** 63  # values and sequence numbers must fit in a SQLite INTEGER
+MAX_QUERY_DAYS = 366  # days of a team query, which bounds its latency
+
+
+# <<< RECORDS >>>
+
+def day_values(record: dict) -> dict:
+    """
+    Converts the screen time and event counts of a day, as stored by Wellbeing, to rollup fields.
+
+    :param record: A dict with the "screen_time" ({"minutes": n}) and "event_counts" ({"eyes": n, "water": [count,
+                   ml], "exercise": n}) of a day, either may be missing.
+    :return: A dict of rollup field -> value, e.g. {"minutes": 95, "eyes": 4, "water_count": 3, ...}.
+    """
+
+    screen_time = record.get("screen_time") or {}
+    event_counts = record.get("event_counts") or {}
+    water_count, water_quantity = event_counts.get("water", (0, 0))
+
+    return {"minutes": screen_time.get("minutes", 0), "eyes": event_counts.get("eyes", 0),
+            "water_count": water_count, "water_quantity": water_quantity, "exercise": event_counts.get("exercise", 0)}
+
+
+def parse_batch(body: dict) -> tuple:
+    """
+    Validates an uploaded batch.
+
+    | Note:
+    - A batch is {"client_id", "team", "records"}, every record has a "seq" number and a "day".
+    - Records uploaded by the sync client hold the "deltas" of the day's values, records of an imported history hold
+      the day's "screen_time" and "event_counts", which replace the values stored for that day.
+    - Fields other than `FIELDS`, e.g. the counts of the clients' own reminder types, are dropped.
+    - Sequence numbers and values must be integers within ±`MAX_VALUE`, like SQLite integers.
+
+    :return: A tuple of (client id, team, records), every record converted to (seq, day, values, is_delta).
+    :raises ValueError: If the batch is malformed.
+    """
+
+    client_id, team = body.get("client_id"), body.get("team", "")
+    if not isinstance(client_id, str) or not client_id or not isinstance(team, str):
+        raise ValueError("the batch needs a client_id and a team")
+
+    records = []
+    for record in body.get("records", ()):
+        seq, day = record["seq"], record["day"]
+        date.fromisoformat(day)
+
+        if "deltas" in record:
+            values, is_delta = record["deltas"], True
+        else:
+            values, is_delta = day_values(record), False
+
+        if not all(isinstance(value, int) and -MAX_VALUE <= value < MAX_VALUE for value in (seq, *values.values())):
+            raise ValueError(f"malformed record {seq}")
+
+        records.append((seq, day, {field: value for field, value in values.items() if field in FIELDS}, is_delta))
+
+    return client_id, team, sorted(records, key=lambda record: record[0])
+
+
+# <<< AGGREGATION SERVER >>>
+
+class AggregationServer:
+    """
+    Stores the uploaded day values of every client in SQLite and serves the team and day totals from memory.
+
+    | Note:
+    - Batches received while the previous ones are written are committed together in a single transaction, so the
+      database sees one bulk insert per write instead of one per client.
+    - A batch is acknowledged with the highest sequence number stored for its client once it is committed, records
+      with an acknowledged sequence number are ignored, so clients can resend a batch whose answer was lost.
+    - The totals per team and day are kept in memory and updated after every commit, so queries never wait on the
+      database or on the writes. Team queries cover at most `MAX_QUERY_DAYS` days.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+        self.acked = dict(self.connection.execute("SELECT client_id, acked FROM clients"))
+        self.team_days = {}  # team -> day -> totals
+        self.day_teams = {}  # day -> team -> totals, the same dicts as `team_days`
+        self.team_clients = {}  # team -> client ids
+
+        for team, day, *totals in self.connection.execute(
+                f"SELECT team, day, {', '.join(f'SUM({field})' for field in FIELDS)} FROM days "
+                f"GROUP BY team, day"):
+            self._add(team, day, dict(zip(FIELDS, totals)))
+        for client_id, team in self.connection.execute("SELECT DISTINCT client_id, team FROM days"):
+            self.team_clients.setdefault(team, set()).add(client_id)
+
+        self.batches = 0
+        self.records = 0
+
+        self._pending = []  # (client id, team, records, future) waiting to be committed
+        self._wake = asyncio.Event()
+
+    # <<< INGESTION >>>
+
+    async def ingest(self, client_id: str, team: str, records: list) -> int:
+        """
+        Queues a batch for the next commit.
+
+        :return: The highest sequence number stored for the client once the batch is committed.
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((client_id, team, records, future))
+        self._wake.set()
+        return await future
+
+    async def write(self) -> None:
+        """
+        Commits the queued batches until cancelled, a single transaction per round.
+
+        Note: If a round fails, the batches of that round get the error and the following rounds are still written.
+        """
+
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            batches, self._pending = self._pending, []
+
+            try:
+                changes = await asyncio.to_thread(self._commit, batches)
+            except Exception as error:  # NOQA, a bad round must not stop the writes
+                for *_, future in batches:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+
+            for team, day, client_id, deltas in changes:
+                self._add(team, day, deltas)
+                self.team_clients.setdefault(team, set()).add(client_id)
+
+            for client_id, team, records, future in batches:
+                self.batches += 1
+                self.records += len(records)
+                if not future.done():  # the connection may have been closed meanwhile
+                    future.set_result(self.acked.get(client_id, 0))
+
+    def _commit(self, batches: list) -> list:
+        """
+        Writes batches to the database in a single transaction, on a worker thread.
+
+        :return: A list of (team, day, client id, deltas) to add to the totals.
+        """
+
+        acked = {}
+        rows, changes = [], []
+        current = {}  # (client id, team, day) -> values, of the days replaced by imported records
+
+        for client_id, team, records, _ in batches:
+            last = acked.get(client_id, self.acked.get(client_id, 0))
+            for seq, day, values, is_delta in records:
+                if seq <= last:
+                    continue
+                last = seq
+
+                deltas = values
+                if not is_delta:
+                    key = (client_id, team, day)
+                    if key not in current:
+                        stored = self.connection.execute(
+                            f"SELECT {COLUMNS} FROM days WHERE client_id = ? AND team = ? AND day = ?", key).fetchone()
+                        current[key] = dict(zip(FIELDS, stored or (0,) * len(FIELDS)))
+                    deltas = {field: values[field] - current[key][field] for field in FIELDS}
+                    current[key] = values
+
+                rows.append((client_id, team, day, *(deltas.get(field, 0) for field in FIELDS)))
+                changes.append((team, day, client_id, deltas))
+
+            acked[client_id] = last
+
+        with self.connection:
+            self.connection.executemany(UPSERT, rows)
+            self.connection.executemany("INSERT OR REPLACE INTO clients (client_id, acked) VALUES (?, ?)",
+                                        acked.items())
+
+        self.acked.update(acked)
+        return changes
+
+    def _add(self, team: str, day: str, deltas: dict) -> None:
+        totals = self.team_days.setdefault(team, {}).get(day)
+        if totals is None:
+            totals = self.team_days[team][day] = dict.fromkeys(FIELDS, 0)
+            self.day_teams.setdefault(day, {})[team] = totals
+
+        for field, delta in deltas.items():
+            totals[field] += delta
+
+    # <<< QUERIES >>>
+
+    def teams(self) -> dict:
+        """
+        Returns the number of clients of every team.
+        """
+
+        return {team: len(clients) for team, clients in self.team_clients.items()}
+
+    def team_totals(self, team: str, start: date, end: date) -> dict:
+        """
+        Returns the totals of a team between two days, inclusive.
+
+        :raises ValueError: If the range covers more than `MAX_QUERY_DAYS` days.
+        """
+
+        if not 0 <= (end - start).days < MAX_QUERY_DAYS:
+            raise ValueError(f"the range must cover 1 to {MAX_QUERY_DAYS} days")
+
+        days = self.team_days.get(team, {})
+        totals = dict.fromkeys(FIELDS, 0)
+        per_day = {}
+
+        for offset in range((end - start).days + 1):
+            day = (start + timedelta(days=offset)).isoformat()
+            if day in days:
+                per_day[day] = days[day]
+                for field in FIELDS:
+                    totals[field] += days[day][field]
+
+        return {"team": team, "clients": len(self.team_clients.get(team, ())), "totals": totals, "days": per_day}
+
+    def day_totals(self, day: str) -> dict:
+        """
+        Returns the totals of every team on a day.
+        """
+
+        teams = self.day_teams.get(day, {})
+        totals = {field: sum(team[field] for team in teams.values()) for field in FIELDS}
+        return {"day": day, "totals": totals, "teams": teams}
+
+    def stats(self) -> dict:
+        return {"batches": self.batches, "records": self.records, "clients": len(self.acked),
+                "teams": len(self.team_days), "days": len(self.day_teams)}
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+# <<< HTTP >>>
+
+def decompress(body: bytes) -> bytes:
+    """
+    Decompresses a gzip request body, without inflating more than `MAX_BODY_SIZE` bytes.
+
+    :return: The decompressed body, None if it is larger than `MAX_BODY_SIZE`.
+    :raises EOFError: If the body is truncated.
+    """
+
+    decompressor = decompressobj(wbits=31)
+    data = decompressor.decompress(body, MAX_BODY_SIZE + 1)
+    if len(data) > MAX_BODY_SIZE or decompressor.unconsumed_tail:
+        return None
+    if not decompressor.eof:
+        raise EOFError("truncated gzip body")
+
+    return data
+
+
+async def handle_request(server: AggregationServer, method: str, target: str, headers: dict, body: bytes) -> tuple:
+    """
+    Routes a request.
+
+    | Note:
+    - POST /ingest: stores a batch, returns {"acked": seq}.
+    - GET /teams: the number of clients of every team.
+    - GET /teams/<team>?start=YYYY-MM-DD&end=YYYY-MM-DD: the team's totals, the last 7 days by default.
+    - GET /days/<YYYY-MM-DD>: the totals of every team on a day.
+    - GET /stats: ingestion counters.
+
+    :return: A tuple of (status, JSON-serializable response).
+    """
+
+    url = urlsplit(target)
+    parts = [unquote(part) for part in url.path.strip("/").split("/")]
+    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+    try:
+        if method == "POST" and parts == ["ingest"]:
+            if headers.get("content-encoding") == "gzip":
+                body = decompress(body)
+                if body is None:
+                    return 413, {"error": "batch too large"}
+            if len(body) > MAX_BODY_SIZE:
+                return 413, {"error": "batch too large"}
+            return 200, {"acked": await server.ingest(*parse_batch(loads(body)))}
+
+        if method != "GET":
+            return 405, {"error": "method not allowed"}
+        if parts == ["teams"]:
+            return 200, server.teams()
+        if len(parts) == 2 and parts[0] == "teams":
+            end = date.fromisoformat(query["end"]) if "end" in query else date.today()
+            start = date.fromisoformat(query["start"]) if "start" in query else end - timedelta(days=6)
+            return 200, server.team_totals(parts[1], start, end)
+        if len(parts) == 2 and parts[0] == "days":
+            return 200, server.day_totals(date.fromisoformat(parts[1]).isoformat())
+        if parts == ["stats"]:
+            return 200, server.stats()
+    except (ValueError, KeyError, TypeError, AttributeError, ZlibError, EOFError) as error:  # ZlibError: bad gzip
+        return 400, {"error": str(error)}
+    except sqlite3.Error as error:
+        return 503, {"error": str(error)}
+    except Exception as error:  # NOQA, a failed commit round
+        return 500, {"error": str(error)}
+
+    return 404, {"error": "not found"}
+
+
+async def serve_connection(server: AggregationServer, reader: asyncio.StreamReader,
+                           writer: asyncio.StreamWriter) -> None:
+    """
+    Answers the HTTP/1.1 requests of a keep-alive connection.
+    """
+
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY_SIZE:
+                status, response = 413, {"error": "batch too large"}
+            else:
+                status, response = await handle_request(server, method, target, headers,
+                                                        await reader.readexactly(length))
+
+            data = dumps(response).encode()
+            writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\nContent-Type: application/json"
+                         f"\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+            await writer.drain()
+
+            if status == 413 or headers.get("connection", "").lower() == "close":
+                break
+    except (ValueError, ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_server(path: str, host: str, port: int) -> None:
+    server = AggregationServer(path)
+    writer_task = asyncio.create_task(server.write())
+    listener = await asyncio.start_server(lambda reader, writer: serve_connection(server, reader, writer), host, port,
+                                          backlog=1024)
+
+    host, port = listener.sockets[0].getsockname()[:2]
+    print(f"Listening on http://{host}:{port}", flush=True)
+
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        writer_task.cancel()
+        server.close()
+
+
+# <<< COMMAND LINE >>>
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Collects the day totals uploaded by the sync clients and serves team totals.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8750, help="0 for a free port")
+    parser.add_argument("--database", default="data/server.db", help="path of the server database")
+    arguments = parser.parse_args()
+
+    try:
+        asyncio.run(run_server(arguments.database, arguments.host, arguments.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,7 @@
+# Makes the modules of the repository root importable from the tests
+# Run from the repository root: python -m pytest tests
+
+import sys
+from os.path import dirname, abspath
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
@@ -0,0 +1,65 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+import pytest
+from datetime import date
+from reminders import add_screen_time, add_event_count
+from stores import AppStores
+
+DAY = date(2024, 1, 1)
+
+
+def open_stores(directory, backend: str) -> AppStores:
+    return AppStores(str(directory), backend, str(directory / "wellbeing.db"))
+
+
+# <<< OPEN AND CLOSE >>>
+
+@pytest.mark.parametrize("backend", ["log", "sqlite"])
+def test_close_records_clean_shutdown(tmp_path, backend):
+    stores = open_stores(tmp_path, backend)
+    assert not stores.closed_cleanly
+
+    add_screen_time(stores.screen_time_history, stores.rollups, DAY, 5)
+    add_event_count(stores.event_count_history, stores.rollups, DAY, "water", "200")
+    stores.close()  # the order of `WellbeingApp.on_stop`
+
+    stores = open_stores(tmp_path, backend)
+    assert stores.closed_cleanly
+    assert stores.repaired == []
+    assert stores.screen_time_history[str(DAY)] == {"minutes": 5}
+    assert stores.rollups.month(DAY)["minutes"] == 5
+    assert stores.rollups.month(DAY)["water_quantity"] == 200
+    stores.close()
+
+
+@pytest.mark.parametrize("backend", ["log", "sqlite"])
+def test_crash_between_flushes_repairs_rollups(tmp_path, backend):
+    stores = open_stores(tmp_path, backend)
+    add_screen_time(stores.screen_time_history, stores.rollups, DAY, 5)
+    stores.screen_time_history.flush()  # crash before the rollups are flushed
+
+    stores = open_stores(tmp_path, backend)
+    assert not stores.closed_cleanly
+    assert stores.repaired == ["month:2024-01", "week:2024-W01", "year:2024"]
+    assert stores.rollups.month(DAY)["minutes"] == 5
+    assert stores.rollups.verify(stores.load_history_columns()) == []
+    stores.close()
+
+
+# <<< WRITE COALESCING >>>
+
+@pytest.mark.parametrize("backend", ["log", "sqlite"])
+def test_coalesced_writes_are_counted(tmp_path, backend):
+    stores = open_stores(tmp_path, backend)
+    for _ in range(10):
+        add_screen_time(stores.screen_time_history, stores.rollups, DAY, 1)
+    assert stores.screen_time_history.writes_saved == 10  # 11 writes to one pending key
+
+    stores.flush()
+    assert stores.screen_time_history.stats() == {"writes": 11, "flushed_writes": 1, "writes_saved": 10,
+                                                  "flushes": 1}
+
+    add_screen_time(stores.screen_time_history, stores.rollups, DAY, 1)
+    stores.close()
+    assert stores.writes_saved()["screen_time"] == 10
+    assert stores.writes_saved()["rollups"] == 27  # 10 writes to each of the month, week and year, flushed once
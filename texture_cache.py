@@ -0,0 +1,71 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+from collections import OrderedDict
+
+
+# <<< TEXTURE CACHE >>>
+
+class TextureCache:
+    """
+    Bounded cache of rendered label textures, evicting the least recently used texture first.
+
+    | Note:
+    - Keys describe everything that changes the rendering of a label, e.g. (text, font, size, colour).
+    - `hits` and `misses` count lookups, to tune `capacity` against the memory held by the textures.
+    """
+
+    def __init__(self, capacity: int = 128) -> None:
+        """
+        :param capacity: Maximum number of textures kept, 0 disables the cache.
+        """
+
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._textures = OrderedDict()  # key -> (texture, texture size), least recently used first
+
+    def __len__(self) -> int:
+        return len(self._textures)
+
+    def get(self, key: tuple):
+        """
+        Returns the cached (texture, texture size) of a key, None if it is not cached.
+        """
+
+        entry = self._textures.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._textures.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, texture, size) -> None:
+        """
+        Caches a rendered texture, evicting the least recently used textures past the capacity.
+
+        :param key: The rendering key of the texture.
+        :param texture: The rendered texture.
+        :param size: The texture size reported by the label.
+        """
+
+        if self.capacity <= 0:
+            return
+
+        self._textures[key] = (texture, tuple(size))
+        self._textures.move_to_end(key)
+
+        while len(self._textures) > self.capacity:
+            self._textures.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._textures.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"size": len(self._textures), "capacity": self.capacity, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0}
@@ -0,0 +1,163 @@
+# <<< IMPORTS AND CONFIGURATION >>>
+
+# Imported before Kivy by main.py: it removes its own command line flag so that Kivy does not reject it
+
+import sys
+from os import environ, getpid
+from json import dump
+from time import perf_counter
+from threading import get_ident, Lock
+from contextlib import contextmanager
+
+
+# <<< MEMORY USAGE >>>
+
+def current_rss() -> int:
+    """
+    Returns the resident set size of the process in bytes, 0 if it cannot be measured.
+    """
+
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return 0
+
+    try:
+        with open("/proc/self/statm") as file:
+            from os import sysconf
+            return int(file.read().split()[1]) * sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+# <<< TRACER >>>
+
+class Tracer:
+    """
+    Records lifecycle phases with monotonic timestamps and RSS, and writes them in Chrome trace format (viewable in
+    chrome://tracing or https://ui.perfetto.dev).
+
+    Note: When disabled, every method returns immediately so the instrumentation costs nothing.
+    """
+
+    def __init__(self, path: str = None) -> None:
+        """
+        :param path: File to which the trace is written, None to disable tracing.
+        """
+
+        self.path = path
+        self.enabled = path is not None
+        self.origin = perf_counter()
+        self.events = []
+
+        self._open_phases = {}
+        self._lock = Lock()
+
+    def _timestamp(self) -> float:
+        return round((perf_counter() - self.origin) * 1_000_000, 1)  # microseconds since the tracer was created
+
+    def _add(self, event: dict) -> None:
+        event.update(pid=getpid(), tid=get_ident())
+        with self._lock:
+            self.events.append(event)
+
+    def begin(self, name: str) -> None:
+        """
+        Starts a phase, it ends with `end` called with the same name.
+        """
+
+        if self.enabled:
+            self._open_phases[name] = (self._timestamp(), current_rss())
+
+    def end(self, name: str) -> None:
+        if not self.enabled or name not in self._open_phases:
+            return
+
+        started, start_rss = self._open_phases.pop(name)
+        rss = current_rss()
+        self._add({"name": name, "ph": "X", "ts": started, "dur": round(self._timestamp() - started, 1),
+                   "args": {"rss_start_mb": round(start_rss / 2 ** 20, 2), "rss_end_mb": round(rss / 2 ** 20, 2)}})
+        self._add({"name": "RSS", "ph": "C", "ts": self._timestamp(), "args": {"MB": round(rss / 2 ** 20, 2)}})
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Context manager recording the enclosed code as a phase.
+        """
+
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def mark(self, name: str) -> None:
+        """
+        Records an instant event, e.g. "tray ready".
+        """
+
+        if self.enabled:
+            self._add({"name": name, "ph": "i", "s": "p", "ts": self._timestamp(),
+                       "args": {"rss_mb": round(current_rss() / 2 ** 20, 2)}})
+
+    def counter(self, name: str, values: dict) -> None:
+        """
+        Records numeric values as a counter event, e.g. the hits and misses of a cache.
+        """
+
+        if self.enabled:
+            self._add({"name": name, "ph": "C", "ts": self._timestamp(), "args": values})
+
+    def write(self) -> None:
+        """
+        Writes the recorded events to the trace file.
+        """
+
+        if not self.enabled:
+            return
+
+        with self._lock:
+            events = list(self.events)
+
+        try:
+            with open(self.path, "w") as file:
+                dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        except OSError:
+            pass
+
+
+def tracer_from_environment() -> Tracer:
+    """
+    Creates the tracer of the application, enabled by the WELLBEING_TRACE environment variable or the
+    "--trace <path>" command line flag (the flag is removed from `sys.argv`).
+    """
+
+    path = environ.get("WELLBEING_TRACE") or None
+
+    if "--trace" in sys.argv:
+        index = sys.argv.index("--trace")
+        path = sys.argv[index + 1] if index + 1 < len(sys.argv) else "wellbeing-trace.json"
+        del sys.argv[index:index + 2]
+
+    return Tracer(path)
+
+
+tracer = tracer_from_environment()
@@ -113,21 +113,27 @@ class _TrayIconApp(wx.App):
 
 
 class TrayIconApp:
-    def __init__(self, name: str, icon: str, menus: tuple, left_click_action=None, include_quit=False):
+    def __init__(self, name: str, icon: str, menus: tuple, left_click_action=None, include_quit=False, on_ready=None):
         self.name = name
         self.icon = icon
         self.menus = menus
         self.left_click_action = left_click_action
         self.include_quit = include_quit
+        self.on_ready = on_ready
 
         self.app = None
 
     def run(self):
         """
         Runs the tray icon application.
+
+        Note: `on_ready` (if provided) is called from the tray thread once the icon has been added to the tray.
         """
 
         self.app = _TrayIconApp(self.name, self.icon, self.menus, self.left_click_action, self.include_quit)
+        if self.on_ready is not None:
+            self.on_ready()
+
         self.app.MainLoop()
 
     def run_detached(self, daemon=False):